@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+On-disk HTTP response cache for the arXiv, Crossref, PubMed and OpenAlex clients.
+
+`CachedSession` is a drop-in `requests.Session`:
+- Responses are stored in SQLite, keyed by method, normalized URL + query
+  parameters and the Accept header
+- Per-source TTLs (by host); stale entries with an ETag or Last-Modified
+  header are revalidated with a conditional request (304 = reuse body)
+- Size cap with least-recently-used eviction
+- Cache-only mode that never touches the network (misses return 504)
+- Optional pacing that only applies to real network requests, so cache
+  hits cost neither a round trip nor a rate-limit delay
+- Requests sent with a `Cache-Control: no-store` header bypass the cache
+  (no lookup, nothing stored), e.g. for cursor paging
+- `stream=True` responses are teed into the cache as the caller reads them
+  (spooled to a temp file), so streaming parsers keep their flat memory use
+
+Environment:
+  HTTP_CACHE_MODE    on (default) | off | cache-only
+  HTTP_CACHE_DIR     cache directory (default: $XDG_CACHE_HOME/research-http)
+  HTTP_CACHE_MAX_MB  size cap in MB (default: 256)
+
+This file is copied into the literature-review, citation-management and
+openalex-database skills; edit scripts/http_cache.py and run
+`python scripts/check_shared_modules.py --sync` to update the copies.
+
+Usage:
+  python http_cache.py --stats
+  python http_cache.py --clear
+"""
+
+import argparse
+import http.client
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+MODES = ('on', 'off', 'cache-only')
+
+# Seconds a stored response is served without revalidation, by host.
+DEFAULT_TTLS = {
+    'export.arxiv.org': 3600,  # new listings appear daily
+    'api.openalex.org': 24 * 3600,
+    'eutils.ncbi.nlm.nih.gov': 7 * 24 * 3600,
+    'api.crossref.org': 30 * 24 * 3600,
+    'doi.org': 30 * 24 * 3600,
+}
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_MB = 256
+
+# Parameters that identify the caller, not the resource.
+_IGNORED_PARAMS = {'mailto', 'email', 'tool', 'api_key'}
+_CACHEABLE_STATUS = {200, 203, 300, 301, 404, 410}
+# Hosts where a miss is often temporary (a DOI registered after the lookup),
+# so 404/410 are never stored for them.
+_NO_NEGATIVE_CACHE_HOSTS = {'api.crossref.org', 'doi.org'}
+# A registered DOI's redirect only changes if the publisher moves, so any
+# 3xx from the resolver (HEAD/GET without following redirects) is stored.
+_REDIRECT_CACHE_HOSTS = {'doi.org'}
+_SPOOL_MEMORY_BYTES = 1024 * 1024
+_BLOB_CHUNK = 64 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+def default_cache_path() -> str:
+    """Return the cache database path from HTTP_CACHE_DIR / XDG_CACHE_HOME."""
+    base = os.environ.get('HTTP_CACHE_DIR')
+    if not base:
+        xdg = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        base = os.path.join(xdg, 'research-http')
+    return os.path.join(base, 'responses.sqlite3')
+
+
+def normalize_url(url: str, params: Any = None) -> str:
+    """
+    Canonical form of a request URL for use as a cache key.
+
+    Lowercases scheme and host, drops default ports and fragments, merges
+    `params` into the query string, sorts it and removes caller-identifying
+    parameters (mailto, email, tool, api_key).
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        items = params.items() if isinstance(params, Mapping) else params
+        for k, v in items:
+            if v is None:
+                continue
+            values = v if isinstance(v, (list, tuple)) else [v]
+            query.extend((str(k), str(x)) for x in values)
+    query = sorted((k, v) for k, v in query if k not in _IGNORED_PARAMS)
+
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)):
+        host = f'{host}:{parts.port}'
+    return urlunsplit((scheme, host, parts.path or '/', urlencode(query), ''))
+
+
+def cache_key(method: str, url: str, params: Any = None, accept: Optional[str] = None,
+              follow_redirects: bool = True) -> str:
+    # Accept is part of the key: doi.org serves BibTeX, CSL-JSON, HTML... from one URL.
+    key = f'{method.upper()} {normalize_url(url, params)} accept={accept or ""}'
+    # A stored redirect must never answer a request that follows redirects.
+    return key if follow_redirects else f'{key} redirects=no'
+
+
+class ResponseCache:
+    """SQLite-backed response store with per-host TTLs and an LRU size cap."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = DEFAULT_TTL,
+    ):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: Database file (default: default_cache_path())
+            max_bytes: Size cap for stored bodies (default: HTTP_CACHE_MAX_MB)
+            ttls: Host -> TTL seconds, merged over DEFAULT_TTLS
+            default_ttl: TTL for hosts not listed in `ttls`
+        """
+        self.path = path or default_cache_path()
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get('HTTP_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.default_ttl = default_ttl
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def ttl_for(self, url: str) -> float:
+        host = _match_host(url, self.ttls)
+        return self.ttls[host] if host else self.default_ttl
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT url, status, headers, body, stored_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            with self._conn:
+                self._conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (time.time(), key))
+        url, status, headers, body, stored_at = row
+        return {'url': url, 'status': status, 'headers': json.loads(headers), 'body': body, 'stored_at': stored_at}
+
+    def is_fresh(self, key: str, entry: Dict[str, Any]) -> bool:
+        # TTL follows the requested URL, not a redirect target.
+        return time.time() - entry['stored_at'] < self.ttl_for(key.split(' ', 2)[1])
+
+    def put(self, key: str, url: str, status: int, headers: Mapping[str, str], body: bytes) -> None:
+        size = len(body)
+        if size > self.max_bytes:
+            return
+        with self._lock, self._conn:
+            self._insert(key, url, status, headers, sqlite3.Binary(body), size)
+
+    def put_file(
+        self, key: str, url: str, status: int, headers: Mapping[str, str], fileobj, size: int
+    ) -> None:
+        """Store a body spooled to `fileobj`, copying it into the row in chunks."""
+        if size > self.max_bytes:
+            return
+        fileobj.seek(0)
+        if not hasattr(self._conn, 'blobopen'):  # Python < 3.11
+            self.put(key, url, status, headers, fileobj.read())
+            return
+        with self._lock, self._conn:
+            rowid = self._insert(key, url, status, headers, None, size)
+            with self._conn.blobopen('responses', 'body', rowid) as blob:
+                for chunk in iter(lambda: fileobj.read(_BLOB_CHUNK), b''):
+                    blob.write(chunk)
+
+    def _insert(self, key, url, status, headers, body, size) -> int:
+        # body=None reserves a zero-filled blob of `size` bytes for put_file().
+        now = time.time()
+        old = self._conn.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+        cursor = self._conn.execute(
+            'INSERT OR REPLACE INTO responses '
+            '(key, url, status, headers, body, size, stored_at, accessed_at) '
+            'VALUES (?, ?, ?, ?, COALESCE(?, zeroblob(?)), ?, ?, ?)',
+            (key, url, status, json.dumps(dict(headers)), body, size, size, now, now),
+        )
+        rowid = cursor.lastrowid
+        self._total += size - (old[0] if old else 0)
+        if self._total > self.max_bytes:
+            self._evict()
+        return rowid
+
+    def refresh(self, key: str, headers: Mapping[str, str]) -> None:
+        """Mark an entry fresh again after a 304, picking up new validators."""
+        with self._lock, self._conn:
+            row = self._conn.execute('SELECT headers FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return
+            stored = CaseInsensitiveDict(json.loads(row[0]))
+            for name in ('ETag', 'Last-Modified', 'Cache-Control', 'Expires', 'Date'):
+                if name in headers:
+                    stored[name] = headers[name]
+            now = time.time()
+            self._conn.execute(
+                'UPDATE responses SET headers = ?, stored_at = ?, accessed_at = ? WHERE key = ?',
+                (json.dumps(dict(stored)), now, now, key),
+            )
+
+    def _evict(self) -> None:
+        # Other processes may share the file; re-read the real total first.
+        self._total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        target = int(self.max_bytes * 0.9)
+        doomed = []
+        for key, size in self._conn.execute('SELECT key, size FROM responses ORDER BY accessed_at'):
+            if self._total <= target:
+                break
+            doomed.append((key,))
+            self._total -= size
+        self._conn.executemany('DELETE FROM responses WHERE key = ?', doomed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, total = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses'
+            ).fetchone()
+        return {'path': self.path, 'entries': count, 'bytes': total, 'max_bytes': self.max_bytes}
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM responses')
+            self._total = 0
+        self._conn.execute('VACUUM')
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _match_host(url: str, hosts) -> Optional[str]:
+    """Return the entry of `hosts` that matches the URL's host or a parent domain."""
+    host = (urlsplit(url).hostname or '').lower()
+    while host:
+        if host in hosts:
+            return host
+        host = host.partition('.')[2]
+    return None
+
+
+def _is_cacheable(url: str, status: int) -> bool:
+    if 300 <= status < 400 and _match_host(url, _REDIRECT_CACHE_HOSTS) is not None:
+        return True
+    if status not in _CACHEABLE_STATUS:
+        return False
+    return status not in (404, 410) or _match_host(url, _NO_NEGATIVE_CACHE_HOSTS) is None
+
+
+def _response_from_entry(entry: Dict[str, Any]) -> requests.Response:
+    response = requests.Response()
+    response.status_code = entry['status']
+    response.reason = http.client.responses.get(entry['status'], '')
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    response.url = entry['url']
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    # Marking the body consumed makes iter_content() replay it from memory.
+    response._content = bytes(entry['body'])
+    response._content_consumed = True
+    response.from_cache = True
+    return response
+
+
+def _offline_miss(url: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 504
+    response.reason = 'Not Cached'
+    response.url = url
+    response._content = b''
+    response._content_consumed = True
+    response.from_cache = True
+    return response
+
+
+class CachedSession(requests.Session):
+    """requests.Session that serves GET/HEAD responses from a ResponseCache."""
+
+    def __init__(
+        self,
+        cache: Optional[ResponseCache] = None,
+        mode: Optional[str] = None,
+        min_interval: float = 0.0,
+        before_request: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Initialize session.
+
+        Args:
+            cache: Response store (default: ResponseCache() unless mode is off)
+            mode: 'on', 'off' or 'cache-only' (default: HTTP_CACHE_MODE or 'on')
+            min_interval: Minimum seconds between network requests
+            before_request: Called before every network request (e.g. a rate limiter)
+        """
+        super().__init__()
+        mode = (mode or os.environ.get('HTTP_CACHE_MODE') or 'on').strip().lower()
+        if mode not in MODES:
+            raise ValueError(f'Unknown HTTP cache mode: {mode} (expected one of {", ".join(MODES)})')
+        self.mode = mode
+        self.cache = None if mode == 'off' else (cache or ResponseCache())
+        self.min_interval = min_interval
+        self.before_request = before_request
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'offline_misses': 0}
+        self._pace_lock = threading.Lock()
+        self._next_request_at = 0.0
+
+    def _pace(self) -> None:
+        if self.before_request is not None:
+            self.before_request()
+        if self.min_interval <= 0:
+            return
+        with self._pace_lock:
+            now = time.monotonic()
+            start = max(now, self._next_request_at)
+            self._next_request_at = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+
+    def _network(self, method: str, url: str, **kwargs) -> requests.Response:
+        self._pace()
+        response = super().request(method, url, **kwargs)
+        response.from_cache = False
+        return response
+
+    def request(self, method, url, params=None, headers=None, **kwargs):
+        method = method.upper()
+        request_cache_control = CaseInsensitiveDict(headers or {}).get('Cache-Control', '').lower()
+        if self.cache is None or method not in ('GET', 'HEAD') or 'no-store' in request_cache_control:
+            return self._network(method, url, params=params, headers=headers, **kwargs)
+
+        accept = (headers or {}).get('Accept') or self.headers.get('Accept')
+        key = cache_key(method, url, params, accept, kwargs.get('allow_redirects', True))
+        entry = self.cache.get(key)
+
+        if entry is not None and (self.mode == 'cache-only' or self.cache.is_fresh(key, entry)):
+            self.stats['hits'] += 1
+            return _response_from_entry(entry)
+        if self.mode == 'cache-only':
+            self.stats['offline_misses'] += 1
+            return _offline_miss(url)
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            stored = CaseInsensitiveDict(entry['headers'])
+            if stored.get('ETag'):
+                request_headers['If-None-Match'] = stored['ETag']
+            if stored.get('Last-Modified'):
+                request_headers['If-Modified-Since'] = stored['Last-Modified']
+
+        response = self._network(method, url, params=params, headers=request_headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            self.stats['revalidated'] += 1
+            self.cache.refresh(key, response.headers)
+            return _response_from_entry(entry)
+
+        self.stats['misses'] += 1
+        cache_control = response.headers.get('Cache-Control', '').lower()
+        if _is_cacheable(url, response.status_code) and 'no-store' not in cache_control:
+            if method == 'HEAD':
+                self.cache.put(key, response.url, response.status_code, response.headers, b'')
+            elif kwargs.get('stream'):
+                self._tee_into_cache(key, response)
+            else:
+                self.cache.put(key, response.url, response.status_code, response.headers, response.content)
+        return response
+
+    def _tee_into_cache(self, key: str, response: requests.Response) -> None:
+        """
+        Cache a streamed body as the caller reads it.
+
+        Chunks are copied to a spooled temp file while they pass through
+        iter_content() (which .content and .text also use); the entry is
+        stored only if the body is read to the end without exceeding the
+        size cap, so partial reads and oversized bodies are never cached.
+        """
+        cache = self.cache
+        original = response.iter_content
+        teed = False
+
+        def iter_content(chunk_size=1, decode_unicode=False):
+            nonlocal teed
+            if teed:
+                yield from original(chunk_size, decode_unicode)
+                return
+            teed = True
+
+            def tee():
+                size = 0
+                with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MEMORY_BYTES) as spool:
+                    for chunk in original(chunk_size):
+                        if spool is not None:
+                            size += len(chunk)
+                            if size > cache.max_bytes:
+                                spool = None
+                            else:
+                                spool.write(chunk)
+                        yield chunk
+                    if spool is not None:
+                        cache.put_file(
+                            key, response.url, response.status_code, response.headers, spool, size
+                        )
+
+            chunks = tee()
+            if decode_unicode:
+                chunks = requests.utils.stream_decode_response_unicode(chunks, response)
+            yield from chunks
+
+        response.iter_content = iter_content
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(description='Inspect or clear the shared HTTP response cache')
+    parser.add_argument('--path', help='Cache database (default: HTTP_CACHE_DIR/responses.sqlite3)')
+    parser.add_argument('--clear', action='store_true', help='Delete all cached responses')
+    parser.add_argument('--stats', action='store_true', help='Print entry count and size')
+    args = parser.parse_args()
+
+    cache = ResponseCache(args.path)
+    if args.clear:
+        cache.clear()
+    stats = cache.stats()
+    print(json.dumps(stats, indent=2))
+    cache.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -5,10 +5,40 @@ Searches multiple literature databases and aggregates results.
 """
 
 import json
+import os
 import sys
 from typing import Dict, List
 from datetime import datetime
 
+# Default for --similarity; matches near_duplicates.DEFAULT_THRESHOLD.
+DEFAULT_THRESHOLD = 0.8
+
+# near_duplicates.py lives with the citation-management skill.
+_NEAR_DUPLICATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..',
+                                    'Metadata & Retrieval', 'citation-management', 'scripts')
+
+
+def _near_duplicate_index(threshold: float):
+    """Build a NearDuplicateIndex; only needed (and imported) for --fuzzy."""
+    try:
+        from near_duplicates import NearDuplicateIndex
+    except ImportError:
+        if _NEAR_DUPLICATES_DIR not in sys.path:
+            sys.path.append(_NEAR_DUPLICATES_DIR)
+        try:
+            from near_duplicates import NearDuplicateIndex
+        except ImportError:
+            raise ImportError(
+                "--fuzzy needs near_duplicates.py from the citation-management skill "
+                f"(looked in {os.path.normpath(_NEAR_DUPLICATES_DIR)}); install that skill "
+                "or put its scripts directory on PYTHONPATH"
+            ) from None
+    return NearDuplicateIndex(threshold=threshold)
+
+
+def _result_id(result: Dict) -> str:
+    return result.get('doi') or (result.get('title') or 'untitled')[:60]
+
 def format_search_results(results: List[Dict], output_format: str = 'json') -> str:
     """
     Format search results for output.
@@ -80,18 +110,26 @@ def format_search_results(results: List[Dict], output_format: str = 'json') -> s
     else:
         raise ValueError(f"Unknown format: {output_format}")
 
-def deduplicate_results(results: List[Dict]) -> List[Dict]:
+def deduplicate_results(results: List[Dict], fuzzy: bool = False,
+                        threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
     """
     Remove duplicate results based on DOI or title.
 
     Args:
         results: List of search results
+        fuzzy: Also drop near-duplicates (similar title + first author + year),
+            e.g. the same paper found in two databases, one without a DOI.
+            A match is never dropped when both results carry different DOIs
+            (series such as "... Part I" / "... Part II" match too); every
+            near-duplicate is reported on stderr.
+        threshold: Minimum similarity (0-1) for fuzzy matches
 
     Returns:
         Deduplicated list
     """
     seen_dois = set()
     seen_titles = set()
+    index = _near_duplicate_index(threshold) if fuzzy else None
     unique_results = []
 
     for result in results:
@@ -106,6 +144,24 @@ def deduplicate_results(results: List[Dict]) -> List[Dict]:
         if not doi and title in seen_titles:
             continue
 
+        # Near-duplicate of a result already kept
+        if index is not None:
+            authors = result.get('authors') or result.get('first_author')
+            matches = index.query(result.get('title', ''), authors, result.get('year'))
+            droppable = [
+                (i, score) for i, score in matches
+                if not (doi and unique_results[i].get('doi', '').lower().strip() not in ('', doi))
+            ]
+            if droppable:
+                i, score = droppable[0]
+                print(f"Near-duplicate (similarity {score:.2f}): kept {_result_id(unique_results[i])}, "
+                      f"dropped {_result_id(result)}", file=sys.stderr)
+                continue
+            for i, score in matches:
+                print(f"Possible near-duplicate (similarity {score:.2f}) with a different DOI: "
+                      f"kept {_result_id(unique_results[i])} and {_result_id(result)}", file=sys.stderr)
+            index.add(len(unique_results), result.get('title', ''), authors, result.get('year'))
+
         # Add to results
         if doi:
             seen_dois.add(doi)
@@ -217,6 +273,8 @@ def main():
         print("  --year-start YEAR        Filter by start year")
         print("  --year-end YEAR          Filter by end year")
         print("  --deduplicate            Remove duplicates")
+        print("  --fuzzy                  With --deduplicate, also remove near-duplicates")
+        print(f"  --similarity S           Minimum similarity for --fuzzy (default: {DEFAULT_THRESHOLD})")
         print("  --summary                Show summary statistics")
         sys.exit(1)
 
@@ -236,6 +294,8 @@ def main():
     year_start = None
     year_end = None
     do_dedup = False
+    fuzzy = False
+    similarity = DEFAULT_THRESHOLD
     show_summary = False
 
     i = 2
@@ -260,6 +320,12 @@ def main():
         elif arg == '--deduplicate':
             do_dedup = True
             i += 1
+        elif arg == '--fuzzy':
+            fuzzy = True
+            i += 1
+        elif arg == '--similarity' and i + 1 < len(sys.argv):
+            similarity = float(sys.argv[i + 1])
+            i += 2
         elif arg == '--summary':
             show_summary = True
             i += 1
@@ -268,7 +334,7 @@ def main():
 
     # Process results
     if do_dedup:
-        results = deduplicate_results(results)
+        results = deduplicate_results(results, fuzzy=fuzzy, threshold=similarity)
         print(f"After deduplication: {len(results)} results")
 
     if year_start or year_end:
@@ -5,15 +5,16 @@ Verifies DOIs, URLs, and citation metadata for accuracy.
 """
 
 import re
-import requests
 import json
 from typing import Dict, List, Tuple
 from urllib.parse import urlparse
-import time
+
+from http_cache import CachedSession
 
 class CitationVerifier:
     def __init__(self):
-        self.session = requests.Session()
+        # Rate limiting applies to network requests only; cache hits are free
+        self.session = CachedSession(min_interval=0.5)
         self.session.headers.update({
             'User-Agent': 'CitationVerifier/1.0 (Literature Review Tool)'
         })
@@ -132,8 +133,6 @@ class CitationVerifier:
             else:
                 report['failed'].append(doi)
 
-            time.sleep(0.5)  # Rate limiting
-
         return report
 
     def format_citation_apa(self, metadata: Dict) -> str:
@@ -4,15 +4,41 @@ Batch convert multiple files to Markdown using MarkItDown.
 
 This script demonstrates how to efficiently convert multiple files
 in a directory to Markdown format.
+
+Two backends are available:
+- thread: one shared MarkItDown instance in a thread pool. Fine for I/O-bound
+  inputs, but PDF/DOCX parsing is CPU-bound Python and the GIL serializes it.
+- process: worker processes, each with its own MarkItDown instance, receiving
+  files in chunks. Conversions run on all cores, and a file that exceeds the
+  per-file timeout gets its worker killed and replaced.
+
+Runs are incremental: a manifest in the output directory (see
+conversion_manifest.py) skips unchanged inputs and prunes outputs whose
+source was deleted. Use --force to reconvert everything.
 """
 
 import argparse
+import math
+import multiprocessing
+import time
+from collections import deque
+from multiprocessing.connection import wait
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, Iterator, List, Optional, Tuple
 from markitdown import MarkItDown
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import sys
 
+from conversion_manifest import ConversionManifest
+from markdown_writer import write_markdown
+
+BACKENDS = ('thread', 'process')
+
+
+def output_path(file_path: Path, output_dir: Path) -> Path:
+    """Markdown file written for `file_path`."""
+    return output_dir / f"{file_path.stem}.md"
+
 
 def convert_file(md: MarkItDown, file_path: Path, output_dir: Path, verbose: bool = False) -> tuple[bool, str, str]:
     """
@@ -34,16 +60,16 @@ def convert_file(md: MarkItDown, file_path: Path, output_dir: Path, verbose: boo
         result = md.convert(str(file_path))
         
         # Create output path
-        output_file = output_dir / f"{file_path.stem}.md"
-        
-        # Write content with metadata header
-        content = f"# {result.title or file_path.stem}\n\n"
-        content += f"**Source**: {file_path.name}\n"
-        content += f"**Format**: {file_path.suffix}\n\n"
-        content += "---\n\n"
-        content += result.text_content
+        output_file = output_path(file_path, output_dir)
         
-        output_file.write_text(content, encoding='utf-8')
+        # Stream metadata header and content to the file
+        header = (
+            f"# {result.title or file_path.stem}\n\n",
+            f"**Source**: {file_path.name}\n",
+            f"**Format**: {file_path.suffix}\n\n",
+            "---\n\n"
+        )
+        write_markdown(output_file, header, result.text_content)
         
         return True, str(file_path), f"✓ Converted to {output_file.name}"
         
@@ -51,6 +77,189 @@ def convert_file(md: MarkItDown, file_path: Path, output_dir: Path, verbose: boo
         return False, str(file_path), f"✗ Error: {str(e)}"
 
 
+def _convert_in_threads(
+    files: List[Path],
+    output_dir: Path,
+    workers: int,
+    verbose: bool,
+    enable_plugins: bool
+) -> Iterator[Tuple[bool, str, str]]:
+    """Convert files in a thread pool sharing one MarkItDown instance; yield results as they complete."""
+    md = MarkItDown(enable_plugins=enable_plugins)
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(convert_file, md, file_path, output_dir, verbose): file_path
+            for file_path in files
+        }
+        
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def _process_worker(conn, convert: Callable, convert_args: tuple, enable_plugins: bool) -> None:
+    """
+    Worker process loop: build a MarkItDown instance once, then call
+    convert(md, path, *convert_args) for the chunks of paths received on
+    `conn` until None arrives.
+    
+    Sends ('start', path) before and ('done', result) after each file, so the
+    parent can time every file individually.
+    """
+    md = MarkItDown(enable_plugins=enable_plugins)
+    while True:
+        try:
+            chunk = conn.recv()
+        except EOFError:
+            break
+        if chunk is None:
+            break
+        for path in chunk:
+            conn.send(('start', path))
+            conn.send(('done', convert(md, Path(path), *convert_args)))
+    conn.close()
+
+
+class _WorkerHandle:
+    """Parent-side state of one worker process."""
+    
+    def __init__(self, ctx, convert: Callable, convert_args: tuple, enable_plugins: bool):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_process_worker,
+            args=(child_conn, convert, convert_args, enable_plugins),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.pending: deque = deque()   # paths of the current chunk not finished yet
+        self.started: Optional[float] = None
+    
+    def assign(self, chunk: List[str]) -> None:
+        self.pending.extend(chunk)
+        self.started = None
+        self.conn.send(chunk)
+    
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+    
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+def run_in_processes(
+    files: List[Path],
+    convert: Callable,
+    convert_args: tuple = (),
+    workers: int = 4,
+    enable_plugins: bool = False,
+    timeout: Optional[float] = None,
+    chunksize: Optional[int] = None
+) -> Iterator[Tuple[str, Any, Optional[str]]]:
+    """
+    Run convert(md, path, *convert_args) for each file in worker processes,
+    each holding its own MarkItDown instance; yield results as they complete.
+    
+    Files are handed out in chunks of `chunksize` (default: about four chunks
+    per worker, at most 8 files each) to keep IPC overhead low. A file still
+    running after `timeout` seconds is reported as failed; its worker is
+    killed, the rest of its chunk is requeued and a fresh worker is started.
+    
+    `convert` must be a module-level function (it is sent to the workers).
+    
+    Yields:
+        (path, result, error): `result` is convert's return value, or None
+        with an `error` message if the file timed out or crashed its worker
+    """
+    paths = [str(f) for f in files]
+    workers = max(1, min(workers, len(paths)))
+    if chunksize is None:
+        chunksize = max(1, min(8, math.ceil(len(paths) / (workers * 4))))
+    queue = deque(paths[i:i + chunksize] for i in range(0, len(paths), chunksize))
+    ctx = multiprocessing.get_context()
+    
+    def spawn() -> _WorkerHandle:
+        return _WorkerHandle(ctx, convert, convert_args, enable_plugins)
+    
+    def feed(worker: _WorkerHandle) -> None:
+        if queue and not worker.pending:
+            worker.assign(queue.popleft())
+    
+    def replace(worker: _WorkerHandle, message: str) -> Tuple[_WorkerHandle, Tuple[str, Any, str]]:
+        """Fail the worker's current file, requeue the rest of its chunk, start a new worker."""
+        worker.kill()
+        failed = worker.pending.popleft()
+        if worker.pending:
+            queue.appendleft(list(worker.pending))
+        fresh = spawn()
+        feed(fresh)
+        return fresh, (failed, None, message)
+    
+    pool = [spawn() for _ in range(workers)]
+    try:
+        for worker in pool:
+            feed(worker)
+        
+        while any(w.pending for w in pool):
+            busy = [w for w in pool if w.pending]
+            wait_for = None
+            if timeout is not None:
+                now = time.monotonic()
+                deadlines = [w.started + timeout - now for w in busy if w.started is not None]
+                wait_for = max(0.0, min(deadlines)) if deadlines else timeout
+            ready = wait([w.conn for w in busy], timeout=wait_for)
+            
+            for i, worker in enumerate(pool):
+                if not worker.pending:
+                    continue
+                if worker.conn in ready:
+                    try:
+                        kind, payload = worker.conn.recv()
+                    except (EOFError, OSError):
+                        pool[i], result = replace(worker, "✗ Error: worker process exited unexpectedly")
+                        yield result
+                        continue
+                    if kind == 'start':
+                        worker.started = time.monotonic()
+                    else:
+                        path = worker.pending.popleft()
+                        worker.started = None
+                        feed(worker)
+                        yield path, payload, None
+                elif (timeout is not None and worker.started is not None
+                      and time.monotonic() - worker.started >= timeout):
+                    pool[i], result = replace(worker, f"✗ Error: timed out after {timeout:g}s (worker killed)")
+                    yield result
+    finally:
+        for worker in pool:
+            worker.stop()
+
+
+def _convert_in_processes(
+    files: List[Path],
+    output_dir: Path,
+    workers: int,
+    verbose: bool,
+    enable_plugins: bool,
+    timeout: Optional[float] = None,
+    chunksize: Optional[int] = None
+) -> Iterator[Tuple[bool, str, str]]:
+    """Convert files with run_in_processes; yield convert_file-style results as they complete."""
+    for path, result, error in run_in_processes(files, convert_file, (output_dir, verbose), workers,
+                                                enable_plugins, timeout, chunksize):
+        yield result if error is None else (False, path, error)
+
+
 def batch_convert(
     input_dir: Path,
     output_dir: Path,
@@ -58,7 +267,12 @@ def batch_convert(
     recursive: bool = False,
     workers: int = 4,
     verbose: bool = False,
-    enable_plugins: bool = False
+    enable_plugins: bool = False,
+    backend: str = 'thread',
+    timeout: Optional[float] = None,
+    chunksize: Optional[int] = None,
+    incremental: bool = True,
+    force: bool = False
 ) -> dict:
     """
     Batch convert files in a directory.
@@ -71,10 +285,24 @@ def batch_convert(
         workers: Number of parallel workers
         verbose: Print detailed messages
         enable_plugins: Enable MarkItDown plugins
+        backend: 'thread' (shared MarkItDown, GIL-bound) or 'process'
+            (one MarkItDown per worker process, uses all cores)
+        timeout: Per-file limit in seconds (process backend); the stuck
+            worker is killed and the file reported as failed
+        chunksize: Files sent to a worker process at a time (process backend)
+        incremental: Keep a manifest in output_dir; skip unchanged inputs and
+            delete outputs whose source is gone
+        force: Reconvert every input (the manifest is still updated)
         
     Returns:
-        Dictionary with conversion statistics
+        Dictionary with conversion statistics ('skipped' and 'pruned' count
+        unchanged inputs and removed outputs)
     """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}' (choose from {', '.join(BACKENDS)})")
+    if timeout is not None and backend != 'process':
+        print("Note: --timeout is only enforced by the process backend")
+    
     # Create output directory
     output_dir.mkdir(parents=True, exist_ok=True)
     
@@ -91,34 +319,52 @@ def batch_convert(
         for ext in extensions:
             files.extend(input_dir.glob(f"*{ext}"))
     
+    manifest = ConversionManifest(output_dir) if incremental else None
+    options = {'tool': 'batch_convert', 'plugins': enable_plugins}
+    pruned = []
+    if manifest is not None:
+        pruned = manifest.prune(input_dir, files)
+        for path in pruned:
+            print(f"✓ Removed {path.name} (source deleted)")
+    
     if not files:
         print(f"No files found with extensions: {', '.join(extensions)}")
-        return {'total': 0, 'success': 0, 'failed': 0}
+        if manifest is not None:
+            manifest.save()
+        return {'total': 0, 'success': 0, 'failed': 0, 'skipped': 0, 'pruned': len(pruned)}
     
     print(f"Found {len(files)} file(s) to convert")
     
-    # Create MarkItDown instance
-    md = MarkItDown(enable_plugins=enable_plugins)
+    # Skip inputs converted before with the same content and options
+    todo = files
+    if manifest is not None and not force:
+        todo = [f for f in files if not manifest.is_current(f, options)]
+        if len(todo) < len(files):
+            print(f"Skipping {len(files) - len(todo)} unchanged file(s)")
     
     # Convert files in parallel
     results = {
         'total': len(files),
         'success': 0,
         'failed': 0,
+        'skipped': len(files) - len(todo),
+        'pruned': len(pruned),
         'details': []
     }
     
-    with ThreadPoolExecutor(max_workers=workers) as executor:
-        futures = {
-            executor.submit(convert_file, md, file_path, output_dir, verbose): file_path
-            for file_path in files
-        }
-        
-        for future in as_completed(futures):
-            success, path, message = future.result()
-            
+    if not todo:
+        converted = iter(())
+    elif backend == 'process':
+        converted = _convert_in_processes(todo, output_dir, workers, verbose, enable_plugins, timeout, chunksize)
+    else:
+        converted = _convert_in_threads(todo, output_dir, workers, verbose, enable_plugins)
+    
+    try:
+        for success, path, message in converted:
             if success:
                 results['success'] += 1
+                if manifest is not None:
+                    manifest.record(Path(path), output_path(Path(path), output_dir), options)
             else:
                 results['failed'] += 1
             
@@ -129,6 +375,9 @@ def batch_convert(
             })
             
             print(message)
+    finally:
+        if manifest is not None:
+            manifest.save()
     
     return results
 
@@ -150,6 +399,12 @@ Examples:
   
   # Enable plugins
   python batch_convert.py input/ output/ --plugins
+  
+  # Reconvert everything, ignoring the incremental manifest
+  python batch_convert.py input/ output/ --force
+  
+  # CPU-bound PDFs/DOCX: worker processes, give up on a file after 120s
+  python batch_convert.py papers/ output/ --backend process --workers 8 --timeout 120
         """
     )
     
@@ -171,6 +426,32 @@ Examples:
         default=4,
         help='Number of parallel workers (default: 4)'
     )
+    parser.add_argument(
+        '--backend', '-b',
+        choices=BACKENDS,
+        default='thread',
+        help='thread: shared instance, GIL-bound; process: one instance per worker process (default: thread)'
+    )
+    parser.add_argument(
+        '--timeout', '-t',
+        type=float,
+        help='Per-file timeout in seconds; the stuck worker is killed (process backend)'
+    )
+    parser.add_argument(
+        '--chunksize',
+        type=int,
+        help='Files sent to a worker process at a time (process backend, default: auto)'
+    )
+    parser.add_argument(
+        '--force', '-f',
+        action='store_true',
+        help='Reconvert unchanged files too'
+    )
+    parser.add_argument(
+        '--no-manifest',
+        action='store_true',
+        help='Do not read or write the incremental manifest (no skipping or pruning)'
+    )
     parser.add_argument(
         '--verbose', '-v',
         action='store_true',
@@ -201,7 +482,12 @@ Examples:
         recursive=args.recursive,
         workers=args.workers,
         verbose=args.verbose,
-        enable_plugins=args.plugins
+        enable_plugins=args.plugins,
+        backend=args.backend,
+        timeout=args.timeout,
+        chunksize=args.chunksize,
+        incremental=not args.no_manifest,
+        force=args.force
     )
     
     # Print summary
@@ -211,7 +497,10 @@ Examples:
     print(f"Total files:     {results['total']}")
     print(f"Successful:      {results['success']}")
     print(f"Failed:          {results['failed']}")
-    print(f"Success rate:    {results['success']/results['total']*100:.1f}%" if results['total'] > 0 else "N/A")
+    print(f"Skipped:         {results.get('skipped', 0)} (unchanged)")
+    print(f"Pruned:          {results.get('pruned', 0)} (source deleted)")
+    attempted = results['success'] + results['failed']
+    print(f"Success rate:    {results['success']/attempted*100:.1f}%" if attempted > 0 else "N/A")
     
     # Show failed files if any
     if results['failed'] > 0:
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch_convert backends on a generated PDF/DOCX corpus.
+
+Writes a fixture corpus of multi-page PDFs and DOCX files (plain standard
+library, no PDF/Word tooling needed), then times the thread backend and the
+process backend at increasing worker counts and prints files/s and speedup
+relative to one worker.
+
+Usage:
+  python bench_batch_convert.py
+  python bench_batch_convert.py --pdfs 40 --docx 40 --pages 20 --workers 1 2 4 8
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from batch_convert import batch_convert
+
+_WORDS = ("results method sample protein analysis model neural data signal cell "
+          "growth measure effect control study figure table error value rate").split()
+
+
+def _sentence(seed: int, length: int = 14) -> str:
+    return ' '.join(_WORDS[(seed * 7 + i * 3) % len(_WORDS)] for i in range(length)).capitalize() + '.'
+
+
+def write_pdf(path: Path, pages: int, seed: int = 0) -> None:
+    """Write a text PDF with `pages` pages of ~45 lines each."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        lines = [f"Page {page + 1} of document {seed}"] + [_sentence(seed + page * 50 + i) for i in range(44)]
+        text = ' '.join(f"({line}) Tj T*" for line in lines)
+        stream = f"BT /F1 10 Tf 12 TL 50 760 Td {text} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode('latin-1'))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('latin-1'))
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode('latin-1'))
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('latin-1'))
+    path.write_bytes(out.getvalue())
+
+
+def write_docx(path: Path, paragraphs: int, seed: int = 0) -> None:
+    """Write a minimal DOCX with headings, paragraphs and a table."""
+    ns = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    body = []
+    for i in range(paragraphs):
+        if i % 20 == 0:
+            body.append(f'<w:p><w:pPr><w:pStyle w:val="Heading1"/></w:pPr>'
+                        f'<w:r><w:t>Section {i // 20 + 1}</w:t></w:r></w:p>')
+        body.append(f'<w:p><w:r><w:t>{escape(_sentence(seed + i, 30))}</w:t></w:r></w:p>')
+    rows = ''.join(
+        '<w:tr>' + ''.join(f'<w:tc><w:p><w:r><w:t>{r * c}</w:t></w:r></w:p></w:tc>' for c in range(4)) + '</w:tr>'
+        for r in range(10)
+    )
+    body.append(f'<w:tbl>{rows}</w:tbl>')
+    document = f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document {ns}><w:body>{"".join(body)}</w:body></w:document>'
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as z:
+        z.writestr('[Content_Types].xml',
+                   '<?xml version="1.0" encoding="UTF-8"?>'
+                   '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                   '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                   '<Default Extension="xml" ContentType="application/xml"/>'
+                   '<Override PartName="/word/document.xml" ContentType="application/'
+                   'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/></Types>')
+        z.writestr('_rels/.rels',
+                   '<?xml version="1.0" encoding="UTF-8"?>'
+                   '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                   '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+                   'relationships/officeDocument" Target="word/document.xml"/></Relationships>')
+        z.writestr('word/document.xml', document)
+
+
+def write_corpus(directory: Path, pdfs: int, docx: int, pages: int) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    for i in range(pdfs):
+        write_pdf(directory / f"paper_{i:04d}.pdf", pages, seed=i)
+    for i in range(docx):
+        write_docx(directory / f"report_{i:04d}.docx", pages * 15, seed=i)
+
+
+def _run(corpus: Path, backend: str, workers: int) -> tuple:
+    with tempfile.TemporaryDirectory() as out_dir:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = batch_convert(corpus, Path(out_dir), extensions=['.pdf', '.docx'],
+                                    workers=workers, backend=backend, incremental=False)
+        return time.perf_counter() - start, results
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(description='Benchmark batch_convert thread vs process backends')
+    parser.add_argument('--pdfs', type=int, default=24, help='Generated PDFs (default: 24)')
+    parser.add_argument('--docx', type=int, default=24, help='Generated DOCX files (default: 24)')
+    parser.add_argument('--pages', type=int, default=10, help='Pages per PDF; DOCX get 15x as many paragraphs (default: 10)')
+    parser.add_argument('--workers', type=int, nargs='+', help='Worker counts to try (default: 1, 2, 4, ... up to the CPU count)')
+    parser.add_argument('--corpus', type=Path, help='Use an existing directory instead of generating one')
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({1, cpus} | {2 ** i for i in range(1, cpus.bit_length()) if 2 ** i <= cpus})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = args.corpus
+        if corpus is None:
+            corpus = Path(tmp) / 'corpus'
+            write_corpus(corpus, args.pdfs, args.docx, args.pages)
+        files = sum(1 for p in corpus.iterdir() if p.suffix in ('.pdf', '.docx'))
+        print(f"Corpus: {files} files in {corpus} | CPUs: {cpus}")
+        print(f"{'backend':<8} {'workers':>7} {'seconds':>8} {'files/s':>8} {'speedup':>8} {'failed':>6}")
+
+        for backend in ('thread', 'process'):
+            baseline = None
+            for workers in worker_counts:
+                seconds, results = _run(corpus, backend, workers)
+                baseline = baseline or seconds
+                print(f"{backend:<8} {workers:>7} {seconds:>8.2f} {results['total'] / seconds:>8.1f} "
+                      f"{baseline / seconds:>7.2f}x {results['failed']:>6}")
+
+
+if __name__ == '__main__':
+    main()
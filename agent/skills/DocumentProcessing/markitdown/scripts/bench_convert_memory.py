@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Measure peak memory of writing a converted document: the previous
+concatenate-then-write_text path against the streaming writer.
+
+Generates a 500-page text PDF (see bench_batch_convert.write_pdf), converts it
+once per mode in a fresh subprocess and reports:
+- write peak: extra Python memory allocated while producing the .md file
+  (tracemalloc, started after conversion)
+- process peak RSS: maximum resident size of the whole conversion
+
+--synthetic-mb skips the PDF and writes a synthetic body of that size, to
+show the writer alone at scanned-book scale.
+
+Usage:
+  python bench_convert_memory.py
+  python bench_convert_memory.py --pages 500
+  python bench_convert_memory.py --synthetic-mb 200
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from convert_literature import _paper_header
+from markdown_writer import write_markdown
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MODES = ('legacy', 'streaming')
+
+
+def legacy_write(output_file: Path, metadata: dict, stem: str, body: str) -> None:
+    """The previous convert_paper output path: build one string, then write_text."""
+    content = ''
+    for piece in _paper_header(metadata, stem):
+        content += piece
+    content += body
+    output_file.write_text(content, encoding='utf-8')
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _child(mode: str, source: str, output: str, synthetic_mb: float) -> None:
+    """Convert (or synthesize) one document and write it with `mode`; print a JSON line."""
+    start = time.perf_counter()
+    if synthetic_mb:
+        line = 'Synthetic body text of a scanned book page, repeated to the requested size.\n'
+        body = line * int(synthetic_mb * 1024 * 1024 / len(line))
+    else:
+        from markitdown import MarkItDown
+        body = MarkItDown().convert(source).text_content
+    convert_seconds = time.perf_counter() - start
+
+    metadata = {
+        'title': 'Memory benchmark',
+        'source_file': Path(source).name,
+        'converted_date': datetime.now().isoformat()
+    }
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    if mode == 'legacy':
+        legacy_write(Path(output), metadata, Path(source).stem, body)
+    else:
+        write_markdown(Path(output), _paper_header(metadata, Path(source).stem), body)
+    write_seconds = time.perf_counter() - start
+    write_peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    print(json.dumps({
+        'mode': mode,
+        'text_mb': len(body) / (1024 * 1024),
+        'convert_seconds': convert_seconds,
+        'write_seconds': write_seconds,
+        'write_peak_mb': write_peak / (1024 * 1024),
+        'peak_rss_mb': _peak_rss_mb(),
+        'output_mb': os.path.getsize(output) / (1024 * 1024)
+    }))
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(description='Peak memory of legacy vs streaming Markdown output')
+    parser.add_argument('--pages', type=int, default=500, help='Pages in the generated PDF (default: 500)')
+    parser.add_argument('--pdf', type=Path, help='Use an existing document instead of generating one')
+    parser.add_argument('--synthetic-mb', type=float, default=0,
+                        help='Skip conversion and write a synthetic body of this many MB')
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'OUTPUT'), help=argparse.SUPPRESS)
+    parser.add_argument('--source', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child[0], args.source, args.child[1], args.synthetic_mb)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = args.pdf
+        if source is None and not args.synthetic_mb:
+            from bench_batch_convert import write_pdf
+            source = Path(tmp) / f'book_{args.pages}_pages.pdf'
+            write_pdf(source, args.pages)
+            print(f"Generated {source.name} ({source.stat().st_size / (1024 * 1024):.1f} MB)")
+        source = source or Path(tmp) / 'synthetic.pdf'
+
+        print(f"{'mode':<10} {'text MB':>8} {'write peak MB':>14} {'peak RSS MB':>12} {'write s':>8} {'convert s':>10}")
+        for mode in MODES:
+            output = Path(tmp) / f'{mode}.md'
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child', mode, str(output),
+                 '--source', str(source), '--synthetic-mb', str(args.synthetic_mb)],
+                capture_output=True, text=True, check=True
+            )
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            rss = f"{r['peak_rss_mb']:.1f}" if r['peak_rss_mb'] is not None else 'n/a'
+            print(f"{r['mode']:<10} {r['text_mb']:>8.1f} {r['write_peak_mb']:>14.1f} {rss:>12} "
+                  f"{r['write_seconds']:>8.2f} {r['convert_seconds']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Incremental conversion manifest shared by batch_convert.py,
+convert_literature.py and convert_with_ai.py.
+
+A JSON manifest in the output directory (.markitdown_manifest.json) records,
+for every converted source: content hash (SHA-256), size, mtime, the
+converter options and the output path. On the next run:
+- a source whose size and mtime are unchanged is skipped without reading it
+- a touched source is re-hashed and skipped if its content is unchanged
+- a changed source, changed options or a missing output means reconversion
+- outputs whose source file disappeared are deleted (prune)
+
+Usage:
+  python conversion_manifest.py markdown/            # show manifest summary
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MANIFEST_NAME = '.markitdown_manifest.json'
+MANIFEST_VERSION = 1
+_HASH_BLOCK = 1 << 20
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ConversionManifest:
+    """Per-output-directory record of converted sources."""
+
+    def __init__(self, output_dir: Path, autosave_every: int = 25):
+        """
+        Load (or start) the manifest of `output_dir`.
+
+        Args:
+            output_dir: Conversion output directory; the manifest lives inside it
+            autosave_every: Save after this many record() calls, so an
+                interrupted run keeps most of its progress
+        """
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / MANIFEST_NAME
+        self.autosave_every = autosave_every
+        self.entries: Dict[str, Dict] = {}
+        self._stats: Dict[str, Tuple[str, int, int]] = {}
+        self._unsaved = 0
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == MANIFEST_VERSION:
+                    self.entries = data.get('entries', {})
+            except (OSError, ValueError) as e:
+                print(f"Warning: ignoring unreadable manifest {self.path}: {e}")
+
+    @staticmethod
+    def key(source: Path) -> str:
+        return str(Path(source).resolve())
+
+    def _fingerprint(self, source: Path, entry: Optional[Dict]) -> Tuple[str, int, int]:
+        """(sha256, size, mtime_ns) of `source`; the hash is reused while size and mtime match."""
+        st = os.stat(source)
+        if entry and entry.get('size') == st.st_size and entry.get('mtime_ns') == st.st_mtime_ns:
+            return entry['sha256'], st.st_size, st.st_mtime_ns
+        return file_sha256(source), st.st_size, st.st_mtime_ns
+
+    def is_current(self, source: Path, options: Dict) -> bool:
+        """True if `source` was converted with the same content and options and its output still exists."""
+        key = self.key(source)
+        entry = self.entries.get(key)
+        fingerprint = self._fingerprint(source, entry)
+        self._stats[key] = fingerprint
+        if not entry or entry.get('options') != options:
+            return False
+        if not (self.output_dir / entry['output']).exists():
+            return False
+        if entry['sha256'] != fingerprint[0]:
+            return False
+        if entry.get('mtime_ns') != fingerprint[2]:
+            entry['mtime_ns'] = fingerprint[2]  # touched but unchanged: skip hashing next time
+            self._unsaved += 1
+        return True
+
+    def get(self, source: Path) -> Optional[Dict]:
+        return self.entries.get(self.key(source))
+
+    def record(self, source: Path, output: Path, options: Dict, **extra) -> None:
+        """Record a successful conversion of `source` into `output` (extra fields are stored as-is)."""
+        key = self.key(source)
+        sha, size, mtime_ns = self._stats.pop(key, None) or self._fingerprint(source, None)
+        try:
+            output_rel = str(Path(output).resolve().relative_to(self.output_dir.resolve()))
+        except ValueError:
+            output_rel = str(Path(output).resolve())
+        self.entries[key] = dict(
+            extra,
+            sha256=sha,
+            size=size,
+            mtime_ns=mtime_ns,
+            options=options,
+            output=output_rel,
+            converted=datetime.now().isoformat(timespec='seconds'),
+        )
+        self._unsaved += 1
+        if self._unsaved >= self.autosave_every:
+            self.save()
+
+    def forget(self, source: Path) -> None:
+        """Drop the record of `source`, so the next run converts it again."""
+        if self.entries.pop(self.key(source), None) is not None:
+            self._unsaved += 1
+
+    def prune(self, input_root: Path, present: Iterable[Path]) -> List[Path]:
+        """
+        Forget sources under `input_root` that are no longer present and
+        delete their outputs (unless another source still writes there).
+
+        Args:
+            input_root: Directory that was scanned for sources
+            present: Sources found in this scan
+
+        Returns:
+            Deleted output files
+        """
+        root = str(Path(input_root).resolve())
+        keep = {self.key(p) for p in present}
+        gone = [k for k in self.entries
+                if (k == root or k.startswith(root + os.sep)) and k not in keep and not os.path.exists(k)]
+        if not gone:
+            return []
+
+        orphaned = {self.entries.pop(key)['output'] for key in gone}
+        still_used = {entry['output'] for entry in self.entries.values()}
+
+        deleted = []
+        for output in sorted(orphaned - still_used):
+            path = self.output_dir / output
+            if path.exists():
+                path.unlink()
+                deleted.append(path)
+        self._unsaved += 1
+        return deleted
+
+    def save(self) -> None:
+        """Write the manifest atomically."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.output_dir, prefix='.manifest-', suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'entries': self.entries}, f, indent=1, ensure_ascii=False)
+        os.replace(tmp, self.path)
+        self._unsaved = 0
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(description='Show the incremental conversion manifest of an output directory')
+    parser.add_argument('output_dir', type=Path, help='Conversion output directory')
+    args = parser.parse_args()
+
+    manifest = ConversionManifest(args.output_dir)
+    if not manifest.entries:
+        print(f"No manifest entries in {manifest.path}")
+        return
+    missing = sum(1 for k in manifest.entries if not os.path.exists(k))
+    total_mb = sum(e.get('size', 0) for e in manifest.entries.values()) / (1024 * 1024)
+    print(f"{manifest.path}: {len(manifest.entries)} sources ({total_mb:.1f} MB), {missing} missing on disk")
+    for key, entry in sorted(manifest.entries.items()):
+        print(f"  {entry['converted']}  {entry['sha256'][:12]}  {key} -> {entry['output']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,13 @@ Convert scientific literature PDFs to Markdown for analysis and review.
 
 This script is specifically designed for converting academic papers,
 organizing them, and preparing them for literature review workflows.
+
+Re-runs only convert new or changed PDFs (see conversion_manifest.py);
+papers whose PDF was removed are pruned from the output and the index.
+
+With --workers N, papers are converted in N worker processes (see
+batch_convert.run_in_processes); the index is the same whatever order the
+papers finish in, and a failing or hanging PDF only fails that paper.
 """
 
 import argparse
@@ -11,10 +18,14 @@ import json
 import re
 import sys
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional, Tuple
 from markitdown import MarkItDown
 from datetime import datetime
 
+from batch_convert import run_in_processes
+from conversion_manifest import ConversionManifest
+from markdown_writer import write_markdown
+
 
 def extract_metadata_from_filename(filename: str) -> Dict[str, str]:
     """
@@ -42,6 +53,34 @@ def extract_metadata_from_filename(filename: str) -> Dict[str, str]:
     return metadata
 
 
+def _paper_header(metadata: Dict, default_title: str) -> Iterator[str]:
+    """Front matter, title and document information section of a converted paper."""
+    title = metadata.get('title', default_title)
+    
+    yield "---\n"
+    yield f"title: \"{title}\"\n"
+    if 'author' in metadata:
+        yield f"author: \"{metadata['author']}\"\n"
+    if 'year' in metadata:
+        yield f"year: {metadata['year']}\n"
+    yield f"source: \"{metadata['source_file']}\"\n"
+    yield f"converted: \"{metadata['converted_date']}\"\n"
+    yield "---\n\n"
+    
+    # Title
+    yield f"# {title}\n\n"
+    
+    # Metadata section
+    yield "## Document Information\n\n"
+    if 'author' in metadata:
+        yield f"**Author**: {metadata['author']}\n"
+    if 'year' in metadata:
+        yield f"**Year**: {metadata['year']}\n"
+    yield f"**Source File**: {metadata['source_file']}\n"
+    yield f"**Converted**: {metadata['converted_date']}\n\n"
+    yield "---\n\n"
+
+
 def convert_paper(
     md: MarkItDown,
     input_file: Path,
@@ -85,35 +124,9 @@ def convert_paper(
         
         output_file = output_subdir / f"{input_file.stem}.md"
         
-        # Create formatted Markdown with front matter
-        content = "---\n"
-        content += f"title: \"{metadata.get('title', input_file.stem)}\"\n"
-        if 'author' in metadata:
-            content += f"author: \"{metadata['author']}\"\n"
-        if 'year' in metadata:
-            content += f"year: {metadata['year']}\n"
-        content += f"source: \"{metadata['source_file']}\"\n"
-        content += f"converted: \"{metadata['converted_date']}\"\n"
-        content += "---\n\n"
-        
-        # Add title
-        content += f"# {metadata.get('title', input_file.stem)}\n\n"
-        
-        # Add metadata section
-        content += "## Document Information\n\n"
-        if 'author' in metadata:
-            content += f"**Author**: {metadata['author']}\n"
-        if 'year' in metadata:
-            content += f"**Year**: {metadata['year']}\n"
-        content += f"**Source File**: {metadata['source_file']}\n"
-        content += f"**Converted**: {metadata['converted_date']}\n\n"
-        content += "---\n\n"
-        
-        # Add content
-        content += result.text_content
-        
-        # Write to file
-        output_file.write_text(content, encoding='utf-8')
+        # Stream front matter, info section and body to the file
+        write_markdown(output_file, _paper_header(metadata, input_file.stem), result.text_content)
+        metadata['output_file'] = output_file.relative_to(output_dir).as_posix()
         
         print(f"✓ Saved to: {output_file}")
         
@@ -124,14 +137,67 @@ def convert_paper(
         return False, {'source_file': input_file.name, 'error': str(e)}
 
 
+def convert_papers_in_workers(
+    pdf_files: List[Path],
+    output_dir: Path,
+    organize_by_year: bool,
+    workers: int,
+    timeout: Optional[float] = None
+) -> Iterator[Tuple[Path, bool, Dict]]:
+    """
+    Run convert_paper over `pdf_files` in worker processes.
+    
+    Yields (pdf_file, success, metadata) in completion order. A paper whose
+    worker timed out or crashed is yielded as a failure; the batch goes on.
+    """
+    for path, result, error in run_in_processes(pdf_files, convert_paper, (output_dir, organize_by_year),
+                                                workers=workers, timeout=timeout):
+        pdf_file = Path(path)
+        if error is None:
+            yield (pdf_file, *result)
+        else:
+            error = error.replace('✗ Error: ', '')
+            print(f"✗ Error converting {pdf_file.name}: {error}")
+            yield pdf_file, False, {'source_file': pdf_file.name, 'error': error}
+
+
+def _index_order(paper: Dict) -> tuple:
+    """Sort key for the index: year, title, then file names so ties never depend on input order."""
+    return (
+        paper.get('year', '9999'),
+        paper.get('title', ''),
+        paper.get('source_file', ''),
+        paper.get('output_file', '')
+    )
+
+
+class IndexBuilder:
+    """Collects paper metadata as conversions complete; writes the index in a fixed order."""
+    
+    def __init__(self, output_dir: Path):
+        self.output_dir = output_dir
+        self.papers: Dict[str, Dict] = {}
+        self.failed: List[Dict] = []
+    
+    def add(self, metadata: Dict) -> None:
+        key = metadata.get('output_file') or metadata.get('source_file', '')
+        self.papers[key] = metadata
+    
+    def add_failure(self, metadata: Dict) -> None:
+        self.failed.append(metadata)
+    
+    def sorted_papers(self) -> List[Dict]:
+        return sorted(self.papers.values(), key=_index_order)
+    
+    def write(self) -> None:
+        create_index(self.sorted_papers(), self.output_dir)
+
+
 def create_index(papers: List[Dict], output_dir: Path):
     """Create an index/catalog of all converted papers."""
     
     # Sort by year (if available) and title
-    papers_sorted = sorted(
-        papers,
-        key=lambda x: (x.get('year', '9999'), x.get('title', ''))
-    )
+    papers_sorted = sorted(papers, key=_index_order)
     
     # Create Markdown index
     index_content = "# Literature Review Index\n\n"
@@ -192,6 +258,12 @@ Examples:
   # Create index of all papers
   python convert_literature.py papers/ output/ --create-index
   
+  # Nightly re-run: only new/changed PDFs are converted
+  python convert_literature.py pdfs/ output/ --create-index
+  
+  # Large reading list: 8 worker processes, give up on a PDF after 5 minutes
+  python convert_literature.py pdfs/ output/ --create-index --workers 8 --timeout 300
+  
 Filename Conventions:
   For best results, name your PDFs using this pattern:
     Author_Year_Title.pdf
@@ -219,6 +291,27 @@ Filename Conventions:
         action='store_true',
         help='Search subdirectories recursively'
     )
+    parser.add_argument(
+        '--force', '-f',
+        action='store_true',
+        help='Reconvert papers whose PDF is unchanged'
+    )
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=1,
+        help='Convert papers in this many worker processes (default: 1, serial)'
+    )
+    parser.add_argument(
+        '--timeout', '-t',
+        type=float,
+        help='Per-paper timeout in seconds with --workers > 1; the stuck worker is killed'
+    )
+    parser.add_argument(
+        '--no-manifest',
+        action='store_true',
+        help='Do not read or write the incremental manifest (no skipping or pruning)'
+    )
     
     args = parser.parse_args()
     
@@ -237,45 +330,80 @@ Filename Conventions:
     else:
         pdf_files = list(args.input_dir.glob("*.pdf"))
     
+    # Drop outputs of PDFs that were removed since the last run
+    manifest = None if args.no_manifest else ConversionManifest(args.output_dir)
+    options = {'tool': 'convert_literature', 'organize_by_year': args.organize_by_year}
+    if manifest is not None:
+        for path in manifest.prune(args.input_dir, pdf_files):
+            print(f"✓ Removed {path.name} (PDF deleted)")
+        manifest.save()
+    
     if not pdf_files:
         print("No PDF files found")
         sys.exit(1)
     
     print(f"Found {len(pdf_files)} PDF file(s)")
     
-    # Create MarkItDown instance
-    md = MarkItDown()
-    
-    # Convert all papers
-    results = []
+    index = IndexBuilder(args.output_dir)
     success_count = 0
+    skipped_count = 0
     
+    # Unchanged since the last run: reuse their metadata for the index
+    todo = []
     for pdf_file in pdf_files:
-        success, metadata = convert_paper(
-            md,
-            pdf_file,
-            args.output_dir,
-            args.organize_by_year
+        if manifest is not None and not args.force and manifest.is_current(pdf_file, options):
+            skipped_count += 1
+            index.add(manifest.get(pdf_file)['metadata'])
+        else:
+            todo.append(pdf_file)
+    
+    # Convert the rest, serially or in worker processes; results arrive as papers finish
+    if args.workers > 1 and len(todo) > 1:
+        print(f"Converting {len(todo)} paper(s) with {args.workers} workers")
+        completed = convert_papers_in_workers(todo, args.output_dir, args.organize_by_year,
+                                              args.workers, args.timeout)
+    else:
+        md = MarkItDown()
+        completed = (
+            (pdf_file, *convert_paper(md, pdf_file, args.output_dir, args.organize_by_year))
+            for pdf_file in todo
         )
-        
-        if success:
-            success_count += 1
-            results.append(metadata)
+    
+    try:
+        for pdf_file, success, metadata in completed:
+            if success:
+                success_count += 1
+                index.add(metadata)
+                if manifest is not None:
+                    manifest.record(pdf_file, args.output_dir / metadata['output_file'], options,
+                                    metadata=metadata)
+            else:
+                index.add_failure(metadata)
+    finally:
+        if manifest is not None:
+            manifest.save()
     
     # Create index if requested
-    if args.create_index and results:
-        create_index(results, args.output_dir)
+    if args.create_index and index.papers:
+        index.write()
     
     # Print summary
     print("\n" + "="*50)
     print("CONVERSION SUMMARY")
     print("="*50)
+    attempted = len(pdf_files) - skipped_count
     print(f"Total papers:    {len(pdf_files)}")
     print(f"Successful:      {success_count}")
-    print(f"Failed:          {len(pdf_files) - success_count}")
-    print(f"Success rate:    {success_count/len(pdf_files)*100:.1f}%")
+    print(f"Failed:          {attempted - success_count}")
+    print(f"Skipped:         {skipped_count} (unchanged)")
+    print(f"Success rate:    {success_count/attempted*100:.1f}%" if attempted else "Success rate:    N/A")
+    
+    if index.failed:
+        print("\nFailed papers:")
+        for failure in sorted(index.failed, key=lambda m: m['source_file']):
+            print(f"  - {failure['source_file']}: {failure['error']}")
     
-    sys.exit(0 if success_count == len(pdf_files) else 1)
+    sys.exit(0 if success_count == attempted else 1)
 
 
 if __name__ == '__main__':
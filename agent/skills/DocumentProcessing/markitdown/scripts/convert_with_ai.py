@@ -4,15 +4,49 @@ Convert documents to Markdown with AI-enhanced image descriptions.
 
 This script demonstrates how to use MarkItDown with OpenRouter to generate
 detailed descriptions of images in documents (PowerPoint, PDFs with images, etc.)
+
+An unchanged input converted before with the same model and prompt is not
+sent to the model again (see conversion_manifest.py); use --force to redo it.
+
+Image descriptions are generated in a batch rather than one by one:
+1. The document is converted with a stand-in client that records every
+   image MarkItDown wants described and returns a placeholder
+2. The distinct images are described concurrently (--concurrency, --rpm),
+   reusing descriptions cached by image hash, model and prompt
+3. The placeholders are replaced in document order
+
+For offline testing, point --base-url at stub_openai_server.py.
 """
 
 import argparse
+import base64
+import hashlib
+import json
 import os
+import re
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Optional
 from markitdown import MarkItDown
 from openai import OpenAI
 
+from conversion_manifest import ConversionManifest
+from markdown_writer import write_markdown
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+DEFAULT_CONCURRENCY = 4
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "markitdown" / "image-descriptions"
+
+_PLACEHOLDER = "@@markitdown-image-{}@@"
+_PLACEHOLDER_RE = re.compile(r"@@markitdown-image-([0-9a-f]{64})@@")
+_ALT_TEXT_RE = re.compile(r"!\[([^\]\n]*)\]\(")
+
 
 # Predefined prompts for different use cases
 PROMPTS = {
@@ -67,13 +101,162 @@ Be professional and precise.
 }
 
 
+class DescriptionCache:
+    """Image descriptions on disk, one JSON file per (image, model, prompt) hash."""
+    
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = Path(cache_dir or os.environ.get('MARKITDOWN_IMAGE_CACHE', DEFAULT_CACHE_DIR))
+    
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+    
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)['description']
+        except (OSError, ValueError, KeyError):
+            return None
+    
+    def put(self, key: str, description: str, model: str) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'description': description, 'model': model,
+                       'created': datetime.now().isoformat(timespec='seconds')}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+
+class RateLimiter:
+    """Spaces request starts at least 60/rpm seconds apart, across threads."""
+    
+    def __init__(self, requests_per_minute: Optional[float] = None):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+    
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class _CollectingClient:
+    """
+    Stand-in for the OpenAI client during conversion. Each image caption
+    request is recorded under a hash of (model, prompt, image) and answered
+    with a placeholder that is replaced once the real descriptions exist.
+    """
+    
+    def __init__(self):
+        self.requests: Dict[str, Dict] = {}   # key -> create() kwargs, in first-seen order
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+    
+    @staticmethod
+    def request_key(model: str, messages: List[Dict]) -> str:
+        digest = hashlib.sha256(model.encode('utf-8'))
+        for message in messages:
+            content = message.get('content')
+            parts = content if isinstance(content, list) else [{'type': 'text', 'text': content or ''}]
+            for part in parts:
+                if part.get('type') == 'text':
+                    digest.update(b'\0text\0' + part['text'].encode('utf-8'))
+                elif part.get('type') == 'image_url':
+                    url = part['image_url']['url']
+                    # Hash the decoded image so the data-URI mimetype does not matter
+                    data = base64.b64decode(url.split(',', 1)[1]) if url.startswith('data:') else url.encode('utf-8')
+                    digest.update(b'\0image\0' + data)
+        return digest.hexdigest()
+    
+    def _create(self, model: str, messages: List[Dict], **kwargs):
+        key = self.request_key(model, messages)
+        self.requests.setdefault(key, dict(kwargs, model=model, messages=messages))
+        self.calls += 1
+        message = SimpleNamespace(content=_PLACEHOLDER.format(key))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def describe_images(
+    client,
+    requests: Dict[str, Dict],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    requests_per_minute: Optional[float] = None,
+    cache: Optional[DescriptionCache] = None
+) -> Dict[str, Optional[str]]:
+    """
+    Run recorded caption requests, at most `concurrency` at a time and no
+    more than `requests_per_minute`, skipping those already in `cache`.
+    
+    Returns:
+        key -> description (None if the request failed)
+    """
+    descriptions: Dict[str, Optional[str]] = {}
+    todo = []
+    for key, request in requests.items():
+        cached = cache.get(key) if cache else None
+        if cached is not None:
+            descriptions[key] = cached
+        else:
+            todo.append(key)
+    
+    limiter = RateLimiter(requests_per_minute)
+    
+    def describe(key: str) -> Optional[str]:
+        limiter.wait()
+        try:
+            response = client.chat.completions.create(**requests[key])
+            description = response.choices[0].message.content or ''
+        except Exception as e:
+            print(f"  ✗ Image description failed: {e}", file=sys.stderr)
+            return None
+        if cache:
+            cache.put(key, description, requests[key]['model'])
+        return description
+    
+    if todo:
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(todo)))) as executor:
+            descriptions.update(zip(todo, executor.map(describe, todo)))
+    return descriptions
+
+
+def fill_descriptions(markdown: str, descriptions: Dict[str, Optional[str]]) -> str:
+    """
+    Replace placeholders with descriptions. Inside image alt text
+    (![...](...)) the description is flattened to one line without
+    brackets, as MarkItDown does for alt text.
+    """
+    def text_for(match, flatten: bool) -> str:
+        text = (descriptions.get(match.group(1)) or '').strip()
+        if flatten:
+            text = re.sub(r"\s+", " ", re.sub(r"[\r\n\[\]]", " ", text)).strip()
+        return text
+    
+    def fill_alt(match) -> str:
+        alt = _PLACEHOLDER_RE.sub(lambda m: text_for(m, True), match.group(1))
+        return f"![{alt.strip() or 'image'}]("
+    
+    markdown = _ALT_TEXT_RE.sub(fill_alt, markdown)
+    return _PLACEHOLDER_RE.sub(lambda m: text_for(m, False), markdown)
+
+
 def convert_with_ai(
     input_file: Path,
     output_file: Path,
     api_key: str,
     model: str = "anthropic/claude-opus-4.5",
     prompt_type: str = "general",
-    custom_prompt: str = None
+    custom_prompt: str = None,
+    force: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    requests_per_minute: Optional[float] = None,
+    use_cache: bool = True,
+    base_url: str = OPENROUTER_BASE_URL
 ) -> bool:
     """
     Convert a file to Markdown with AI image descriptions.
@@ -85,49 +268,83 @@ def convert_with_ai(
         model: Model name (default: anthropic/claude-opus-4.5)
         prompt_type: Type of prompt to use
         custom_prompt: Custom prompt (overrides prompt_type)
+        force: Convert even if the manifest says the output is up to date
+        concurrency: Image descriptions requested at the same time
+        requests_per_minute: Upper bound on description requests per minute
+        use_cache: Reuse image descriptions cached by image hash, model and prompt
+        base_url: OpenAI-compatible endpoint (default: OpenRouter)
         
     Returns:
         True if successful, False otherwise
     """
     try:
+        # Skip files already converted with the same content, model and prompt
+        prompt_text = custom_prompt or PROMPTS.get(prompt_type, PROMPTS['general'])
+        options = {
+            'tool': 'convert_with_ai',
+            'model': model,
+            'prompt_sha256': hashlib.sha256(prompt_text.encode('utf-8')).hexdigest()
+        }
+        manifest = ConversionManifest(output_file.parent)
+        if not force and manifest.is_current(input_file, options):
+            entry = manifest.get(input_file)
+            if entry['output'] == output_file.name:
+                print(f"✓ Up to date: {output_file} (unchanged since {entry['converted']}, use --force to redo)")
+                return True
+        
         # Initialize OpenRouter client (OpenAI-compatible)
         client = OpenAI(
             api_key=api_key,
-            base_url="https://openrouter.ai/api/v1"
+            base_url=base_url
         )
         
-        # Select prompt
-        if custom_prompt:
-            prompt = custom_prompt
-        else:
-            prompt = PROMPTS.get(prompt_type, PROMPTS['general'])
+        prompt = prompt_text
         
         print(f"Using model: {model}")
         print(f"Prompt type: {prompt_type if not custom_prompt else 'custom'}")
         print(f"Converting: {input_file}")
         
-        # Create MarkItDown with AI support
+        # Convert with a recording client: images get placeholders, no API calls yet
+        collector = _CollectingClient()
         md = MarkItDown(
-            llm_client=client,
+            llm_client=collector,
             llm_model=model,
             llm_prompt=prompt
         )
-        
-        # Convert file
         result = md.convert(str(input_file))
         
-        # Create output with metadata
-        content = f"# {result.title or input_file.stem}\n\n"
-        content += f"**Source**: {input_file.name}\n"
-        content += f"**Format**: {input_file.suffix}\n"
-        content += f"**AI Model**: {model}\n"
-        content += f"**Prompt Type**: {prompt_type if not custom_prompt else 'custom'}\n\n"
-        content += "---\n\n"
-        content += result.text_content
+        # Describe the distinct images concurrently, then fill them in document order
+        cache = DescriptionCache() if use_cache else None
+        cached = sum(1 for key in collector.requests if cache and cache.get(key) is not None)
+        started = time.perf_counter()
+        descriptions = describe_images(client, collector.requests, concurrency, requests_per_minute, cache)
+        failed = sum(1 for d in descriptions.values() if d is None)
+        if collector.calls:
+            print(f"Images: {collector.calls} ({len(collector.requests)} distinct, {cached} cached, "
+                  f"{failed} failed), described in {time.perf_counter() - started:.1f}s "
+                  f"with concurrency {concurrency}")
+        text = fill_descriptions(result.text_content, descriptions)
         
-        # Write output
+        # Write output with metadata header
+        header = [
+            f"# {result.title or input_file.stem}\n\n",
+            f"**Source**: {input_file.name}\n",
+            f"**Format**: {input_file.suffix}\n",
+            f"**AI Model**: {model}\n",
+            f"**Prompt Type**: {prompt_type if not custom_prompt else 'custom'}\n\n",
+            "---\n\n"
+        ]
         output_file.parent.mkdir(parents=True, exist_ok=True)
-        output_file.write_text(content, encoding='utf-8')
+        write_markdown(output_file, header, text)
+        if failed:
+            # Not recorded, so the next run retries; described images come from the cache.
+            manifest.forget(input_file)
+            manifest.save()
+            print(f"✗ Converted to {output_file} with {failed} image description(s) missing; "
+                  f"re-run to retry", file=sys.stderr)
+            return False
+        manifest.record(input_file, output_file, options)
+        manifest.save()
         
         print(f"✓ Successfully converted to: {output_file}")
         return True
@@ -159,12 +376,20 @@ Examples:
   # Use custom prompt with advanced vision model
   python convert_with_ai.py diagram.png diagram.md --model anthropic/claude-opus-4.5 --custom-prompt "Describe this technical diagram"
   
+  # Many figures: 8 descriptions in flight, at most 60 requests per minute
+  python convert_with_ai.py slides.pptx slides.md --concurrency 8 --rpm 60
+  
+  # Offline test against the local stub server
+  python stub_openai_server.py --port 8089 &
+  python convert_with_ai.py slides.pptx slides.md --base-url http://127.0.0.1:8089/v1 --api-key test
+  
   # Set API key via environment variable
   export OPENROUTER_API_KEY="sk-or-v1-..."
   python convert_with_ai.py image.jpg image.md
 
 Environment Variables:
   OPENROUTER_API_KEY    OpenRouter API key (required if not passed via --api-key)
+  MARKITDOWN_IMAGE_CACHE  Image description cache (default: ~/.cache/markitdown/image-descriptions)
 
 Popular Models (use with --model):
   anthropic/claude-opus-4.5 - Recommended for scientific vision
@@ -193,6 +418,32 @@ Popular Models (use with --model):
         '--custom-prompt', '-p',
         help='Custom prompt (overrides --prompt-type)'
     )
+    parser.add_argument(
+        '--concurrency', '-c',
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f'Image descriptions requested at the same time (default: {DEFAULT_CONCURRENCY})'
+    )
+    parser.add_argument(
+        '--rpm',
+        type=float,
+        help='Maximum image description requests per minute (default: no limit)'
+    )
+    parser.add_argument(
+        '--no-image-cache',
+        action='store_true',
+        help='Do not reuse or store image descriptions (cache: $MARKITDOWN_IMAGE_CACHE)'
+    )
+    parser.add_argument(
+        '--base-url',
+        default=OPENROUTER_BASE_URL,
+        help='OpenAI-compatible API base URL (default: OpenRouter; use stub_openai_server.py for offline tests)'
+    )
+    parser.add_argument(
+        '--force', '-f',
+        action='store_true',
+        help='Convert even if the input, model and prompt are unchanged since the last run'
+    )
     parser.add_argument(
         '--list-prompts', '-l',
         action='store_true',
@@ -229,7 +480,12 @@ Popular Models (use with --model):
         api_key=api_key,
         model=args.model,
         prompt_type=args.prompt_type,
-        custom_prompt=args.custom_prompt
+        custom_prompt=args.custom_prompt,
+        force=args.force,
+        concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        use_cache=not args.no_image_cache,
+        base_url=args.base_url
     )
     
     sys.exit(0 if success else 1)
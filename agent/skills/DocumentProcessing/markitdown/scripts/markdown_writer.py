@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Streaming Markdown writer shared by batch_convert.py and convert_literature.py.
+
+Writes the header pieces (front matter, title, info section) straight to the
+file handle, then the converted text in fixed-size slices. Nothing is
+concatenated in memory and the text is encoded slice by slice, so writing a
+large document needs the converted text plus one chunk rather than several
+full copies (header + text string, then its UTF-8 encoding).
+"""
+
+from pathlib import Path
+from typing import Iterable
+
+DEFAULT_CHUNK_CHARS = 1 << 20
+
+
+def write_markdown(
+    output_file: Path,
+    header: Iterable[str],
+    body: str,
+    chunk_chars: int = DEFAULT_CHUNK_CHARS
+) -> int:
+    """
+    Write `header` pieces followed by `body` to `output_file`.
+
+    Args:
+        output_file: Markdown file to create or overwrite
+        header: Strings written as-is before the body (may be a generator)
+        body: Converted document text
+        chunk_chars: Characters of `body` written per call
+
+    Returns:
+        Number of characters written
+    """
+    written = 0
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for piece in header:
+            written += f.write(piece)
+        for start in range(0, len(body), chunk_chars):
+            written += f.write(body[start:start + chunk_chars])
+    return written
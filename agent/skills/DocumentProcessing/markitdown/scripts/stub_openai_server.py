@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Local stub of an OpenAI-compatible chat completions endpoint, for testing
+convert_with_ai.py offline.
+
+Answers POST /v1/chat/completions with a deterministic description derived
+from the image bytes ("Stub description <hash>"), after an optional
+artificial latency. GET /stats returns request counts and the highest
+number of requests that were in flight at the same time, which shows
+whether --concurrency and --rpm are respected.
+
+Usage:
+  python stub_openai_server.py --port 8089 --latency 0.5
+  python convert_with_ai.py slides.pptx slides.md --base-url http://127.0.0.1:8089/v1 --api-key test
+  curl http://127.0.0.1:8089/stats
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.started = []
+
+    def enter(self):
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.started.append(time.time())
+
+    def leave(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def as_dict(self):
+        with self.lock:
+            gaps = [b - a for a, b in zip(self.started, self.started[1:])]
+            return {
+                'requests': self.requests,
+                'in_flight': self.in_flight,
+                'max_in_flight': self.max_in_flight,
+                'min_start_gap_seconds': min(gaps) if gaps else None
+            }
+
+
+def stub_description(messages) -> str:
+    """Deterministic description for a chat request: hash of its image URLs."""
+    digest = hashlib.sha256()
+    for message in messages:
+        content = message.get('content')
+        for part in content if isinstance(content, list) else []:
+            if part.get('type') == 'image_url':
+                digest.update(part['image_url']['url'].encode('utf-8'))
+    return f"Stub description {digest.hexdigest()[:12]}"
+
+
+def make_handler(stats: _Stats, latency: float):
+    class Handler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, payload: dict):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.rstrip('/') == '/stats':
+                self._send_json(200, stats.as_dict())
+            else:
+                self._send_json(404, {'error': {'message': 'not found'}})
+
+        def do_POST(self):
+            if not self.path.rstrip('/').endswith('/chat/completions'):
+                self._send_json(404, {'error': {'message': 'not found'}})
+                return
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            stats.enter()
+            try:
+                time.sleep(latency)
+                content = stub_description(request.get('messages', []))
+            finally:
+                stats.leave()
+            self._send_json(200, {
+                'id': 'chatcmpl-stub',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': request.get('model', 'stub'),
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': content},
+                    'finish_reason': 'stop'
+                }],
+                'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+            })
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(host: str = '127.0.0.1', port: int = 8089, latency: float = 0.0) -> ThreadingHTTPServer:
+    """Create the stub server (call serve_forever() on the result)."""
+    server = ThreadingHTTPServer((host, port), make_handler(_Stats(), latency))
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(description='Stub OpenAI-compatible server for offline convert_with_ai.py tests')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8089, help='Port (default: 8089)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to wait before each response (default: 0)')
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.latency)
+    print(f"Stub server on http://{args.host}:{server.server_port}/v1 (stats: /stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming BibTeX tokenizer against the previous regex parser.
+
+Generates a synthetic .bib file (default 50,000 entries) with nested braces,
+quoted and bare values, then times both parsers and compares how many
+fields each one recovers.
+
+Usage:
+  python bench_bibtex_tokenizer.py
+  python bench_bibtex_tokenizer.py --entries 50000 --repeat 3
+  python bench_bibtex_tokenizer.py --bib references.bib
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bibtex_tokenizer import iter_entries
+
+
+def _synthetic_entry(i: int) -> str:
+    kind = i % 4
+    if kind == 0:
+        return (
+            f'@article{{key{i},\n'
+            f'  author = {{Smith, John and Doe, Jane and {{The {i} Consortium}}}},\n'
+            f'  title = {{{{BERT}}: Pre-training of Deep {{Bidirectional}} Transformers, part {i}}},\n'
+            f'  journal = {{Journal of {{AI}} Research}},\n'
+            f'  year = {{{2000 + i % 25}}},\n'
+            f'  volume = {{{i % 90}}},\n'
+            f'  pages = {{{i}--{i + 12}}},\n'
+            f'  doi = {{10.1000/{i}}}\n'
+            f'}}\n'
+        )
+    if kind == 1:
+        return (
+            f'@inproceedings{{key{i},\n'
+            f'  author = "Lee, Ann and Kim, Bo",\n'
+            f'  title = "Graph Networks {{GNN}} at Scale {i}",\n'
+            f'  booktitle = "Proceedings of {{NeurIPS}}",\n'
+            f'  year = {2000 + i % 25},\n'
+            f'  month = jan,\n'
+            f'  pages = "{i}-{i + 9}"\n'
+            f'}}\n'
+        )
+    if kind == 2:
+        return (
+            f'@book{{key{i},\n'
+            f'  editor = {{Brown, Carl}},\n'
+            f'  title = {{A Book About Things {i}}},\n'
+            f'  publisher = {{Press}},\n'
+            f'  year = {{{2000 + i % 25}}},\n'
+            f'  isbn = {{978-0-00-{i:06d}-0}}\n'
+            f'}}\n'
+        )
+    abstract = ' '.join(f'Sentence {j} about {{LLM}} agents.' for j in range(20))
+    return (
+        f'@misc{{key{i},\n'
+        f'  title = {{Preprint {i}}},\n'
+        f'  year = {{{2000 + i % 25}}},\n'
+        f'  abstract = {{{abstract}}},\n'
+        f'  note = {{arXiv:2601.{i:05d}}}\n'
+        f'}}\n'
+    )
+
+
+def write_synthetic_bib(path: str, entries: int) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(entries):
+            f.write(_synthetic_entry(i))
+            f.write('\n')
+
+
+def legacy_parse(filepath: str):
+    """The regex parser previously used by format_bibtex / validate_citations."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+    entries = []
+    pattern = r'@(\w+)\s*\{\s*([^,\s]+)\s*,(.*?)\n\}'
+    for match in re.finditer(pattern, content, re.DOTALL | re.IGNORECASE):
+        fields = {}
+        field_pattern = r'(\w+)\s*=\s*\{([^}]*)\}|(\w+)\s*=\s*"([^"]*)"'
+        for field_match in re.finditer(field_pattern, match.group(3)):
+            if field_match.group(1):
+                fields[field_match.group(1).lower()] = field_match.group(2).strip()
+            else:
+                fields[field_match.group(3).lower()] = field_match.group(4).strip()
+        entries.append({'type': match.group(1).lower(), 'key': match.group(2).strip(), 'fields': fields})
+    return entries
+
+
+def tokenizer_parse(filepath: str):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return list(iter_entries(f))
+
+
+def _time(parse, filepath: str, repeat: int):
+    best = None
+    entries = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        entries = parse(filepath)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, entries
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(description='Benchmark BibTeX parsing')
+    parser.add_argument('--bib', help='Existing .bib file (default: generate one)')
+    parser.add_argument('--entries', type=int, default=50000, help='Entries in the synthetic file (default: 50000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed repetitions per parser (best is reported)')
+    args = parser.parse_args()
+
+    tmp_dir = None
+    path = args.bib
+    if not path:
+        tmp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmp_dir.name, f'synthetic_{args.entries}.bib')
+        write_synthetic_bib(path, args.entries)
+
+    try:
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f'{os.path.basename(path)} ({size_mb:.1f} MB)')
+        print(f'{"parser":<10} {"entries":>8} {"fields":>9} {"seconds":>8} {"entries/s":>10}')
+        results = {}
+        for name, parse in (('regex', legacy_parse), ('tokenizer', tokenizer_parse)):
+            seconds, entries = _time(parse, path, args.repeat)
+            fields = sum(len(e['fields']) for e in entries)
+            results[name] = entries
+            print(f'{name:<10} {len(entries):>8} {fields:>9} {seconds:>8.2f} {len(entries) / seconds:>10.0f}')
+
+        legacy = {e['key']: e['fields'] for e in results['regex']}
+        differing = sum(1 for e in results['tokenizer'] if legacy.get(e['key']) != e['fields'])
+        print(f'entries whose fields differ from the regex parser: {differing}')
+    finally:
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
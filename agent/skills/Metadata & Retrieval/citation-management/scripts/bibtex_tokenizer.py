@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Streaming BibTeX Tokenizer
+Single-pass, brace-depth-tracking BibTeX reader shared by format_bibtex.py
+and validate_citations.py.
+
+- Reads the input in chunks and yields entries lazily
+- Handles nested braces ({BERT}: ...), quoted values, bare values
+  (year = 2020, month = jan) and # concatenation; each field's value kind
+  is kept so writers can emit macros and concatenations unchanged
+- Each entry keeps its source offset and line number for error messages
+- Malformed entries are reported with their line and skipped; an entry that
+  is never closed ends at the next line starting with "@"
+
+Every character is examined a bounded number of times, so parsing time is
+linear in the file size (no backtracking).
+
+Usage:
+  python bibtex_tokenizer.py references.bib
+"""
+
+import argparse
+import io
+import json
+import re
+import sys
+from typing import Dict, IO, Iterator, List, Optional, Union
+
+# Entry types that carry no citation (and no "key," header).
+SKIPPED_TYPES = {'comment', 'preamble', 'string'}
+
+# Value kinds recorded per field in entry['kinds'].
+BRACED = 'braced'    # {text}
+QUOTED = 'quoted'    # "text"
+BARE = 'bare'        # 2020, jan (number or @string macro)
+CONCAT = 'concat'    # "a" # b; the value is the source text as written
+
+_HEADER_RE = re.compile(r'@[ \t\r\n]*([A-Za-z]\w*)[ \t\r\n]*([{(])')
+# Inside an entry only braces (and quotes/parens for "(" entries) matter; a
+# line starting with an entry header ("@type{") while an entry is still open
+# means it was never closed. Other lines starting with "@" (handles, e-mail
+# addresses in a note or abstract) are part of the value.
+_BRACE_SCAN_RE = re.compile(r'[{}]|\n[ \t]*(?=@)')
+_PAREN_SCAN_RE = re.compile(r'[{}")]|\n[ \t]*(?=@)')
+_KEY_RE = re.compile(r'[ \t\r\n]*([^,\s{}()=]*)[ \t\r\n]*(,?)')
+_SEPARATOR_RE = re.compile(r'[\s,]*')
+_FIELD_NAME_RE = re.compile(r'([^\s=,{}()"#]+)\s*=\s*')
+_BARE_VALUE_RE = re.compile(r'[^\s,#{}()"]+')
+_BRACES_RE = re.compile(r'[{}]')
+_QUOTED_RE = re.compile(r'[{}"]')
+_CONCAT_RE = re.compile(r'\s*#\s*')
+
+_HEADER_LOOKAHEAD = 256
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+class BibTeXSyntaxError(ValueError):
+    """Malformed entry; `line` and `offset` point into the source."""
+
+    def __init__(self, message: str, line: int, offset: int):
+        super().__init__(message)
+        self.line = line
+        self.offset = offset
+
+
+def _error_dict(message: str, line: int, offset: int) -> Dict:
+    return {'message': message, 'line': line, 'offset': offset}
+
+
+def _match_brace(text: str, pos: int) -> int:
+    """Return the index just past the "}" closing the "{" at text[pos]; -1 if unbalanced."""
+    depth = 0
+    for m in _BRACES_RE.finditer(text, pos):
+        depth += 1 if m.group() == '{' else -1
+        if depth == 0:
+            return m.end()
+    return -1
+
+
+def _match_quote(text: str, pos: int) -> int:
+    """Return the index just past the '"' closing the quoted value at text[pos]; -1 if unterminated."""
+    depth = 0
+    for m in _QUOTED_RE.finditer(text, pos + 1):
+        c = m.group()
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+        elif depth == 0:
+            return m.end()
+    return -1
+
+
+def parse_entry(text: str, offset: int = 0, line: int = 1) -> Optional[Dict]:
+    """
+    Parse the text of one complete entry ("@type{key, field = value, ...}").
+
+    Args:
+        text: Entry source, from "@" to the closing delimiter
+        offset: Source offset of text[0] (for error messages)
+        line: Source line of text[0]
+
+    Returns:
+        Entry dictionary, or None for @comment/@preamble/@string
+
+    Raises:
+        BibTeXSyntaxError: On a missing key, field name or value
+    """
+    def fail(message: str, pos: int):
+        raise BibTeXSyntaxError(message, line + text.count('\n', 0, pos), offset + pos)
+
+    header = _HEADER_RE.match(text)
+    if not header:
+        fail('Expected "@type{"', 0)
+    entry_type = header.group(1).lower()
+    if entry_type in SKIPPED_TYPES:
+        return None
+
+    key_match = _KEY_RE.match(text, header.end())
+    key = key_match.group(1)
+    if not key or not key_match.group(2):
+        fail(f'Entry of type "{entry_type}" has no citation key', header.end())
+
+    end = len(text) - 1  # closing delimiter
+    pos = key_match.end()
+    fields = {}
+    kinds = {}
+    while True:
+        pos = _SEPARATOR_RE.match(text, pos).end()
+        if pos >= end:
+            break
+        name = _FIELD_NAME_RE.match(text, pos)
+        if not name:
+            fail(f'Entry {key}: expected "field = value"', pos)
+        field_name = name.group(1).lower()
+        pos = name.end()
+
+        # value := part ("#" part)*, part := {...} | "..." | bare
+        value_start = pos
+        parts = []
+        kind = BARE
+        while True:
+            c = text[pos] if pos < end else ''
+            if c == '{':
+                part_end = _match_brace(text, pos)
+                if part_end < 0 or part_end > end:
+                    fail(f'Entry {key}: unbalanced braces in field "{field_name}"', pos)
+                parts.append(text[pos + 1:part_end - 1])
+                kind = BRACED
+            elif c == '"':
+                part_end = _match_quote(text, pos)
+                if part_end < 0 or part_end > end:
+                    fail(f'Entry {key}: unterminated quote in field "{field_name}"', pos)
+                parts.append(text[pos + 1:part_end - 1])
+                kind = QUOTED
+            else:
+                bare = _BARE_VALUE_RE.match(text, pos)
+                if not bare or bare.end() > end:
+                    fail(f'Entry {key}: missing value for field "{field_name}"', pos)
+                part_end = bare.end()
+                parts.append(bare.group())
+                kind = BARE
+            pos = part_end
+            concat = _CONCAT_RE.match(text, pos)
+            if not concat:
+                break
+            pos = concat.end()
+
+        # Concatenations are kept as written; macros are not expanded.
+        if len(parts) == 1:
+            fields[field_name] = parts[0].strip()
+            kinds[field_name] = kind
+        else:
+            fields[field_name] = text[value_start:pos].strip()
+            kinds[field_name] = CONCAT
+
+    return {
+        'type': entry_type,
+        'key': key,
+        'fields': fields,
+        'kinds': kinds,
+        'raw': text,
+        'offset': offset,
+        'line': line,
+    }
+
+
+def iter_entries(
+    source: Union[str, IO[str]],
+    errors: Optional[List[Dict]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Dict]:
+    """
+    Yield entries from a BibTeX string or text stream, one at a time.
+
+    Args:
+        source: BibTeX text or an open text file
+        errors: If given, syntax errors are appended here as
+            {'message', 'line', 'offset'} dicts (otherwise they are dropped)
+        chunk_size: Characters read from `source` per chunk
+
+    Yields:
+        Entry dictionaries with 'type', 'key', 'fields', 'kinds' (field ->
+        BRACED/QUOTED/BARE/CONCAT), 'raw', 'offset' (character offset of "@")
+        and 'line' (1-based)
+    """
+    if isinstance(source, str):
+        source = io.StringIO(source)
+
+    buf = ''
+    base = 0          # absolute offset of buf[0]
+    line = 1          # line number at buf[counted]
+    counted = 0
+    pos = 0
+    eof = False
+
+    # State of the entry being scanned (start < 0: between entries).
+    start = -1
+    scan = 0
+    depth = 0
+    in_quote = False
+    scanner = _BRACE_SCAN_RE
+
+    def report(message: str, at_line: int, at_offset: int):
+        if errors is not None:
+            errors.append(_error_dict(message, at_line, at_offset))
+
+    while True:
+        if start < 0:
+            at = buf.find('@', pos)
+            if at < 0:
+                pos = len(buf)
+                if eof:
+                    return
+            else:
+                header = _HEADER_RE.match(buf, at)
+                if header is None and not eof and len(buf) - at < _HEADER_LOOKAHEAD:
+                    pos = at  # header may continue in the next chunk
+                elif header is None:
+                    pos = at + 1  # stray "@" outside an entry is a comment
+                    continue
+                else:
+                    start, pos = at, at
+                    scan = header.end()
+                    depth = 1
+                    in_quote = False
+                    scanner = _BRACE_SCAN_RE if header.group(2) == '{' else _PAREN_SCAN_RE
+                    continue
+        else:
+            closed = -1
+            recover = -1
+            pending = -1
+            for m in scanner.finditer(buf, scan):
+                c = m.group()
+                if c == '{':
+                    depth += 1
+                elif c == '}':
+                    depth -= 1
+                    if depth == 0:
+                        closed = m.end()
+                        break
+                elif c == '"':
+                    if depth == 1:
+                        in_quote = not in_quote
+                elif c == ')':
+                    if depth == 1 and not in_quote:
+                        closed = m.end()
+                        break
+                elif _HEADER_RE.match(buf, m.end()):
+                    recover = m.end()
+                    break
+                elif not eof and len(buf) - m.end() < _HEADER_LOOKAHEAD:
+                    pending = m.start()  # header may continue in the next chunk
+                    break
+            else:
+                # A trailing "\n   " may be followed by "@" in the next chunk;
+                # it holds no delimiters, so rescanning it is safe.
+                nl = buf.rfind('\n', scan)
+                scan = nl if nl >= 0 and not buf[nl + 1:].strip(' \t') else len(buf)
+            if pending >= 0:
+                # Only "\n   " precedes the "@", so rescanning from it is safe.
+                scan = pending
+
+            if closed >= 0 or recover >= 0:
+                line += buf.count('\n', counted, start)
+                counted = start
+                if closed >= 0:
+                    try:
+                        entry = parse_entry(buf[start:closed], base + start, line)
+                    except BibTeXSyntaxError as e:
+                        report(str(e), e.line, e.offset)
+                        entry = None
+                    if entry is not None:
+                        yield entry
+                    pos = closed
+                else:
+                    report('Entry is never closed (missing "}")', line, base + start)
+                    pos = recover
+                start = -1
+                continue
+            if eof:
+                line += buf.count('\n', counted, start)
+                report('Entry is never closed (missing "}")', line, base + start)
+                return
+
+        # Need more input: drop what is no longer referenced, then read.
+        if eof:
+            return
+        keep = start if start >= 0 else pos
+        line += buf.count('\n', counted, keep)
+        base += keep
+        buf = buf[keep:]
+        pos -= keep
+        if start >= 0:
+            scan -= keep
+            start = 0
+        counted = 0
+        chunk = source.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf += chunk
+
+
+def parse_file(filepath: str, errors: Optional[List[Dict]] = None) -> List[Dict]:
+    """Parse a BibTeX file into a list of entries (see iter_entries)."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return list(iter_entries(f, errors))
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(
+        description='Tokenize a BibTeX file and print its entries as JSON lines',
+        epilog='Example: python bibtex_tokenizer.py references.bib'
+    )
+    parser.add_argument('file', help='BibTeX file to read')
+    args = parser.parse_args()
+
+    errors = []
+    with open(args.file, 'r', encoding='utf-8') as f:
+        for entry in iter_entries(f, errors):
+            entry = dict(entry)
+            del entry['raw']
+            print(json.dumps(entry, ensure_ascii=False))
+    for error in errors:
+        print(f'{args.file}:{error["line"]}: {error["message"]}', file=sys.stderr)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -7,18 +7,147 @@ Quick utility to convert DOIs to BibTeX format using CrossRef API.
 import sys
 import requests
 import argparse
-import time
 import json
-from typing import Optional, List
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, List
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+from http_cache import CachedSession
+
+# Transient statuses worth retrying (rate limited / server trouble).
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+DEFAULT_DELAY = 0.5
+# Requests a host may receive back to back after an idle spell. Fixed, so
+# raising --workers adds overlap but never a larger burst against doi.org.
+DEFAULT_BURST = 2
+
+
+class HostRateLimiter:
+    """Token bucket per host, shared by all worker threads."""
+
+    def __init__(self, interval: float = 0.0, burst: int = 1):
+        """
+        Initialize limiter.
+
+        Args:
+            interval: Seconds per token, i.e. 1 / requests per second per host
+            burst: Tokens a host may accumulate while idle
+        """
+        self.interval = interval
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, List[float]] = {}  # host -> [tokens, last refill]
+
+    def acquire(self, host: str) -> None:
+        """Block until a request to `host` is allowed."""
+        if self.interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(host, [float(self.burst), now])
+            tokens = min(float(self.burst), tokens + (now - last) / self.interval) - 1
+            self._buckets[host] = [tokens, now]
+            # A negative balance is a reservation: wait until it is paid back.
+            wait = -tokens * self.interval if tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    # Adapters only see real network traffic (including redirect hops such as
+    # doi.org -> api.crossref.org), so cache hits are never throttled.
+    def __init__(self, limiter: HostRateLimiter, **kwargs):
+        super().__init__(**kwargs)
+        self.limiter = limiter
+
+    def send(self, request, **kwargs):
+        self.limiter.acquire((urlsplit(request.url).hostname or '').lower())
+        return super().send(request, **kwargs)
+
+
+def retry_delay(attempt: int, response: Optional[requests.Response], backoff: float) -> float:
+    """Seconds to wait before retry `attempt`: Retry-After if given, else exponential backoff."""
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after and retry_after.strip().isdigit():
+        base = min(float(retry_after), 60.0)
+    else:
+        base = backoff * (2 ** attempt)
+    # Jitter keeps parallel workers from retrying in lockstep.
+    return base * random.uniform(0.5, 1.5)
+
+
+def request_with_retries(session: CachedSession, method: str, url: str,
+                         max_retries: int, backoff: float,
+                         on_retry=None, **kwargs) -> requests.Response:
+    """
+    Send a request, retrying on 429/5xx responses, timeouts and connection errors.
+
+    Returns the last response; re-raises the last timeout/connection error
+    once `max_retries` is exhausted. `on_retry` is called before each retry.
+    """
+    attempt = 0
+    while True:
+        try:
+            response = session.request(method, url, **kwargs)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+            if attempt >= max_retries or session.mode == 'cache-only':
+                raise
+            response = None
+        else:
+            # Cache-only misses come back as 504 and will not change on retry.
+            if (response.status_code not in RETRY_STATUS or attempt >= max_retries
+                    or getattr(response, 'from_cache', False)):
+                return response
+        if on_retry is not None:
+            on_retry()
+        time.sleep(retry_delay(attempt, response, backoff))
+        attempt += 1
+
 
 class DOIConverter:
     """Convert DOIs to BibTeX entries using CrossRef API."""
     
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, max_retries: int = 3, backoff: float = 1.0):
+        """
+        Initialize converter.
+
+        Args:
+            max_retries: Retries per DOI on 429/5xx responses and timeouts
+            backoff: Base delay (seconds) for exponential backoff with jitter
+        """
+        self.session = CachedSession()
         self.session.headers.update({
             'User-Agent': 'DOIConverter/1.0 (Citation Management Tool; mailto:support@example.com)'
         })
+        self.limiter = HostRateLimiter()
+        self._mount(pool_size=10)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.retries = 0
+        self._retries_lock = threading.Lock()
+        self.last_run: Dict[str, float] = {}
+
+    def _mount(self, pool_size: int) -> None:
+        adapter = RateLimitedAdapter(self.limiter, pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _count_retry(self) -> None:
+        with self._retries_lock:
+            self.retries += 1
+
+    def _get(self, url: str, headers: Dict[str, str]) -> requests.Response:
+        """GET with retries on transient failures; returns the last response."""
+        return request_with_retries(
+            self.session, 'GET', url, self.max_retries, self.backoff,
+            on_retry=self._count_retry, headers=headers, timeout=15,
+        )
     
     def doi_to_bibtex(self, doi: str) -> Optional[str]:
         """
@@ -47,7 +176,7 @@ class DOIConverter:
         }
         
         try:
-            response = self.session.get(url, headers=headers, timeout=15)
+            response = self._get(url, headers)
             
             if response.status_code == 200:
                 bibtex = response.text.strip()
@@ -69,32 +198,55 @@ class DOIConverter:
             print(f'Error: Request failed for {doi}: {e}', file=sys.stderr)
             return None
     
-    def convert_multiple(self, dois: List[str], delay: float = 0.5) -> List[str]:
+    def convert_multiple(self, dois: List[str], delay: float = DEFAULT_DELAY, workers: int = 4) -> List[str]:
         """
         Convert multiple DOIs to BibTeX.
         
         Args:
             dois: List of DOIs
-            delay: Delay between requests (seconds) for rate limiting
+            delay: Minimum average seconds between network requests to the same
+                host (token bucket); cached DOIs are returned without waiting
+            workers: Number of DOIs converted concurrently
             
         Returns:
-            List of BibTeX entries (excludes failed conversions)
+            List of BibTeX entries in input order (excludes failed conversions).
+            Timing and counts of the run are stored in `last_run`.
         """
-        bibtex_entries = []
-        
-        for i, doi in enumerate(dois):
-            print(f'Converting DOI {i+1}/{len(dois)}: {doi}', file=sys.stderr)
+        workers = max(1, workers)
+        self.limiter.interval = delay
+        self.limiter.burst = DEFAULT_BURST
+        self._mount(pool_size=max(10, workers))
+        hits_before = self.session.stats['hits'] + self.session.stats['revalidated']
+        retries_before = self.retries
+
+        done = 0
+        done_lock = threading.Lock()
+
+        def convert(doi: str) -> Optional[str]:
+            nonlocal done
             bibtex = self.doi_to_bibtex(doi)
-            
-            if bibtex:
-                bibtex_entries.append(bibtex)
-            
-            # Rate limiting
-            if i < len(dois) - 1:  # Don't delay after last request
-                time.sleep(delay)
-        
-        return bibtex_entries
+            with done_lock:
+                done += 1
+                print(f'Converted {done}/{len(dois)}: {doi}{"" if bibtex else " (failed)"}', file=sys.stderr)
+            return bibtex
 
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # map() yields in submission order, so output order matches input.
+            results = list(executor.map(convert, dois))
+        elapsed = time.perf_counter() - start
+
+        bibtex_entries = [b for b in results if b]
+        self.last_run = {
+            'total': len(dois),
+            'converted': len(bibtex_entries),
+            'seconds': elapsed,
+            'dois_per_second': len(dois) / elapsed if elapsed > 0 else 0.0,
+            'cache_hits': self.session.stats['hits'] + self.session.stats['revalidated'] - hits_before,
+            'retries': self.retries - retries_before,
+            'workers': workers,
+        }
+        return bibtex_entries
 
 def main():
     """Command-line interface."""
@@ -122,8 +274,15 @@ def main():
     parser.add_argument(
         '--delay',
         type=float,
-        default=0.5,
-        help='Delay between requests in seconds (default: 0.5)'
+        default=DEFAULT_DELAY,
+        help=f'Minimum seconds between requests to the same host (default: {DEFAULT_DELAY})'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='Number of DOIs converted concurrently (default: 4)'
     )
     
     parser.add_argument(
@@ -167,7 +326,7 @@ def main():
         else:
             sys.exit(1)
     else:
-        bibtex_entries = converter.convert_multiple(dois, delay=args.delay)
+        bibtex_entries = converter.convert_multiple(dois, delay=args.delay, workers=args.workers)
     
     if not bibtex_entries:
         print('Error: No successful conversions', file=sys.stderr)
@@ -197,7 +356,10 @@ def main():
     # Summary
     if len(dois) > 1:
         success_rate = len(bibtex_entries) / len(dois) * 100
-        print(f'\nConverted {len(bibtex_entries)}/{len(dois)} DOIs ({success_rate:.1f}%)', file=sys.stderr)
+        run = converter.last_run
+        print(f'\nConverted {len(bibtex_entries)}/{len(dois)} DOIs ({success_rate:.1f}%) '
+              f'in {run["seconds"]:.1f}s ({run["dois_per_second"]:.1f} DOIs/s, {run["workers"]} workers, '
+              f'{run["cache_hits"]} cached, {run["retries"]} retries)', file=sys.stderr)
 
 
 if __name__ == '__main__':
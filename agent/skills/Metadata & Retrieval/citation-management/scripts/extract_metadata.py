@@ -6,15 +6,15 @@ Extract citation metadata from DOI, PMID, arXiv ID, or URL using various APIs.
 
 import sys
 import os
-import requests
 import argparse
-import time
 import re
 import json
 import xml.etree.ElementTree as ET
 from typing import Optional, Dict, List, Tuple
 from urllib.parse import urlparse
 
+from http_cache import CachedSession
+
 class MetadataExtractor:
     """Extract metadata from various sources and generate BibTeX."""
     
@@ -25,7 +25,8 @@ class MetadataExtractor:
         Args:
             email: Email for Entrez API (recommended for PubMed)
         """
-        self.session = requests.Session()
+        # Rate limiting applies to network requests only; cache hits are free
+        self.session = CachedSession(min_interval=0.5)
         self.session.headers.update({
             'User-Agent': 'MetadataExtractor/1.0 (Citation Management Tool)'
         })
@@ -535,10 +536,6 @@ def main():
         bibtex = extractor.extract(identifier)
         if bibtex:
             bibtex_entries.append(bibtex)
-        
-        # Rate limiting
-        if i < len(identifiers) - 1:
-            time.sleep(0.5)
     
     if not bibtex_entries:
         print('Error: No successful extractions', file=sys.stderr)
@@ -10,6 +10,9 @@ import argparse
 from typing import List, Dict, Tuple
 from collections import OrderedDict
 
+from bibtex_tokenizer import BARE, CONCAT, iter_entries
+from near_duplicates import DEFAULT_THRESHOLD, NearDuplicateIndex
+
 class BibTeXFormatter:
     """Format and clean BibTeX entries."""
     
@@ -23,6 +26,7 @@ class BibTeXFormatter:
             'howpublished', 'doi', 'url', 'isbn', 'issn',
             'note', 'abstract', 'keywords'
         ]
+        self.parse_errors: List[Dict] = []
     
     def parse_bibtex_file(self, filepath: str) -> List[Dict]:
         """
@@ -32,46 +36,20 @@ class BibTeXFormatter:
             filepath: Path to BibTeX file
             
         Returns:
-            List of entry dictionaries
+            List of entry dictionaries (with source 'line' and 'offset');
+            malformed entries are skipped, reported on stderr and kept
+            in `parse_errors`
         """
+        self.parse_errors = errors = []
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
+                entries = list(iter_entries(f, errors))
         except Exception as e:
             print(f'Error reading file: {e}', file=sys.stderr)
             return []
         
-        entries = []
-        
-        # Match BibTeX entries
-        pattern = r'@(\w+)\s*\{\s*([^,\s]+)\s*,(.*?)\n\}'
-        matches = re.finditer(pattern, content, re.DOTALL | re.IGNORECASE)
-        
-        for match in matches:
-            entry_type = match.group(1).lower()
-            citation_key = match.group(2).strip()
-            fields_text = match.group(3)
-            
-            # Parse fields
-            fields = OrderedDict()
-            field_pattern = r'(\w+)\s*=\s*\{([^}]*)\}|(\w+)\s*=\s*"([^"]*)"'
-            field_matches = re.finditer(field_pattern, fields_text)
-            
-            for field_match in field_matches:
-                if field_match.group(1):
-                    field_name = field_match.group(1).lower()
-                    field_value = field_match.group(2)
-                else:
-                    field_name = field_match.group(3).lower()
-                    field_value = field_match.group(4)
-                
-                fields[field_name] = field_value.strip()
-            
-            entries.append({
-                'type': entry_type,
-                'key': citation_key,
-                'fields': fields
-            })
+        for error in errors:
+            print(f'Warning: {filepath}:{error["line"]}: {error["message"]} (skipped)', file=sys.stderr)
         
         return entries
     
@@ -103,10 +81,15 @@ class BibTeXFormatter:
         # Format each field
         max_field_len = max(len(f) for f in ordered_fields.keys()) if ordered_fields else 0
         
+        kinds = entry.get('kinds', {})
         for field_name, field_value in ordered_fields.items():
             # Pad field name for alignment
             padded_field = field_name.ljust(max_field_len)
-            lines.append(f'  {padded_field} = {{{field_value}}},')
+            if kinds.get(field_name) in (BARE, CONCAT):
+                # Macros (month = jan) and "a" # b must not become literals.
+                lines.append(f'  {padded_field} = {field_value},')
+            else:
+                lines.append(f'  {padded_field} = {{{field_value}}},')
         
         # Remove trailing comma from last field
         if lines[-1].endswith(','):
@@ -128,6 +111,10 @@ class BibTeXFormatter:
         """
         fixed = entry.copy()
         fields = fixed['fields'].copy()
+        # Macro names and concatenations are written back as-is, not fixed.
+        kinds = entry.get('kinds', {})
+        verbatim = {name: value for name, value in fields.items()
+                    if kinds.get(name) in (BARE, CONCAT)}
         
         # Fix page ranges (single hyphen to double hyphen)
         if 'pages' in fields:
@@ -160,21 +147,32 @@ class BibTeXFormatter:
             author = re.sub(r'\s+and\s+and\s+', ' and ', author)
             fields['author'] = author
         
+        fields.update(verbatim)
         fixed['fields'] = fields
         return fixed
     
-    def deduplicate_entries(self, entries: List[Dict]) -> List[Dict]:
+    def deduplicate_entries(self, entries: List[Dict], fuzzy: bool = False,
+                            threshold: float = DEFAULT_THRESHOLD,
+                            fuzzy_remove: bool = False) -> List[Dict]:
         """
         Remove duplicate entries based on DOI or citation key.
         
         Args:
             entries: List of entry dictionaries
+            fuzzy: Also look for near-duplicates (similar title + first author
+                + year). They are only reported, unless their pages agree or
+                `fuzzy_remove` is set: series such as "... Part I" / "... Part II"
+                are similar enough to match but are distinct works.
+            threshold: Minimum similarity (0-1) for fuzzy matches
+            fuzzy_remove: Drop every near-duplicate, not just confirmed ones
             
         Returns:
-            List of unique entries
+            List of unique entries (the first of each duplicate group is kept)
         """
         seen_dois = set()
         seen_keys = set()
+        index = NearDuplicateIndex(threshold=threshold) if fuzzy else None
+        kept_pages = {}
         unique_entries = []
         
         for entry in entries:
@@ -192,12 +190,32 @@ class BibTeXFormatter:
             if key in seen_keys:
                 print(f'Duplicate citation key found: {key} (skipping)', file=sys.stderr)
                 continue
-            seen_keys.add(key)
             
+            fields = entry['fields']
+            if index is not None:
+                author = fields.get('author') or fields.get('editor')
+                matches = index.query(fields.get('title', ''), author, fields.get('year'))
+                pages = self._normalize_pages(fields.get('pages', ''))
+                confirmed = [(k, score) for k, score in matches if pages and kept_pages.get(k) == pages]
+                if matches and (fuzzy_remove or confirmed):
+                    kept_key, score = (confirmed or matches)[0]
+                    print(f'Near-duplicate of {kept_key} (similarity {score:.2f}): skipping {key}', file=sys.stderr)
+                    continue
+                for kept_key, score in matches:
+                    print(f'Possible near-duplicate of {kept_key} (similarity {score:.2f}): '
+                          f'keeping {key}; use --fuzzy-remove to drop', file=sys.stderr)
+                index.add(key, fields.get('title', ''), author, fields.get('year'))
+                kept_pages[key] = pages
+            
+            seen_keys.add(key)
             unique_entries.append(entry)
         
         return unique_entries
     
+    @staticmethod
+    def _normalize_pages(pages: str) -> str:
+        return re.sub(r'[\s\-\u2013\u2014]+', '-', pages.strip().lower())
+    
     def sort_entries(self, entries: List[Dict], sort_by: str = 'key', descending: bool = False) -> List[Dict]:
         """
         Sort entries by specified field.
@@ -232,7 +250,9 @@ class BibTeXFormatter:
     
     def format_file(self, filepath: str, output: str = None,
                    deduplicate: bool = False, sort_by: str = None,
-                   descending: bool = False, fix_issues: bool = True) -> None:
+                   descending: bool = False, fix_issues: bool = True,
+                   fuzzy: bool = False, threshold: float = DEFAULT_THRESHOLD,
+                   fuzzy_remove: bool = False) -> None:
         """
         Format entire BibTeX file.
         
@@ -243,6 +263,10 @@ class BibTeXFormatter:
             sort_by: Field to sort by
             descending: Sort in descending order
             fix_issues: Fix common formatting issues
+            fuzzy: When deduplicating, also report near-duplicate entries
+                (dropped only when their pages agree)
+            threshold: Minimum similarity (0-1) for fuzzy deduplication
+            fuzzy_remove: Drop all near-duplicates found by `fuzzy`
         """
         print(f'Parsing {filepath}...', file=sys.stderr)
         entries = self.parse_bibtex_file(filepath)
@@ -253,6 +277,11 @@ class BibTeXFormatter:
         
         print(f'Found {len(entries)} entries', file=sys.stderr)
         
+        if self.parse_errors and not output:
+            # Overwriting in place would silently drop the skipped entries.
+            print(f'Error: {len(self.parse_errors)} malformed entries; fix them or use --output', file=sys.stderr)
+            sys.exit(1)
+        
         # Fix common issues
         if fix_issues:
             print('Fixing common issues...', file=sys.stderr)
@@ -262,7 +291,8 @@ class BibTeXFormatter:
         if deduplicate:
             print('Removing duplicates...', file=sys.stderr)
             original_count = len(entries)
-            entries = self.deduplicate_entries(entries)
+            entries = self.deduplicate_entries(entries, fuzzy=fuzzy, threshold=threshold,
+                                               fuzzy_remove=fuzzy_remove)
             removed = original_count - len(entries)
             if removed > 0:
                 print(f'Removed {removed} duplicate(s)', file=sys.stderr)
@@ -312,6 +342,26 @@ def main():
         help='Remove duplicate entries'
     )
     
+    parser.add_argument(
+        '--fuzzy',
+        action='store_true',
+        help='With --deduplicate, also report near-duplicates (similar title, first author, year); '
+             'only those with matching pages are removed'
+    )
+    
+    parser.add_argument(
+        '--fuzzy-remove',
+        action='store_true',
+        help='With --fuzzy, remove every near-duplicate instead of reporting it'
+    )
+    
+    parser.add_argument(
+        '--similarity',
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f'Minimum similarity (0-1) for --fuzzy (default: {DEFAULT_THRESHOLD})'
+    )
+    
     parser.add_argument(
         '--sort',
         choices=['key', 'year', 'author', 'title'],
@@ -340,7 +390,10 @@ def main():
         deduplicate=args.deduplicate,
         sort_by=args.sort,
         descending=args.descending,
-        fix_issues=not args.no_fix
+        fix_issues=not args.no_fix,
+        fuzzy=args.fuzzy or args.fuzzy_remove,
+        threshold=args.similarity,
+        fuzzy_remove=args.fuzzy_remove
     )
 
 
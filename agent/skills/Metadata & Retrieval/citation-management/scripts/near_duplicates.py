@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Detection for Bibliography Entries
+MinHash/LSH index over character n-grams of title + first author + year.
+
+- Each record is reduced to a fixed-size MinHash signature (one-permutation
+  hashing: one hash per shingle instead of one per shingle and permutation)
+- LSH banding puts records that share a band into the same bucket, so only
+  likely matches are compared; there is no all-pairs comparison
+- Candidates are scored with the exact Jaccard similarity of their shingle
+  sets, then grouped into clusters
+
+Indexing is linear in the number of records; comparisons grow with the
+number of true near-duplicates, not with n^2.
+
+Used by validate_citations.py, format_bibtex.py and the literature-review
+skill's search_databases.py (this is the only copy).
+
+Usage:
+  python near_duplicates.py results.json --threshold 0.8
+"""
+
+import argparse
+import json
+import re
+import sys
+import unicodedata
+import zlib
+from collections import defaultdict
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_BINS = 64
+DEFAULT_BANDS = 16
+DEFAULT_SHINGLE = 4
+
+_HASH_RANGE = 1 << 32
+_MAX_ROUNDS = 32
+_LATEX_COMMAND_RE = re.compile(r'\\[A-Za-z]+')
+_NON_ALNUM_RE = re.compile(r'[\W_]+')
+_YEAR_RE = re.compile(r'\d{4}')
+_AUTHOR_SPLIT_RE = re.compile(r'\s+and\s+|;', re.IGNORECASE)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop accents, LaTeX commands/braces and punctuation."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = _LATEX_COMMAND_RE.sub(' ', text)
+    return ' '.join(_NON_ALNUM_RE.sub(' ', text.lower()).split())
+
+
+def first_author_surname(authors: Union[str, Sequence[str], None]) -> str:
+    """
+    Surname of the first author from a BibTeX ("Last, First and ..."),
+    PubMed ("Smith J, Doe A") or plain ("John Smith, Jane Doe") author
+    string, or from a list of names.
+    """
+    if not authors:
+        return ''
+    if isinstance(authors, str):
+        first = _AUTHOR_SPLIT_RE.split(authors, maxsplit=1)[0]
+    else:
+        first = str(authors[0])
+    if ',' in first:
+        head = first.split(',', 1)[0].split()
+        # "Smith J" (surname first) vs "John Smith" (surname last)
+        if len(head) > 1 and len(head[-1].rstrip('.')) <= 2:
+            name = head[0]
+        else:
+            name = head[-1] if head else ''
+    else:
+        parts = first.split()
+        name = parts[-1] if parts else ''
+    return normalize_text(name)
+
+
+def record_signature_text(title: str, authors: Union[str, Sequence[str], None] = None, year=None) -> str:
+    """Text that is shingled for a record: normalized title, first author surname, year."""
+    match = _YEAR_RE.search(str(year or ''))
+    return ' '.join(p for p in (normalize_text(title), first_author_surname(authors),
+                                match.group() if match else '') if p)
+
+
+def shingles(text: str, k: int = DEFAULT_SHINGLE) -> set:
+    """Hashed character k-grams of `text` (a single hash for texts shorter than k)."""
+    data = text.encode('utf-8')
+    if len(data) <= k:
+        return {zlib.crc32(data)} if data else set()
+    return {zlib.crc32(data[i:i + k]) for i in range(len(data) - k + 1)}
+
+
+def jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def minhash_signature(text: str, k: int = DEFAULT_SHINGLE, num_bins: int = DEFAULT_NUM_BINS) -> Tuple[int, ...]:
+    """
+    One-permutation MinHash of the character k-grams of `text`: each shingle
+    is hashed once into bin `h % num_bins` and every bin keeps its minimum.
+    Bins left empty are filled by rehashing the shingles with a new seed
+    (only those bins are updated), so no bin copies another and the bins
+    stay independent for LSH banding.
+    """
+    data = text.encode('utf-8')
+    grams = [data[i:i + k] for i in range(len(data) - k + 1)] or [data]
+    bins = [_HASH_RANGE] * num_bins
+    empty = set(range(num_bins))
+    seed = 0
+    while empty and seed < _MAX_ROUNDS:
+        filled = {}
+        for gram in grams:
+            h = zlib.crc32(gram, seed)
+            j = h % num_bins
+            if j in empty:
+                v = h // num_bins
+                if v < filled.get(j, _HASH_RANGE):
+                    filled[j] = v
+        for j, v in filled.items():
+            bins[j] = v + seed * _HASH_RANGE  # later rounds never equal earlier ones
+        empty.difference_update(filled)
+        seed += 1
+    return tuple(bins)
+
+
+class _DisjointSet:
+    def __init__(self):
+        self.parent: Dict[Hashable, Hashable] = {}
+
+    def find(self, x):
+        self.parent.setdefault(x, x)
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a, b) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[rb] = ra
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index of bibliography records keyed by caller-chosen ids."""
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        num_bins: int = DEFAULT_NUM_BINS,
+        bands: int = DEFAULT_BANDS,
+        shingle_size: int = DEFAULT_SHINGLE,
+    ):
+        """
+        Initialize index.
+
+        Args:
+            threshold: Minimum Jaccard similarity (0-1) of two records' shingles
+                to count as near-duplicates
+            num_bins: MinHash signature length
+            bands: LSH bands; num_bins / bands rows each. More bands find
+                lower-similarity candidates at the cost of more comparisons
+            shingle_size: Character n-gram length
+        """
+        if num_bins % bands:
+            raise ValueError(f'num_bins ({num_bins}) must be a multiple of bands ({bands})')
+        self.threshold = threshold
+        self.num_bins = num_bins
+        self.bands = bands
+        self.rows = num_bins // bands
+        self.shingle_size = shingle_size
+        self._texts: Dict[Hashable, str] = {}
+        self._buckets: List[Dict[Tuple[int, ...], List[Hashable]]] = [defaultdict(list) for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def _band_keys(self, text: str) -> List[Tuple[int, ...]]:
+        signature = minhash_signature(text, self.shingle_size, self.num_bins)
+        r = self.rows
+        return [signature[b * r:(b + 1) * r] for b in range(self.bands)]
+
+    def similarity(self, a: Hashable, b: Hashable) -> float:
+        """Exact Jaccard similarity of two indexed records."""
+        return jaccard(shingles(self._texts[a], self.shingle_size), shingles(self._texts[b], self.shingle_size))
+
+    def query(self, title: str, authors=None, year=None) -> List[Tuple[Hashable, float]]:
+        """Indexed records similar to the given one, best match first."""
+        text = record_signature_text(title, authors, year)
+        if not text:
+            return []
+        candidates = set()
+        for bucket, key in zip(self._buckets, self._band_keys(text)):
+            candidates.update(bucket.get(key, ()))
+        own = shingles(text, self.shingle_size)
+        scored = []
+        for item_id in candidates:
+            score = jaccard(own, shingles(self._texts[item_id], self.shingle_size))
+            if score >= self.threshold:
+                scored.append((item_id, score))
+        scored.sort(key=lambda pair: -pair[1])
+        return scored
+
+    def add(self, item_id: Hashable, title: str, authors=None, year=None) -> None:
+        """Index a record. Records without a title are ignored."""
+        text = record_signature_text(title, authors, year)
+        if not text:
+            return
+        if item_id in self._texts:
+            raise ValueError(f'Duplicate id in index: {item_id!r}')
+        self._texts[item_id] = text
+        for bucket, key in zip(self._buckets, self._band_keys(text)):
+            bucket[key].append(item_id)
+
+    def pairs(self) -> List[Tuple[Hashable, Hashable, float]]:
+        """All (id_a, id_b, similarity) pairs at or above the threshold, in insertion order of id_a."""
+        order = {item_id: i for i, item_id in enumerate(self._texts)}
+        cache: Dict[Hashable, set] = {}
+
+        def shingle_set(item_id):
+            if item_id not in cache:
+                cache[item_id] = shingles(self._texts[item_id], self.shingle_size)
+            return cache[item_id]
+
+        seen = set()
+        found = []
+        for buckets in self._buckets:
+            for members in buckets.values():
+                if len(members) < 2:
+                    continue
+                for i, a in enumerate(members):
+                    for b in members[i + 1:]:
+                        pair = (a, b) if order[a] < order[b] else (b, a)
+                        if pair in seen:
+                            continue
+                        seen.add(pair)
+                        score = jaccard(shingle_set(a), shingle_set(b))
+                        if score >= self.threshold:
+                            found.append((pair[0], pair[1], score))
+        found.sort(key=lambda p: (order[p[0]], order[p[1]]))
+        return found
+
+    def clusters(self) -> List[Dict]:
+        """
+        Group near-duplicate pairs transitively.
+
+        Returns:
+            List of {'members': [ids in insertion order], 'pairs': [(a, b, score)],
+            'max_similarity': float, 'min_similarity': float}, ordered by first member
+        """
+        found = self.pairs()
+        groups = _DisjointSet()
+        for a, b, _ in found:
+            groups.union(a, b)
+
+        order = {item_id: i for i, item_id in enumerate(self._texts)}
+        by_root: Dict[Hashable, Dict] = {}
+        for a, b, score in found:
+            cluster = by_root.setdefault(groups.find(a), {'members': set(), 'pairs': []})
+            cluster['members'].update((a, b))
+            cluster['pairs'].append((a, b, round(score, 3)))
+
+        result = []
+        for cluster in by_root.values():
+            scores = [s for _, _, s in cluster['pairs']]
+            result.append({
+                'members': sorted(cluster['members'], key=order.__getitem__),
+                'pairs': cluster['pairs'],
+                'max_similarity': max(scores),
+                'min_similarity': min(scores),
+            })
+        result.sort(key=lambda c: order[c['members'][0]])
+        return result
+
+
+def find_near_duplicates(records: Sequence[Dict], threshold: float = DEFAULT_THRESHOLD,
+                         id_field: Optional[str] = None) -> List[Dict]:
+    """
+    Cluster near-duplicate records.
+
+    Args:
+        records: Dicts with 'title' and optionally 'authors' (or 'author') and 'year'
+        threshold: Minimum similarity
+        id_field: Record field used as id in the result (default: list index)
+
+    Returns:
+        Clusters as returned by NearDuplicateIndex.clusters()
+    """
+    index = NearDuplicateIndex(threshold=threshold)
+    for i, record in enumerate(records):
+        index.add(record[id_field] if id_field else i, record.get('title', ''),
+                  record.get('authors') or record.get('author'), record.get('year'))
+    return index.clusters()
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(
+        description='Find near-duplicate records (title + first author + year) in a JSON list',
+        epilog='Example: python near_duplicates.py results.json --threshold 0.8'
+    )
+    parser.add_argument('file', help='JSON file with a list of records (title, authors, year)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Minimum similarity 0-1 (default: {DEFAULT_THRESHOLD})')
+    args = parser.parse_args()
+
+    with open(args.file, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+
+    clusters = find_near_duplicates(records, threshold=args.threshold)
+    for cluster in clusters:
+        cluster['titles'] = [records[i].get('title', '') for i in cluster['members']]
+    print(json.dumps(clusters, indent=2, ensure_ascii=False))
+    print(f'{len(clusters)} near-duplicate groups in {len(records)} records', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,14 +6,14 @@ Search PubMed using E-utilities API and export results.
 
 import sys
 import os
-import requests
 import argparse
 import json
-import time
 import xml.etree.ElementTree as ET
 from typing import List, Dict, Optional
 from datetime import datetime
 
+from http_cache import CachedSession
+
 class PubMedSearcher:
     """Search PubMed using NCBI E-utilities API."""
     
@@ -28,10 +28,10 @@ class PubMedSearcher:
         self.api_key = api_key or os.getenv('NCBI_API_KEY', '')
         self.email = email or os.getenv('NCBI_EMAIL', '')
         self.base_url = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/'
-        self.session = requests.Session()
         
         # Rate limiting
         self.delay = 0.11 if self.api_key else 0.34  # 10/sec with key, 3/sec without
+        self.session = CachedSession(min_interval=self.delay)
     
     def search(self, query: str, max_results: int = 100,
                date_start: Optional[str] = None, date_end: Optional[str] = None,
@@ -142,9 +142,6 @@ class PubMedSearcher:
                     if metadata:
                         metadata_list.append(metadata)
                 
-                # Rate limiting
-                time.sleep(self.delay)
-                
             except Exception as e:
                 print(f'Error fetching metadata for batch: {e}', file=sys.stderr)
                 continue
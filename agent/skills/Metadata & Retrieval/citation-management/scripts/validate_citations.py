@@ -6,20 +6,61 @@ Validate BibTeX files for accuracy, completeness, and format compliance.
 
 import sys
 import re
-import requests
 import argparse
 import json
-from typing import Dict, List, Tuple, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import Callable, Dict, List, Tuple, Optional
 from collections import defaultdict
 
+import requests
+
+from bibtex_tokenizer import iter_entries
+from doi_to_bibtex import (DEFAULT_BURST, DEFAULT_DELAY, HostRateLimiter, RateLimitedAdapter,
+                           RETRY_STATUS, request_with_retries)
+from http_cache import CachedSession
+from near_duplicates import DEFAULT_THRESHOLD, NearDuplicateIndex
+
 class CitationValidator:
     """Validate BibTeX entries for errors and inconsistencies."""
     
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, workers: int = 8, timeout: float = 10.0,
+                 similarity_threshold: float = DEFAULT_THRESHOLD,
+                 delay: float = DEFAULT_DELAY, max_retries: int = 3, backoff: float = 1.0):
+        """
+        Initialize validator.
+
+        Args:
+            workers: Maximum DOI verifications in flight at once
+            timeout: Per-request timeout in seconds for DOI checks
+            similarity_threshold: Minimum title/author/year similarity (0-1)
+                reported as a possible duplicate
+            delay: Minimum average seconds between network requests to the
+                same host (token bucket shared by all workers)
+            max_retries: Retries per request on 429/5xx responses and timeouts
+            backoff: Base delay (seconds) for exponential backoff with jitter
+        """
+        self.session = CachedSession()
         self.session.headers.update({
             'User-Agent': 'CitationValidator/1.0 (Citation Management Tool)'
         })
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.similarity_threshold = similarity_threshold
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.limiter = HostRateLimiter(interval=delay, burst=DEFAULT_BURST)
+        # requests keeps 10 connections per host by default.
+        pool_size = max(10, self.workers)
+        adapter = RateLimitedAdapter(self.limiter, pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._request_count = 0
+        self._retry_count = 0
+        self._count_lock = threading.Lock()
+        self.parse_errors: List[Dict] = []
         
         # Required fields by entry type
         self.required_fields = {
@@ -40,56 +81,31 @@ class CitationValidator:
             'inproceedings': ['pages'],
         }
     
-    def parse_bibtex_file(self, filepath: str) -> List[Dict]:
+    def parse_bibtex_file(self, filepath: str,
+                          on_entry: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
         """
         Parse BibTeX file and extract entries.
         
         Args:
             filepath: Path to BibTeX file
+            on_entry: Called with each entry as soon as it is parsed
             
         Returns:
-            List of entry dictionaries
+            List of entry dictionaries (with source 'line' and 'offset');
+            malformed entries are skipped and recorded in `parse_errors`
         """
+        self.parse_errors = []
+        entries = []
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
+                for entry in iter_entries(f, self.parse_errors):
+                    entries.append(entry)
+                    if on_entry is not None:
+                        on_entry(entry)
         except Exception as e:
             print(f'Error reading file: {e}', file=sys.stderr)
             return []
         
-        entries = []
-        
-        # Match BibTeX entries
-        pattern = r'@(\w+)\s*\{\s*([^,\s]+)\s*,(.*?)\n\}'
-        matches = re.finditer(pattern, content, re.DOTALL | re.IGNORECASE)
-        
-        for match in matches:
-            entry_type = match.group(1).lower()
-            citation_key = match.group(2).strip()
-            fields_text = match.group(3)
-            
-            # Parse fields
-            fields = {}
-            field_pattern = r'(\w+)\s*=\s*\{([^}]*)\}|(\w+)\s*=\s*"([^"]*)"'
-            field_matches = re.finditer(field_pattern, fields_text)
-            
-            for field_match in field_matches:
-                if field_match.group(1):
-                    field_name = field_match.group(1).lower()
-                    field_value = field_match.group(2)
-                else:
-                    field_name = field_match.group(3).lower()
-                    field_value = field_match.group(4)
-                
-                fields[field_name] = field_value.strip()
-            
-            entries.append({
-                'type': entry_type,
-                'key': citation_key,
-                'fields': fields,
-                'raw': match.group(0)
-            })
-        
         return entries
     
     def validate_entry(self, entry: Dict) -> Tuple[List[Dict], List[Dict]]:
@@ -198,7 +214,7 @@ class CitationValidator:
         
         return errors, warnings
     
-    def verify_doi(self, doi: str) -> Tuple[bool, Optional[Dict]]:
+    def verify_doi(self, doi: str) -> Tuple[Optional[bool], Optional[Dict]]:
         """
         Verify DOI resolves correctly and get metadata.
         
@@ -206,35 +222,64 @@ class CitationValidator:
             doi: Digital Object Identifier
             
         Returns:
-            Tuple of (is_valid, metadata)
+            Tuple of (is_valid, metadata); is_valid is None when the DOI could
+            not be verified (timeouts, connection errors, 429/5xx after retries)
         """
         try:
+            # doi.org answers with a redirect for registered DOIs and 404 for
+            # unknown ones; the publisher's landing page is not consulted, as
+            # many reject HEAD requests or bots.
             url = f'https://doi.org/{doi}'
-            response = self.session.head(url, timeout=10, allow_redirects=True)
+            response = self._request('HEAD', url, allow_redirects=False)
+            if response.status_code in RETRY_STATUS:
+                return None, None
+            if response.status_code >= 400:
+                return False, None
             
-            if response.status_code < 400:
-                # DOI resolves, now get metadata from CrossRef
-                crossref_url = f'https://api.crossref.org/works/{doi}'
-                metadata_response = self.session.get(crossref_url, timeout=10)
+            # DOI resolves, now get metadata from CrossRef
+            crossref_url = f'https://api.crossref.org/works/{doi}'
+            metadata_response = self._request('GET', crossref_url)
+            
+            if metadata_response.status_code == 200:
+                data = metadata_response.json()
+                message = data.get('message', {})
                 
-                if metadata_response.status_code == 200:
-                    data = metadata_response.json()
-                    message = data.get('message', {})
-                    
-                    # Extract key metadata
-                    metadata = {
-                        'title': message.get('title', [''])[0],
-                        'year': self._extract_year_crossref(message),
-                        'authors': self._format_authors_crossref(message.get('author', [])),
-                    }
-                    return True, metadata
-                else:
-                    return True, None  # DOI resolves but no CrossRef metadata
+                # Extract key metadata
+                metadata = {
+                    'title': message.get('title', [''])[0],
+                    'year': self._extract_year_crossref(message),
+                    'authors': self._format_authors_crossref(message.get('author', [])),
+                }
+                return True, metadata
             else:
-                return False, None
+                return True, None  # DOI resolves but no CrossRef metadata
                 
-        except Exception:
-            return False, None
+        except requests.exceptions.RequestException:
+            return None, None
+        except ValueError:
+            return True, None  # DOI resolves but CrossRef metadata is malformed
+    
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        self._count_request()
+        return request_with_retries(
+            self.session, method, url, self.max_retries, self.backoff,
+            on_retry=self._count_retry, timeout=self.timeout, **kwargs,
+        )
+    
+    def _count_request(self) -> None:
+        with self._count_lock:
+            self._request_count += 1
+    
+    def _count_retry(self) -> None:
+        with self._count_lock:
+            self._request_count += 1
+            self._retry_count += 1
+
+    def _submit_doi_check(self, executor: ThreadPoolExecutor, futures: Dict, entry: Dict) -> None:
+        """Submit a verification for the entry's DOI unless that DOI (case-insensitive) is in `futures`."""
+        doi = entry['fields'].get('doi', '').strip()
+        if doi and doi.lower() not in futures:
+            futures[doi.lower()] = executor.submit(self.verify_doi, doi)
     
     def detect_duplicates(self, entries: List[Dict]) -> List[Dict]:
         """
@@ -280,23 +325,26 @@ class CitationValidator:
                     'message': f'Citation key "{key}" appears {count} times'
                 })
         
-        # Check for similar titles (possible duplicates)
-        titles = {}
-        for entry in entries:
-            title = entry['fields'].get('title', '').lower()
-            title = re.sub(r'[^\w\s]', '', title)  # Remove punctuation
-            title = ' '.join(title.split())  # Normalize whitespace
-            
-            if title:
-                if title in titles:
-                    duplicates.append({
-                        'type': 'similar_title',
-                        'entries': [titles[title], entry['key']],
-                        'severity': 'medium',
-                        'message': f'Possible duplicate: "{titles[title]}" and "{entry["key"]}" have identical titles'
-                    })
-                else:
-                    titles[title] = entry['key']
+        # Check for near-duplicate title + first author + year (MinHash/LSH)
+        index = NearDuplicateIndex(threshold=self.similarity_threshold)
+        for i, entry in enumerate(entries):
+            fields = entry['fields']
+            index.add(i, fields.get('title', ''), fields.get('author') or fields.get('editor'), fields.get('year'))
+        
+        for cluster in index.clusters():
+            keys = [entries[i]['key'] for i in cluster['members']]
+            duplicates.append({
+                'type': 'similar_title',
+                'entries': keys,
+                'similarity': cluster['max_similarity'],
+                'pairs': [
+                    {'entries': [entries[a]['key'], entries[b]['key']], 'similarity': score}
+                    for a, b, score in cluster['pairs']
+                ],
+                'severity': 'medium',
+                'message': f'Possible duplicates (similarity {cluster["min_similarity"]:.2f}-'
+                           f'{cluster["max_similarity"]:.2f}): {", ".join(keys)}'
+            })
         
         return duplicates
     
@@ -306,73 +354,149 @@ class CitationValidator:
         
         Args:
             filepath: Path to BibTeX file
-            check_dois: Whether to verify DOIs (slow)
+            check_dois: Whether to verify DOIs (network; runs concurrently
+                with local validation, one request set per distinct DOI)
             
         Returns:
             Validation report dictionary
         """
+        start = time.perf_counter()
+        
+        # DOI checks are submitted while the file is still being parsed, so
+        # parsing and local validation overlap with network latency.
+        executor = None
+        doi_futures = {}
+        doi_start = time.perf_counter()
+        requests_before = self._request_count
+        retries_before = self._retry_count
+        if check_dois:
+            executor = ThreadPoolExecutor(max_workers=self.workers)
+        on_entry = partial(self._submit_doi_check, executor, doi_futures) if executor else None
+        
         print(f'Parsing {filepath}...', file=sys.stderr)
-        entries = self.parse_bibtex_file(filepath)
+        try:
+            entries = self.parse_bibtex_file(filepath, on_entry)
+        except BaseException:
+            if executor is not None:
+                executor.shutdown(wait=True)
+            raise
+        syntax_errors = [
+            {
+                'type': 'syntax_error',
+                'line': error['line'],
+                'offset': error['offset'],
+                'severity': 'high',
+                'message': f'{filepath}:{error["line"]}: {error["message"]}'
+            }
+            for error in self.parse_errors
+        ]
         
         if not entries:
+            if executor is not None:
+                executor.shutdown(wait=True)
             return {
                 'total_entries': 0,
-                'errors': [],
+                'valid_entries': 0,
+                'errors': syntax_errors,
                 'warnings': [],
                 'duplicates': []
             }
         
         print(f'Found {len(entries)} entries', file=sys.stderr)
+        if check_dois:
+            print(f'Verifying {len(doi_futures)} unique DOIs with {self.workers} workers...', file=sys.stderr)
         
-        all_errors = []
-        all_warnings = []
-        
-        # Validate each entry
-        for i, entry in enumerate(entries):
-            print(f'Validating entry {i+1}/{len(entries)}: {entry["key"]}', file=sys.stderr)
-            errors, warnings = self.validate_entry(entry)
-            
-            for error in errors:
-                error['entry'] = entry['key']
-                all_errors.append(error)
+        try:
+            all_errors = list(syntax_errors)
+            all_warnings = []
             
-            for warning in warnings:
-                warning['entry'] = entry['key']
-                all_warnings.append(warning)
-        
-        # Check for duplicates
-        print('Checking for duplicates...', file=sys.stderr)
-        duplicates = self.detect_duplicates(entries)
-        
-        # Verify DOIs if requested
-        doi_errors = []
-        if check_dois:
-            print('Verifying DOIs...', file=sys.stderr)
+            # Validate each entry
             for i, entry in enumerate(entries):
-                doi = entry['fields'].get('doi', '')
-                if doi:
-                    print(f'Verifying DOI {i+1}: {doi}', file=sys.stderr)
-                    is_valid, metadata = self.verify_doi(doi)
+                print(f'Validating entry {i+1}/{len(entries)}: {entry["key"]}', file=sys.stderr)
+                errors, warnings = self.validate_entry(entry)
+                
+                for error in errors:
+                    error['entry'] = entry['key']
+                    error['line'] = entry['line']
+                    all_errors.append(error)
+                
+                for warning in warnings:
+                    warning['entry'] = entry['key']
+                    warning['line'] = entry['line']
+                    all_warnings.append(warning)
+            
+            # Check for duplicates
+            print('Checking for duplicates...', file=sys.stderr)
+            duplicates = self.detect_duplicates(entries)
+            
+            # Collect DOI results
+            doi_errors = []
+            doi_check = None
+            if check_dois:
+                for done, future in enumerate(as_completed(doi_futures.values()), 1):
+                    future.result()
+                    if done % 25 == 0 or done == len(doi_futures):
+                        print(f'Verified {done}/{len(doi_futures)} DOIs', file=sys.stderr)
+                doi_seconds = time.perf_counter() - doi_start
+                doi_requests = self._request_count - requests_before
+                unverified = 0
+                
+                # Report in entry order, once per entry carrying the DOI.
+                for entry in entries:
+                    doi = entry['fields'].get('doi', '').strip()
+                    if not doi:
+                        continue
+                    is_valid, metadata = doi_futures[doi.lower()].result()
                     
-                    if not is_valid:
+                    if is_valid is None:
+                        # Throttled or timed out: not evidence the DOI is wrong.
+                        unverified += 1
+                        all_warnings.append({
+                            'type': 'unverified_doi',
+                            'entry': entry['key'],
+                            'line': entry['line'],
+                            'doi': doi,
+                            'severity': 'low',
+                            'message': f'Entry {entry["key"]}: Could not verify DOI (timeout or server error): {doi}'
+                        })
+                    elif not is_valid:
                         doi_errors.append({
                             'type': 'invalid_doi',
                             'entry': entry['key'],
+                            'line': entry['line'],
                             'doi': doi,
                             'severity': 'high',
                             'message': f'Entry {entry["key"]}: DOI does not resolve: {doi}'
                         })
+                
+                doi_check = {
+                    'unique_dois': len(doi_futures),
+                    'requests': doi_requests,
+                    'retries': self._retry_count - retries_before,
+                    'unverified': unverified,
+                    'wall_seconds': round(doi_seconds, 3),
+                    'requests_per_second': round(doi_requests / doi_seconds, 2) if doi_seconds > 0 else 0.0,
+                    'workers': self.workers,
+                    'timeout': self.timeout,
+                }
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
         
         all_errors.extend(doi_errors)
         
-        return {
+        report = {
             'filepath': filepath,
             'total_entries': len(entries),
-            'valid_entries': len(entries) - len([e for e in all_errors if e['severity'] == 'high']),
+            'valid_entries': len(entries) - len({e['entry'] for e in all_errors if e['severity'] == 'high' and 'entry' in e}),
             'errors': all_errors,
             'warnings': all_warnings,
-            'duplicates': duplicates
+            'duplicates': duplicates,
+            'wall_seconds': round(time.perf_counter() - start, 3),
         }
+        if doi_check is not None:
+            report['doi_check'] = doi_check
+        return report
     
     def _extract_year_crossref(self, message: Dict) -> str:
         """Extract year from CrossRef message."""
@@ -417,7 +541,35 @@ def main():
     parser.add_argument(
         '--check-dois',
         action='store_true',
-        help='Verify DOIs resolve correctly (slow)'
+        help='Verify DOIs resolve correctly (network)'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=8,
+        help='Concurrent DOI verifications (default: 8)'
+    )
+    
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=10.0,
+        help='Per-request timeout in seconds for DOI checks (default: 10)'
+    )
+    
+    parser.add_argument(
+        '--delay',
+        type=float,
+        default=DEFAULT_DELAY,
+        help=f'Minimum seconds between DOI-check requests to the same host (default: {DEFAULT_DELAY})'
+    )
+    
+    parser.add_argument(
+        '--similarity',
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f'Minimum similarity (0-1) for possible-duplicate titles (default: {DEFAULT_THRESHOLD})'
     )
     
     parser.add_argument(
@@ -440,7 +592,8 @@ def main():
     args = parser.parse_args()
     
     # Validate file
-    validator = CitationValidator()
+    validator = CitationValidator(workers=args.workers, timeout=args.timeout,
+                                  similarity_threshold=args.similarity, delay=args.delay)
     report = validator.validate_file(args.file, check_dois=args.check_dois)
     
     # Print summary
@@ -453,6 +606,13 @@ def main():
     print(f'Errors: {len(report["errors"])}')
     print(f'Warnings: {len(report["warnings"])}')
     print(f'Duplicates: {len(report["duplicates"])}')
+    if 'doi_check' in report:
+        check = report['doi_check']
+        print(f'DOI check: {check["unique_dois"]} unique DOIs, {check["requests"]} requests '
+              f'in {check["wall_seconds"]:.1f}s ({check["requests_per_second"]:.1f} req/s)')
+        if check['unverified']:
+            print(f'DOI check: {check["unverified"]} DOIs could not be verified '
+                  f'(timeouts or server errors); re-run later')
     
     # Print errors
     if report['errors']:
@@ -3,49 +3,112 @@
 OpenAlex API Client with rate limiting and error handling.
 
 Provides a robust client for interacting with the OpenAlex API with:
-- Automatic rate limiting (polite pool: 10 req/sec)
-- Exponential backoff retry logic
-- Pagination support
+- Thread-safe token-bucket rate limiting (polite pool: 10 req/sec)
+- Pooled connections with several requests in flight
+- Exponential backoff retry logic (honors 429 Retry-After)
+- Cursor pagination (streaming, resumable, no 10k result cap)
 - Batch operations support
 """
 
+import hashlib
+import json
+import os
+import random
+import threading
 import time
 import requests
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, List, Optional, Any
 from urllib.parse import urljoin
 
+from requests.adapters import HTTPAdapter
+
+from http_cache import CachedSession
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            # A negative balance reserves a future slot for this caller.
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
 
 class OpenAlexClient:
     """Client for OpenAlex API with rate limiting and error handling."""
 
     BASE_URL = "https://api.openalex.org"
 
-    def __init__(self, email: Optional[str] = None, requests_per_second: int = 10):
+    def __init__(
+        self,
+        email: Optional[str] = None,
+        requests_per_second: int = 10,
+        max_workers: int = 4
+    ):
         """
         Initialize OpenAlex client.
 
         Args:
             email: Email for polite pool (10x rate limit boost)
             requests_per_second: Max requests per second (default: 10 for polite pool)
+            max_workers: Requests kept in flight by batch operations; the
+                rate limit is shared by all of them
         """
         self.email = email
         self.requests_per_second = requests_per_second
-        self.min_delay = 1.0 / requests_per_second
-        self.last_request_time = 0
+        self.max_workers = max(1, max_workers)
+        self._limiter = TokenBucket(requests_per_second, capacity=1)
+        # Cached responses skip both the network and the rate limiter
+        self.session = CachedSession(before_request=self._rate_limit)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(10, self.max_workers))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
 
     def _rate_limit(self):
-        """Ensure requests don't exceed rate limit."""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.min_delay:
-            time.sleep(self.min_delay - time_since_last)
-        self.last_request_time = time.time()
+        """Ensure requests don't exceed rate limit (safe across threads)."""
+        self._limiter.acquire()
+
+    def _backoff(self, attempt: int, reason: str, retry_after: Optional[float] = None):
+        # Jitter keeps concurrent requests from retrying in lockstep.
+        wait_time = retry_after if retry_after is not None else (2 ** attempt) * random.uniform(0.5, 1.5)
+        print(f"{reason}. Waiting {wait_time:.1f}s before retry...")
+        time.sleep(wait_time)
 
     def _make_request(
         self,
         endpoint: str,
         params: Optional[Dict] = None,
-        max_retries: int = 5
+        max_retries: int = 5,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Make API request with retry logic.
@@ -54,6 +117,8 @@ class OpenAlexClient:
             endpoint: API endpoint (e.g., '/works', '/authors')
             params: Query parameters
             max_retries: Maximum number of retry attempts
+            use_cache: Serve from / store in the HTTP cache (False for
+                requests whose answer must be live, e.g. cursor pages)
 
         Returns:
             JSON response as dictionary
@@ -66,33 +131,28 @@ class OpenAlexClient:
             params['mailto'] = self.email
 
         url = urljoin(self.BASE_URL, endpoint)
+        headers = None if use_cache else {'Cache-Control': 'no-store'}
 
         for attempt in range(max_retries):
             try:
-                self._rate_limit()
-                response = requests.get(url, params=params, timeout=30)
+                response = self.session.get(url, params=params, headers=headers, timeout=30)
 
                 if response.status_code == 200:
                     return response.json()
-                elif response.status_code == 403:
+                elif response.status_code in (403, 429):
                     # Rate limited
-                    wait_time = 2 ** attempt
-                    print(f"Rate limited. Waiting {wait_time}s before retry...")
-                    time.sleep(wait_time)
+                    self._backoff(attempt, "Rate limited",
+                                  _retry_after_seconds(response.headers.get('Retry-After')))
                 elif response.status_code >= 500:
                     # Server error
-                    wait_time = 2 ** attempt
-                    print(f"Server error. Waiting {wait_time}s before retry...")
-                    time.sleep(wait_time)
+                    self._backoff(attempt, "Server error")
                 else:
                     # Other error - don't retry
                     response.raise_for_status()
 
             except requests.exceptions.Timeout:
                 if attempt < max_retries - 1:
-                    wait_time = 2 ** attempt
-                    print(f"Request timeout. Waiting {wait_time}s before retry...")
-                    time.sleep(wait_time)
+                    self._backoff(attempt, "Request timeout")
                 else:
                     raise
 
@@ -164,31 +224,110 @@ class OpenAlexClient:
         """
         Look up multiple entities by ID efficiently.
 
+        IDs are sent in chunks of 50; up to `max_workers` chunks are in
+        flight at once under the shared rate limit.
+
         Args:
             entity_type: Type of entity ('works', 'authors', etc.)
-            ids: List of IDs (up to 50 per batch)
+            ids: List of IDs (any number; 50 per request)
             id_field: ID field name ('openalex_id', 'doi', 'orcid', etc.)
 
         Returns:
-            List of entity objects
+            List of entity objects, in chunk order
         """
-        all_results = []
-
-        # Process in batches of 50
-        for i in range(0, len(ids), 50):
-            batch = ids[i:i+50]
-            filter_value = '|'.join(batch)
-
+        def lookup_chunk(batch: List[str]) -> List[Dict[str, Any]]:
             params = {
-                'filter': f"{id_field}:{filter_value}",
+                'filter': f"{id_field}:{'|'.join(batch)}",
                 'per-page': 50
             }
+            return self._make_request(f"/{entity_type}", params).get('results', [])
 
-            response = self._make_request(f"/{entity_type}", params)
-            all_results.extend(response.get('results', []))
+        # Process in batches of 50
+        batches = [ids[i:i+50] for i in range(0, len(ids), 50)]
+        if len(batches) <= 1 or self.max_workers == 1:
+            chunk_results = [lookup_chunk(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                chunk_results = list(executor.map(lookup_chunk, batches))
 
+        all_results = []
+        for results in chunk_results:
+            all_results.extend(results)
         return all_results
 
+    def iter_all(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        max_results: Optional[int] = None,
+        select: Optional[List[str]] = None,
+        checkpoint: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream all results using cursor paging.
+
+        Unlike `page=N` paging (capped at 10,000 results), cursor paging
+        reaches every result; only one page is held in memory at a time.
+
+        Args:
+            endpoint: API endpoint (e.g., '/works')
+            params: Query parameters (filter, search, sort, ...)
+            max_results: Stop after this many results (None for all)
+            select: List of fields to return (smaller payloads)
+            checkpoint: JSON file storing the next cursor after each page.
+                If it exists for the same query, iteration resumes from it;
+                it is removed once the result set is exhausted. A page is
+                re-yielded if the consumer stops in the middle of it.
+
+        Yields:
+            Result objects, in API order
+        """
+        params = dict(params or {})
+        params.pop('page', None)
+        if select:
+            params['select'] = ','.join(select)
+        page_size = 200  # Use maximum page size
+        if max_results:
+            page_size = min(page_size, max_results)
+        params['per-page'] = page_size
+
+        # The checkpoint only applies to the query that wrote it.
+        query_key = hashlib.sha1(
+            json.dumps([endpoint, params, max_results], sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+        cursor, yielded = '*', 0
+        if checkpoint and os.path.exists(checkpoint):
+            with open(checkpoint, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('query') == query_key:
+                cursor, yielded = state['cursor'], state['yielded']
+                print(f"Resuming from checkpoint after {yielded} results")
+
+        while cursor:
+            # Cursors expire server-side and a cached "*" page would hide works
+            # added since it was stored, so cursor pages always go to the API.
+            response = self._make_request(endpoint, {**params, 'cursor': cursor}, use_cache=False)
+            results = response.get('results', [])
+
+            for result in results:
+                yield result
+                yielded += 1
+                if max_results and yielded >= max_results:
+                    break
+
+            cursor = response.get('meta', {}).get('next_cursor')
+            if not results or (max_results and yielded >= max_results):
+                cursor = None
+
+            if checkpoint:
+                if cursor:
+                    tmp_path = f"{checkpoint}.tmp"
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        json.dump({'query': query_key, 'cursor': cursor, 'yielded': yielded}, f)
+                    os.replace(tmp_path, checkpoint)
+                elif os.path.exists(checkpoint):
+                    os.remove(checkpoint)
+
     def paginate_all(
         self,
         endpoint: str,
@@ -198,6 +337,9 @@ class OpenAlexClient:
         """
         Paginate through all results.
 
+        Collects `iter_all` into a list; prefer `iter_all` for large result
+        sets so that results are not all held in memory.
+
         Args:
             endpoint: API endpoint
             params: Query parameters
@@ -206,34 +348,7 @@ class OpenAlexClient:
         Returns:
             List of all results
         """
-        if params is None:
-            params = {}
-
-        params['per-page'] = 200  # Use maximum page size
-        params['page'] = 1
-
-        all_results = []
-
-        while True:
-            response = self._make_request(endpoint, params)
-            results = response.get('results', [])
-            all_results.extend(results)
-
-            # Check if we've hit max_results
-            if max_results and len(all_results) >= max_results:
-                return all_results[:max_results]
-
-            # Check if there are more pages
-            meta = response.get('meta', {})
-            total_count = meta.get('count', 0)
-            current_count = len(all_results)
-
-            if current_count >= total_count:
-                break
-
-            params['page'] += 1
-
-        return all_results
+        return list(self.iter_all(endpoint, params, max_results=max_results))
 
     def sample_works(
         self,
@@ -5,14 +5,72 @@ Helper functions for common OpenAlex query patterns.
 Provides high-level functions for typical research queries.
 """
 
-from typing import List, Dict, Optional, Any
+from typing import Iterator, List, Dict, Optional, Any
 from openalex_client import OpenAlexClient
 
 
+def _find_entity(
+    client: OpenAlexClient,
+    endpoint: str,
+    name: str,
+    label: str
+) -> Optional[Dict[str, Any]]:
+    """Return the best search match for `name` at `endpoint`, or None."""
+    response = client._make_request(
+        endpoint,
+        params={'search': name, 'per-page': 1}
+    )
+
+    if not response.get('results'):
+        print(f"No {label} found for: {name}")
+        return None
+
+    entity = response['results'][0]
+    print(f"Found {label}: {entity['display_name']} (ID: {entity['id'].split('/')[-1]})")
+    return entity
+
+
+def iter_author_works(
+    author_name: str,
+    client: OpenAlexClient,
+    limit: Optional[int] = None,
+    select: Optional[List[str]] = None,
+    checkpoint: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream all works by an author (two-step pattern).
+
+    Args:
+        author_name: Author name to search for
+        client: OpenAlexClient instance
+        limit: Maximum number of works to yield (None for all)
+        select: List of fields to return
+        checkpoint: Cursor checkpoint file for resuming (see OpenAlexClient.iter_all)
+
+    Yields:
+        Works by the author
+    """
+    # Step 1: Find author ID
+    author = _find_entity(client, '/authors', author_name, 'author')
+    if author is None:
+        return
+    author_id = author['id'].split('/')[-1]  # Extract ID from URL
+
+    # Step 2: Stream works by author
+    yield from client.iter_all(
+        '/works',
+        {'filter': f'authorships.author.id:{author_id}'},
+        max_results=limit,
+        select=select,
+        checkpoint=checkpoint
+    )
+
+
 def find_author_works(
     author_name: str,
     client: OpenAlexClient,
-    limit: Optional[int] = None
+    limit: Optional[int] = None,
+    select: Optional[List[str]] = None
 ) -> List[Dict[str, Any]]:
     """
     Find all works by an author (two-step pattern).
@@ -21,44 +79,58 @@ def find_author_works(
         author_name: Author name to search for
         client: OpenAlexClient instance
         limit: Maximum number of works to return
+        select: List of fields to return
 
     Returns:
-        List of works by the author
+        List of works by the author (use iter_author_works for large sets)
     """
-    # Step 1: Find author ID
-    author_response = client._make_request(
-        '/authors',
-        params={'search': author_name, 'per-page': 1}
-    )
+    return list(iter_author_works(author_name, client, limit=limit, select=select))
 
-    if not author_response.get('results'):
-        print(f"No author found for: {author_name}")
-        return []
 
-    author = author_response['results'][0]
-    author_id = author['id'].split('/')[-1]  # Extract ID from URL
+def iter_institution_works(
+    institution_name: str,
+    client: OpenAlexClient,
+    limit: Optional[int] = None,
+    select: Optional[List[str]] = None,
+    checkpoint: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream all works from an institution (two-step pattern).
 
-    print(f"Found author: {author['display_name']} (ID: {author_id})")
+    Suitable for corpora of hundreds of thousands of works: only one page
+    is held in memory and `checkpoint` allows resuming an interrupted pull.
 
-    # Step 2: Get works by author
-    works_params = {
-        'filter': f'authorships.author.id:{author_id}',
-        'per-page': 200
-    }
+    Args:
+        institution_name: Institution name to search for
+        client: OpenAlexClient instance
+        limit: Maximum number of works to yield (None for all)
+        select: List of fields to return
+        checkpoint: Cursor checkpoint file for resuming (see OpenAlexClient.iter_all)
 
-    if limit and limit <= 200:
-        works_params['per-page'] = limit
-        response = client._make_request('/works', works_params)
-        return response.get('results', [])
-    else:
-        # Need pagination
-        return client.paginate_all('/works', works_params, max_results=limit)
+    Yields:
+        Works from the institution
+    """
+    # Step 1: Find institution ID
+    institution = _find_entity(client, '/institutions', institution_name, 'institution')
+    if institution is None:
+        return
+    inst_id = institution['id'].split('/')[-1]  # Extract ID from URL
+
+    # Step 2: Stream works from institution
+    yield from client.iter_all(
+        '/works',
+        {'filter': f'authorships.institutions.id:{inst_id}'},
+        max_results=limit,
+        select=select,
+        checkpoint=checkpoint
+    )
 
 
 def find_institution_works(
     institution_name: str,
     client: OpenAlexClient,
-    limit: Optional[int] = None
+    limit: Optional[int] = None,
+    select: Optional[List[str]] = None
 ) -> List[Dict[str, Any]]:
     """
     Find all works from an institution (two-step pattern).
@@ -67,37 +139,12 @@ def find_institution_works(
         institution_name: Institution name to search for
         client: OpenAlexClient instance
         limit: Maximum number of works to return
+        select: List of fields to return
 
     Returns:
-        List of works from the institution
+        List of works from the institution (use iter_institution_works for large sets)
     """
-    # Step 1: Find institution ID
-    inst_response = client._make_request(
-        '/institutions',
-        params={'search': institution_name, 'per-page': 1}
-    )
-
-    if not inst_response.get('results'):
-        print(f"No institution found for: {institution_name}")
-        return []
-
-    institution = inst_response['results'][0]
-    inst_id = institution['id'].split('/')[-1]  # Extract ID from URL
-
-    print(f"Found institution: {institution['display_name']} (ID: {inst_id})")
-
-    # Step 2: Get works from institution
-    works_params = {
-        'filter': f'authorships.institutions.id:{inst_id}',
-        'per-page': 200
-    }
-
-    if limit and limit <= 200:
-        works_params['per-page'] = limit
-        response = client._make_request('/works', works_params)
-        return response.get('results', [])
-    else:
-        return client.paginate_all('/works', works_params, max_results=limit)
+    return list(iter_institution_works(institution_name, client, limit=limit, select=select))
 
 
 def find_highly_cited_recent_papers(
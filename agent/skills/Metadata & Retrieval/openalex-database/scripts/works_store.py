@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+"""
+Local OpenAlex works snapshot with a columnar query engine.
+
+Streams works from OpenAlexClient.iter_all into a directory of compact
+column files, then answers the usual analytics offline:
+- Scalar columns (year, citations, OA flag) are typed binary arrays;
+  type and source are dictionary-encoded
+- Authorships, institutions and concepts are flattened into per-work
+  offset + code arrays (CSR layout), so group-bys never touch JSON
+- Year-range filters, group-by counts and top-k by citations run over
+  whole columns; results use the API's group_by shape
+
+Only the standard library is needed (array, json); a 200k-work snapshot
+is a few tens of MB on disk.
+
+Usage:
+  python works_store.py ingest snapshot/ --filter authorships.institutions.id:I63966007 --email you@example.edu
+  python works_store.py query snapshot/ --group-by publication_year --years 2018-2024
+  python works_store.py query snapshot/ --top 10 --years ">2020"
+"""
+
+import argparse
+import heapq
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from array import array
+from collections import Counter
+from datetime import datetime
+from itertools import compress
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+STORE_VERSION = 1
+
+# Fields requested from the API during ingestion.
+INGEST_SELECT = [
+    'id', 'doi', 'title', 'publication_year', 'cited_by_count', 'type',
+    'open_access', 'primary_location', 'authorships', 'concepts',
+]
+
+# column -> (file, typecode)
+_SCALARS = {
+    'publication_year': ('works.publication_year.bin', 'h'),
+    'cited_by_count': ('works.cited_by_count.bin', 'i'),
+    'is_oa': ('works.is_oa.bin', 'b'),
+    'type': ('works.type.bin', 'I'),
+    'source': ('works.source.bin', 'I'),
+}
+_TEXTS = ('id', 'title', 'doi')
+_RELATIONS = ('author', 'institution', 'concept')
+_DICTIONARIES = ('type', 'source', 'author', 'institution', 'concept')
+
+
+def _short_id(openalex_id: Optional[str]) -> str:
+    return (openalex_id or '').rsplit('/', 1)[-1]
+
+
+def parse_years(spec: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """Turn an OpenAlex year filter (">2020", "<2020", "2020-2023", "2021") into inclusive bounds."""
+    if not spec:
+        return None, None
+    spec = str(spec).strip()
+    if spec.startswith('>'):
+        return int(spec[1:]) + 1, None
+    if spec.startswith('<'):
+        return None, int(spec[1:]) - 1
+    if '-' in spec:
+        start, end = spec.split('-', 1)
+        return (int(start) if start else None), (int(end) if end else None)
+    return int(spec), int(spec)
+
+
+class _Dictionary:
+    """Id -> code mapping; code 0 is reserved for "missing"."""
+
+    def __init__(self, entries: Optional[List[List[str]]] = None):
+        self.ids = [None]
+        self.names = [None]
+        self.codes: Dict[str, int] = {}
+        for entry_id, name in entries or []:
+            self.code(entry_id, name)
+
+    def code(self, entry_id: Optional[str], name: Optional[str] = None) -> int:
+        if not entry_id:
+            return 0
+        code = self.codes.get(entry_id)
+        if code is None:
+            code = self.codes[entry_id] = len(self.ids)
+            self.ids.append(entry_id)
+            self.names.append(name or entry_id)
+        return code
+
+    def dump(self) -> List[List[str]]:
+        return [[i, n] for i, n in zip(self.ids[1:], self.names[1:])]
+
+
+class _Relation:
+    """Per-work lists of codes stored as offsets (len = rows + 1) plus flat codes."""
+
+    def __init__(self, with_scores: bool = False):
+        self.offsets = array('I', [0])
+        self.codes = array('I')
+        self.scores = array('f') if with_scores else None
+
+    def append_row(self, codes: Iterable[int], scores: Optional[Iterable[float]] = None) -> None:
+        self.codes.extend(codes)
+        if self.scores is not None:
+            self.scores.extend(scores or [])
+        self.offsets.append(len(self.codes))
+
+
+def _write_array(path: str, values: array) -> None:
+    with open(path, 'wb') as f:
+        values.tofile(f)
+
+
+def _read_array(path: str, typecode: str, byteorder: str) -> array:
+    values = array(typecode)
+    with open(path, 'rb') as f:
+        values.frombytes(f.read())
+    if byteorder != sys.byteorder:
+        values.byteswap()
+    return values
+
+
+def ingest(
+    client,
+    store_dir: str,
+    endpoint: str = '/works',
+    params: Optional[Dict] = None,
+    max_results: Optional[int] = None,
+    progress_every: int = 10000
+) -> Dict[str, Any]:
+    """
+    Stream works from the API into a new snapshot at `store_dir`.
+
+    Columns are built as works arrive (one API page in memory at a time);
+    text columns go straight to disk. The snapshot replaces `store_dir`
+    only once ingestion has finished.
+
+    Args:
+        client: OpenAlexClient instance
+        store_dir: Snapshot directory to create or replace
+        endpoint: API endpoint to stream from
+        params: Query parameters (filter, search, ...)
+        max_results: Stop after this many works
+
+    Returns:
+        The snapshot manifest
+    """
+    parent = os.path.dirname(os.path.abspath(store_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix='.works-', dir=parent)
+
+    dictionaries = {name: _Dictionary() for name in _DICTIONARIES}
+    scalars = {name: array(typecode) for name, (_, typecode) in _SCALARS.items()}
+    relations = {'author': _Relation(), 'institution': _Relation(), 'concept': _Relation(with_scores=True)}
+    texts = {name: open(os.path.join(tmp_dir, f'works.{name}.txt'), 'w', encoding='utf-8') for name in _TEXTS}
+    start = time.time()
+    rows = 0
+
+    try:
+        for work in client.iter_all(endpoint, params, max_results=max_results, select=INGEST_SELECT):
+            for name in _TEXTS:
+                value = work.get(name) or ''
+                if name == 'id':
+                    value = _short_id(value)
+                texts[name].write(' '.join(str(value).split()) + '\n')
+
+            scalars['publication_year'].append(work.get('publication_year') or 0)
+            scalars['cited_by_count'].append(work.get('cited_by_count') or 0)
+            scalars['is_oa'].append(1 if (work.get('open_access') or {}).get('is_oa') else 0)
+            scalars['type'].append(dictionaries['type'].code(work.get('type')))
+            source = ((work.get('primary_location') or {}).get('source') or {})
+            scalars['source'].append(dictionaries['source'].code(_short_id(source.get('id')), source.get('display_name')))
+
+            author_codes = []
+            institution_codes = []
+            for authorship in work.get('authorships') or []:
+                author = authorship.get('author') or {}
+                author_codes.append(dictionaries['author'].code(_short_id(author.get('id')), author.get('display_name')))
+                for inst in authorship.get('institutions') or []:
+                    code = dictionaries['institution'].code(_short_id(inst.get('id')), inst.get('display_name'))
+                    if code and code not in institution_codes:
+                        institution_codes.append(code)
+            relations['author'].append_row(c for c in author_codes if c)
+            relations['institution'].append_row(institution_codes)
+
+            concepts = [
+                (dictionaries['concept'].code(_short_id(c.get('id')), c.get('display_name')), c.get('score') or 0.0)
+                for c in work.get('concepts') or []
+            ]
+            concepts = [(code, score) for code, score in concepts if code]
+            relations['concept'].append_row((c for c, _ in concepts), (s for _, s in concepts))
+
+            rows += 1
+            if progress_every and rows % progress_every == 0:
+                print(f"Ingested {rows} works...")
+
+        for f in texts.values():
+            f.close()
+        for name, (filename, _) in _SCALARS.items():
+            _write_array(os.path.join(tmp_dir, filename), scalars[name])
+        for name, relation in relations.items():
+            _write_array(os.path.join(tmp_dir, f'rel.{name}.offsets.bin'), relation.offsets)
+            _write_array(os.path.join(tmp_dir, f'rel.{name}.codes.bin'), relation.codes)
+            if relation.scores is not None:
+                _write_array(os.path.join(tmp_dir, f'rel.{name}.scores.bin'), relation.scores)
+        for name, dictionary in dictionaries.items():
+            with open(os.path.join(tmp_dir, f'dict.{name}.json'), 'w', encoding='utf-8') as f:
+                json.dump(dictionary.dump(), f, ensure_ascii=False)
+
+        manifest = {
+            'version': STORE_VERSION,
+            'rows': rows,
+            'byteorder': sys.byteorder,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'endpoint': endpoint,
+            'params': params or {},
+            'ingest_seconds': round(time.time() - start, 1),
+        }
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+    except BaseException:
+        for f in texts.values():
+            f.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    if os.path.exists(store_dir):
+        shutil.rmtree(store_dir)
+    os.replace(tmp_dir, store_dir)
+    return manifest
+
+
+class WorksStore:
+    """Read-only, in-memory view of a snapshot written by `ingest`."""
+
+    def __init__(self, store_dir: str):
+        """
+        Load a snapshot. Numeric columns are read as typed arrays; text
+        columns (titles, DOIs) are loaded on first use.
+
+        Args:
+            store_dir: Snapshot directory
+        """
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('version') != STORE_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {self.manifest.get('version')}")
+        self.rows = self.manifest['rows']
+        byteorder = self.manifest['byteorder']
+
+        self.columns = {
+            name: _read_array(os.path.join(store_dir, filename), typecode, byteorder)
+            for name, (filename, typecode) in _SCALARS.items()
+        }
+        self.relations = {}
+        for name in _RELATIONS:
+            offsets = _read_array(os.path.join(store_dir, f'rel.{name}.offsets.bin'), 'I', byteorder)
+            codes = _read_array(os.path.join(store_dir, f'rel.{name}.codes.bin'), 'I', byteorder)
+            self.relations[name] = (offsets, codes)
+        self.concept_scores = _read_array(os.path.join(store_dir, 'rel.concept.scores.bin'), 'f', byteorder)
+        self.dictionaries = {}
+        for name in _DICTIONARIES:
+            with open(os.path.join(store_dir, f'dict.{name}.json'), 'r', encoding='utf-8') as f:
+                self.dictionaries[name] = _Dictionary(json.load(f))
+        self._texts: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def text(self, name: str) -> List[str]:
+        if name not in self._texts:
+            with open(os.path.join(self.store_dir, f'works.{name}.txt'), 'r', encoding='utf-8') as f:
+                self._texts[name] = f.read().split('\n')[:self.rows]
+        return self._texts[name]
+
+    # -- selection -----------------------------------------------------
+
+    def select(
+        self,
+        years: Optional[str] = None,
+        is_oa: Optional[bool] = None,
+        work_type: Optional[str] = None,
+        min_citations: Optional[int] = None,
+        author_id: Optional[str] = None,
+        institution_id: Optional[str] = None,
+        concept_id: Optional[str] = None
+    ) -> Optional[bytearray]:
+        """
+        Build a row mask from filters (combined with AND).
+
+        Args:
+            years: OpenAlex-style year filter (">2020", "2018-2022", "2021")
+            is_oa: Open access flag
+            work_type: Work type (e.g. 'article')
+            min_citations: Minimum cited_by_count
+            author_id / institution_id / concept_id: Short OpenAlex IDs (A..., I..., C...)
+
+        Returns:
+            bytearray with 1 for selected rows, or None when no filter is given (all rows)
+        """
+        masks = []
+        low, high = parse_years(years)
+        if low is not None or high is not None:
+            low = -32768 if low is None else low
+            high = 32767 if high is None else high
+            masks.append(bytearray(low <= y <= high for y in self.columns['publication_year']))
+        if is_oa is not None:
+            flag = 1 if is_oa else 0
+            masks.append(bytearray(v == flag for v in self.columns['is_oa']))
+        if work_type is not None:
+            code = self.dictionaries['type'].codes.get(work_type, -1)
+            masks.append(bytearray(v == code for v in self.columns['type']))
+        if min_citations is not None:
+            masks.append(bytearray(v >= min_citations for v in self.columns['cited_by_count']))
+        for name, entity_id in (('author', author_id), ('institution', institution_id), ('concept', concept_id)):
+            if entity_id is not None:
+                masks.append(self._relation_mask(name, _short_id(entity_id)))
+
+        if not masks:
+            return None
+        mask = masks[0]
+        for other in masks[1:]:
+            mask = bytearray(a & b for a, b in zip(mask, other))
+        return mask
+
+    def _relation_mask(self, name: str, entity_id: str) -> bytearray:
+        mask = bytearray(self.rows)
+        code = self.dictionaries[name].codes.get(entity_id)
+        if code is None:
+            return mask
+        offsets, codes = self.relations[name]
+        for row in range(self.rows):
+            if code in codes[offsets[row]:offsets[row + 1]]:
+                mask[row] = 1
+        return mask
+
+    def _rows(self, mask: Optional[bytearray]) -> Iterable[int]:
+        return range(self.rows) if mask is None else compress(range(self.rows), mask)
+
+    # -- aggregation ---------------------------------------------------
+
+    def count(self, mask: Optional[bytearray] = None) -> int:
+        return self.rows if mask is None else sum(mask)
+
+    def group_by(self, field: str, mask: Optional[bytearray] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Count works per value of `field`, largest groups first.
+
+        Args:
+            field: 'publication_year', 'is_oa', 'type', 'source', 'author',
+                'institution' or 'concept'
+            mask: Row mask from select() (None for all rows)
+            limit: Keep only the largest `limit` groups
+
+        Returns:
+            List of {'key', 'key_display_name', 'count'} (API group_by shape)
+        """
+        if field in self.columns:
+            column = self.columns[field]
+            counts = Counter(column if mask is None else compress(column, mask))
+        elif field in self.relations:
+            offsets, codes = self.relations[field]
+            if mask is None:
+                counts = Counter(codes)
+            else:
+                counts = Counter()
+                for row in compress(range(self.rows), mask):
+                    counts.update(codes[offsets[row]:offsets[row + 1]])
+        else:
+            raise ValueError(f"Unknown group_by field: {field}")
+
+        groups = counts.most_common(limit)
+        dictionary = self.dictionaries.get(field)
+        result = []
+        for value, count in groups:
+            if dictionary is not None:
+                key, name = dictionary.ids[value], dictionary.names[value]
+            elif field == 'is_oa':
+                key = name = bool(value)
+            else:
+                key = name = value
+            result.append({'key': key, 'key_display_name': name, 'count': count})
+        return result
+
+    def top_k(self, k: int, by: str = 'cited_by_count', mask: Optional[bytearray] = None) -> List[Dict[str, Any]]:
+        """
+        The `k` works with the largest value of a numeric column.
+
+        Args:
+            k: Number of works
+            by: 'cited_by_count' or 'publication_year'
+            mask: Row mask from select()
+
+        Returns:
+            Work summaries (id, doi, title, publication_year, cited_by_count, is_oa, source)
+        """
+        column = self.columns[by]
+        best = heapq.nlargest(k, self._rows(mask), key=column.__getitem__)
+        return [self.work(row) for row in best]
+
+    def work(self, row: int) -> Dict[str, Any]:
+        """Summary dict for one row."""
+        source = self.dictionaries['source']
+        return {
+            'id': self.text('id')[row],
+            'doi': self.text('doi')[row] or None,
+            'title': self.text('title')[row],
+            'publication_year': self.columns['publication_year'][row],
+            'cited_by_count': self.columns['cited_by_count'][row],
+            'is_oa': bool(self.columns['is_oa'][row]),
+            'type': self.dictionaries['type'].ids[self.columns['type'][row]],
+            'source': source.names[self.columns['source'][row]],
+        }
+
+    # -- local versions of query_helpers ------------------------------
+
+    def publication_trends(self, years: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Works per publication year, newest first (local get_publication_trends)."""
+        groups = self.group_by('publication_year', self.select(years=years))
+        return sorted(groups, key=lambda g: g['key'], reverse=True)
+
+    def highly_cited(self, years: str = ">2020", limit: int = 100) -> List[Dict[str, Any]]:
+        """Most cited works in a year range (local find_highly_cited_recent_papers)."""
+        return self.top_k(limit, 'cited_by_count', self.select(years=years))
+
+    def research_output(self, years: str = ">2020", top: int = 10) -> Dict[str, Any]:
+        """Output summary of the snapshot (local analyze_research_output)."""
+        mask = self.select(years=years)
+        total = self.count(mask)
+        oa_mask = self.select(years=years, is_oa=True)
+        oa_count = self.count(oa_mask)
+        return {
+            'total_works': total,
+            'open_access_works': oa_count,
+            'open_access_percentage': round(oa_count / total * 100, 1) if total else 0,
+            'publications_by_year': self.publication_trends(years)[:top],
+            'top_concepts': self.group_by('concept', mask, limit=top),
+            'top_sources': self.group_by('source', mask, limit=top),
+            'top_authors': self.group_by('author', mask, limit=top),
+        }
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(description='Build and query a local OpenAlex works snapshot')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    ingest_parser = sub.add_parser('ingest', help='Stream works from the API into a snapshot')
+    ingest_parser.add_argument('store', help='Snapshot directory (replaced when done)')
+    ingest_parser.add_argument('--filter', help='OpenAlex filter, e.g. authorships.institutions.id:I63966007')
+    ingest_parser.add_argument('--search', help='Full-text search')
+    ingest_parser.add_argument('--max-results', type=int, help='Stop after this many works')
+    ingest_parser.add_argument('--email', help='Email for the polite pool')
+
+    query_parser = sub.add_parser('query', help='Query a snapshot offline')
+    query_parser.add_argument('store', help='Snapshot directory')
+    query_parser.add_argument('--years', help='Year filter: ">2020", "2018-2022", "2021"')
+    query_parser.add_argument('--oa', action='store_true', help='Only open access works')
+    query_parser.add_argument('--type', dest='work_type', help='Work type, e.g. article')
+    query_parser.add_argument('--author', help='Author ID (A...)')
+    query_parser.add_argument('--institution', help='Institution ID (I...)')
+    query_parser.add_argument('--concept', help='Concept ID (C...)')
+    query_parser.add_argument('--group-by', help='publication_year, is_oa, type, source, author, institution, concept')
+    query_parser.add_argument('--top', type=int, help='Top N works by citations')
+    query_parser.add_argument('--limit', type=int, default=20, help='Groups to show (default: 20)')
+
+    args = parser.parse_args()
+
+    if args.command == 'ingest':
+        from openalex_client import OpenAlexClient
+
+        params = {}
+        if args.filter:
+            params['filter'] = args.filter
+        if args.search:
+            params['search'] = args.search
+        manifest = ingest(OpenAlexClient(email=args.email), args.store, params=params, max_results=args.max_results)
+        print(f"Wrote {manifest['rows']} works to {args.store} in {manifest['ingest_seconds']}s")
+        return
+
+    start = time.perf_counter()
+    store = WorksStore(args.store)
+    loaded = time.perf_counter()
+    mask = store.select(
+        years=args.years,
+        is_oa=True if args.oa else None,
+        work_type=args.work_type,
+        author_id=args.author,
+        institution_id=args.institution,
+        concept_id=args.concept,
+    )
+    result: Dict[str, Any] = {'works': store.count(mask)}
+    if args.group_by:
+        result['group_by'] = store.group_by(args.group_by, mask, limit=args.limit)
+    if args.top:
+        result['top'] = store.top_k(args.top, 'cited_by_count', mask)
+    done = time.perf_counter()
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    print(f"Loaded {store.rows} works in {(loaded - start) * 1000:.0f} ms, "
+          f"query took {(done - loaded) * 1000:.0f} ms", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
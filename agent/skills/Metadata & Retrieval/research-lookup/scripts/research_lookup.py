@@ -6,9 +6,14 @@ Routes research queries to the best backend:
   - Parallel Chat API (core model): Default for all general research queries
   - Perplexity sonar-pro-search (via OpenRouter): Academic-specific paper searches
 
+Successful results are cached on disk, keyed by (backend, model, normalized
+query), so a repeated question returns without an API call until the entry
+expires. Batch lookups run concurrently with a per-backend concurrency limit.
+
 Environment variables:
   PARALLEL_API_KEY    - Required for Parallel Chat API (primary backend)
   OPENROUTER_API_KEY  - Required for Perplexity academic searches (fallback)
+  RESEARCH_CACHE_DIR  - Result cache directory (default ~/.cache/research-lookup)
 """
 
 import os
@@ -16,9 +21,97 @@ import sys
 import json
 import re
 import time
+import hashlib
+import tempfile
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+DEFAULT_CACHE_TTL = 7 * 24 * 3600  # seconds
+DEFAULT_CONCURRENCY = {"parallel": 4, "perplexity": 2}
+BACKEND_MODELS = {"parallel": "parallel-chat/core", "perplexity": "perplexity/sonar-pro-search"}
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    return " ".join(query.lower().split()).rstrip(" ?.!")
+
+
+class ResultCache:
+    """On-disk cache of lookup results, one JSON file per key, expiring after `ttl` seconds."""
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl: float = DEFAULT_CACHE_TTL):
+        self.cache_dir = cache_dir or os.getenv(
+            "RESEARCH_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "research-lookup")
+        )
+        self.ttl = ttl
+
+    @staticmethod
+    def key(backend: str, model: str, query: str) -> str:
+        raw = json.dumps([backend, model, normalize_query(query)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result, or None when missing, unreadable or expired."""
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("stored_at", 0) > self.ttl:
+            return None
+        return entry.get("result")
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": time.time(), "result": result}, f, ensure_ascii=False, default=str)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[Research] Warning: could not write cache entry: {e}", file=sys.stderr)
+
+
+def summarize_results(results: List[Dict[str, Any]], wall_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """Latency and token-usage statistics for a list of lookup results."""
+    fresh = [r for r in results if not r.get("cached")]
+    latencies = sorted(r["latency_seconds"] for r in fresh if r.get("latency_seconds") is not None)
+    tokens = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    for r in fresh:
+        for name in tokens:
+            tokens[name] += (r.get("usage") or {}).get(name) or 0
+    stats = {
+        "queries": len(results),
+        "succeeded": sum(1 for r in results if r.get("success")),
+        "cached": len(results) - len(fresh),
+        "latency_seconds": {
+            "median": round(latencies[len(latencies) // 2], 2) if latencies else None,
+            "max": round(latencies[-1], 2) if latencies else None,
+            "sum": round(sum(latencies), 2),
+        },
+        "tokens": tokens,
+    }
+    if wall_seconds is not None:
+        stats["wall_seconds"] = round(wall_seconds, 2)
+    return stats
+
+
+def _make_timer(start: float, first_chunk: List[float],
+                on_chunk: Callable[[str], None]) -> Callable[[str], None]:
+    """Wrap `on_chunk` so the delay from `start` to the first chunk lands in `first_chunk`."""
+    def timed_chunk(text: str) -> None:
+        if not first_chunk:
+            first_chunk.append(time.perf_counter() - start)
+        on_chunk(text)
+    return timed_chunk
 
 
 class ResearchLookup:
@@ -57,15 +150,35 @@ class ResearchLookup:
     )
 
     CHAT_BASE_URL = "https://api.parallel.ai"
-
-    def __init__(self, force_backend: Optional[str] = None):
+    OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+    def __init__(
+        self,
+        force_backend: Optional[str] = None,
+        concurrency: Optional[Dict[str, int]] = None,
+        use_cache: bool = True,
+        cache_ttl: float = DEFAULT_CACHE_TTL,
+        cache_dir: Optional[str] = None,
+    ):
         """Initialize the research lookup tool.
 
         Args:
             force_backend: Force a specific backend ('parallel' or 'perplexity').
                           If None, backend is auto-selected based on query content.
+            concurrency: Maximum simultaneous requests per backend
+                         (default: parallel 4, perplexity 2).
+            use_cache: Serve repeated queries from the on-disk result cache.
+            cache_ttl: Seconds a cached result stays valid.
+            cache_dir: Cache directory (default: $RESEARCH_CACHE_DIR or
+                       ~/.cache/research-lookup).
         """
         self.force_backend = force_backend
+        self.concurrency = dict(DEFAULT_CONCURRENCY, **(concurrency or {}))
+        self._slots = {name: threading.BoundedSemaphore(max(1, n)) for name, n in self.concurrency.items()}
+        self._start_lock = threading.Lock()
+        self._last_start: Dict[str, float] = {}
+        self.cache = ResultCache(cache_dir, cache_ttl) if use_cache else None
+        self.last_batch_stats: Optional[Dict[str, Any]] = None
         self.parallel_available = bool(os.getenv("PARALLEL_API_KEY"))
         self.perplexity_available = bool(os.getenv("OPENROUTER_API_KEY"))
 
@@ -118,8 +231,18 @@ class ResearchLookup:
             )
         return self._chat_client
 
-    def _parallel_lookup(self, query: str) -> Dict[str, Any]:
-        """Run research via the Parallel Chat API (core model)."""
+    @staticmethod
+    def _usage_dict(usage) -> Dict[str, Any]:
+        """Token counts from an OpenAI-style usage object or dict."""
+        get = usage.get if isinstance(usage, dict) else lambda name: getattr(usage, name, None)
+        return {name: get(name) for name in ("prompt_tokens", "completion_tokens", "total_tokens")}
+
+    def _parallel_lookup(self, query: str, on_chunk: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """Run research via the Parallel Chat API (core model).
+
+        With `on_chunk`, the response is streamed and each content delta is
+        passed to `on_chunk` as it arrives.
+        """
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         model = "core"
 
@@ -128,23 +251,31 @@ class ResearchLookup:
 
             print(f"[Research] Parallel Chat API (model={model})...", file=sys.stderr)
 
+            stream_kwargs = {}
+            if on_chunk is not None:
+                # Without include_usage a stream carries no token counts.
+                stream_kwargs = {"stream": True, "stream_options": {"include_usage": True}}
             response = client.chat.completions.create(
                 model=model,
                 messages=[
                     {"role": "system", "content": self.PARALLEL_SYSTEM_PROMPT},
                     {"role": "user", "content": query},
                 ],
-                stream=False,
+                **stream_kwargs,
             )
 
-            content = ""
-            if response.choices and len(response.choices) > 0:
-                content = response.choices[0].message.content or ""
+            if on_chunk is not None:
+                content, response, usage = self._read_chat_stream(response, on_chunk)
+            else:
+                content = ""
+                if response.choices and len(response.choices) > 0:
+                    content = response.choices[0].message.content or ""
+                usage = getattr(response, "usage", None)
 
-            api_citations = self._extract_basis_citations(response)
+            api_citations = self._extract_basis_citations(response) if response is not None else []
             text_citations = self._extract_citations_from_text(content)
 
-            return {
+            result = {
                 "success": True,
                 "query": query,
                 "response": content,
@@ -154,6 +285,9 @@ class ResearchLookup:
                 "backend": "parallel",
                 "model": f"parallel-chat/{model}",
             }
+            if usage:
+                result["usage"] = self._usage_dict(usage)
+            return result
 
         except Exception as e:
             return {
@@ -165,6 +299,29 @@ class ResearchLookup:
                 "model": f"parallel-chat/{model}",
             }
 
+    @staticmethod
+    def _read_chat_stream(stream, on_chunk: Callable[[str], None]) -> Tuple[str, Any, Any]:
+        """Consume an OpenAI-client chat stream.
+
+        Returns the accumulated content, the last chunk that carried the
+        research basis (None if no chunk did) and the usage reported by the
+        final chunk (None without stream_options include_usage).
+        """
+        parts = []
+        last_meta = None
+        usage = None
+        for chunk in stream:
+            if getattr(chunk, "basis", None):
+                last_meta = chunk
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+            if chunk.choices:
+                text = getattr(chunk.choices[0].delta, "content", None)
+                if text:
+                    parts.append(text)
+                    on_chunk(text)
+        return "".join(parts), last_meta, usage
+
     def _extract_basis_citations(self, response) -> List[Dict[str, str]]:
         """Extract citation sources from the Chat API research basis."""
         citations = []
@@ -198,8 +355,12 @@ class ResearchLookup:
     # Perplexity academic search backend
     # ------------------------------------------------------------------
 
-    def _perplexity_lookup(self, query: str) -> Dict[str, Any]:
-        """Run academic search via Perplexity sonar-pro-search through OpenRouter."""
+    def _perplexity_lookup(self, query: str, on_chunk: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """Run academic search via Perplexity sonar-pro-search through OpenRouter.
+
+        With `on_chunk`, the response is streamed (server-sent events) and
+        each content delta is passed to `on_chunk` as it arrives.
+        """
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         api_key = os.getenv("OPENROUTER_API_KEY")
@@ -248,14 +409,22 @@ class ResearchLookup:
         }
 
         try:
-            response = requests.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers=headers,
-                json=data,
-                timeout=90,
-            )
-            response.raise_for_status()
-            resp_json = response.json()
+            if on_chunk is not None:
+                data["stream"] = True
+                # With stream=True the timeout bounds each read, not the whole response.
+                with requests.post(self.OPENROUTER_URL, headers=headers, json=data,
+                                   timeout=90, stream=True) as response:
+                    response.raise_for_status()
+                    resp_json = self._read_sse_stream(response, on_chunk)
+            else:
+                response = requests.post(
+                    self.OPENROUTER_URL,
+                    headers=headers,
+                    json=data,
+                    timeout=90,
+                )
+                response.raise_for_status()
+                resp_json = response.json()
 
             if "choices" in resp_json and len(resp_json["choices"]) > 0:
                 choice = resp_json["choices"][0]
@@ -292,6 +461,44 @@ class ResearchLookup:
                 "model": model,
             }
 
+    @staticmethod
+    def _read_sse_stream(response, on_chunk: Callable[[str], None]) -> Dict[str, Any]:
+        """Consume an OpenRouter server-sent event stream.
+
+        Returns a dict shaped like a non-streamed completion: the content
+        deltas joined into choices[0].message.content, plus the last seen
+        usage, citations and search_results.
+        """
+        response.encoding = "utf-8"
+        parts = []
+        merged: Dict[str, Any] = {}
+        choice_extra: Dict[str, Any] = {}
+        # chunk_size=None hands over each chunk as it arrives (the default buffers 512 bytes).
+        for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue  # blank separators and ": OPENROUTER PROCESSING" keep-alives
+            payload = line[5:].strip()
+            if payload == "[DONE]":
+                break
+            event = json.loads(payload)
+            if "error" in event:
+                raise Exception(f"Stream error: {event['error']}")
+            for key, value in event.items():
+                if key != "choices" and value:
+                    merged[key] = value
+            for choice in event.get("choices") or []:
+                text = (choice.get("delta") or {}).get("content")
+                if text:
+                    parts.append(text)
+                    on_chunk(text)
+                for key in ("citations", "search_results"):
+                    if choice.get(key):
+                        choice_extra[key] = choice[key]
+        if not parts and not merged:
+            raise Exception("Empty response stream from API")
+        merged["choices"] = [dict(choice_extra, message={"role": "assistant", "content": "".join(parts)})]
+        return merged
+
     # ------------------------------------------------------------------
     # Shared utilities
     # ------------------------------------------------------------------
@@ -405,30 +612,118 @@ Remember: Quality over quantity. Prioritize influential, highly-cited papers fro
     # Public API
     # ------------------------------------------------------------------
 
-    def lookup(self, query: str) -> Dict[str, Any]:
+    def _wait_for_slot_start(self, backend: str, delay: float) -> None:
+        """Space request starts to the same backend at least `delay` seconds apart."""
+        if delay <= 0:
+            return
+        with self._start_lock:
+            now = time.monotonic()
+            start = max(now, self._last_start.get(backend, 0.0) + delay)
+            self._last_start[backend] = start
+        if start > now:
+            time.sleep(start - now)
+
+    def lookup(
+        self,
+        query: str,
+        delay: float = 0.0,
+        on_chunk: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, Any]:
         """Perform a research lookup, routing to the best backend.
 
         Parallel Chat API is used by default. Perplexity sonar-pro-search
         is used only for academic-specific queries (paper searches, DOI lookups).
+
+        The result carries 'latency_seconds' and 'cached'; successful results
+        are stored in the result cache. Safe to call from several threads:
+        at most `concurrency[backend]` requests per backend run at once.
+
+        Args:
+            query: Research question.
+            delay: Minimum seconds between request starts to the same backend.
+            on_chunk: If given, the response is streamed and each content
+                      chunk is passed here as it arrives; the result then also
+                      carries 'ttft_seconds' (time to first chunk). A cached
+                      result is delivered as a single chunk.
         """
         backend = self._select_backend(query)
-        print(f"[Research] Backend: {backend} | Query: {query[:80]}...", file=sys.stderr)
-
-        if backend == "parallel":
-            return self._parallel_lookup(query)
-        else:
-            return self._perplexity_lookup(query)
+        key = ResultCache.key(backend, BACKEND_MODELS[backend], query) if self.cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                print(f"[Research] Cache hit ({backend}) | Query: {query[:80]}...", file=sys.stderr)
+                result = dict(cached, query=query, cached=True, latency_seconds=0.0)
+                if on_chunk is not None:
+                    on_chunk(result.get("response", ""))
+                    result["ttft_seconds"] = 0.0
+                return result
+
+        with self._slots[backend]:
+            self._wait_for_slot_start(backend, delay)
+            print(f"[Research] Backend: {backend} | Query: {query[:80]}...", file=sys.stderr)
+            start = time.perf_counter()
+            first_chunk: List[float] = []
+            timed_chunk = _make_timer(start, first_chunk, on_chunk) if on_chunk else None
+
+            if backend == "parallel":
+                result = self._parallel_lookup(query, on_chunk=timed_chunk)
+            else:
+                result = self._perplexity_lookup(query, on_chunk=timed_chunk)
+            result["latency_seconds"] = round(time.perf_counter() - start, 2)
+            result["cached"] = False
+            if on_chunk is not None:
+                result["ttft_seconds"] = round(first_chunk[0], 2) if first_chunk else None
+
+        if key and result.get("success"):
+            self.cache.put(key, result)
+        return result
+
+    def batch_lookup(self, queries: List[str], delay: float = 0.0) -> List[Dict[str, Any]]:
+        """Perform multiple research lookups concurrently.
+
+        Each backend gets its own thread pool of `concurrency[backend]`
+        workers, so a slow backend never holds up the other; `delay`
+        (seconds) spaces out request starts per backend. Repeated queries
+        in the batch are looked up once. Results are in input order;
+        statistics over the distinct queries are stored in
+        `last_batch_stats` (see summarize_results).
+        """
+        start = time.perf_counter()
+        unique: Dict[str, str] = {}
+        for query in queries:
+            unique.setdefault(normalize_query(query), query)
+        by_backend: Dict[str, List[str]] = {}
+        for norm in unique:
+            by_backend.setdefault(self._select_backend(unique[norm]), []).append(norm)
+        done = [0]
+        done_lock = threading.Lock()
+
+        def run(norm: str) -> Dict[str, Any]:
+            query = unique[norm]
+            result = self.lookup(query, delay=delay)
+            with done_lock:
+                done[0] += 1
+                count = done[0]
+            status = "cached" if result.get("cached") else f"{result.get('latency_seconds', 0):.1f}s"
+            print(f"[Research] Completed query {count}/{len(unique)} ({status}): {query[:50]}...", file=sys.stderr)
+            return result
+
+        executors = [
+            (ThreadPoolExecutor(max_workers=max(1, min(len(norms), self.concurrency[backend]))), norms)
+            for backend, norms in by_backend.items()
+        ]
+        try:
+            pending = [(norms, executor.map(run, norms)) for executor, norms in executors]
+            by_query = {}
+            for norms, results in pending:
+                by_query.update(zip(norms, results))
+        finally:
+            for executor, _ in executors:
+                executor.shutdown()
 
-    def batch_lookup(self, queries: List[str], delay: float = 1.0) -> List[Dict[str, Any]]:
-        """Perform multiple research lookups with delay between requests."""
-        results = []
-        for i, query in enumerate(queries):
-            if i > 0 and delay > 0:
-                time.sleep(delay)
-            result = self.lookup(query)
-            results.append(result)
-            print(f"[Research] Completed query {i+1}/{len(queries)}: {query[:50]}...", file=sys.stderr)
-        return results
+        self.last_batch_stats = summarize_results(list(by_query.values()), time.perf_counter() - start)
+        self.last_batch_stats["repeated_queries"] = len(queries) - len(unique)
+        return [dict(by_query[normalize_query(q)], query=q) for q in queries]
 
 
 # ---------------------------------------------------------------------------
@@ -459,6 +754,15 @@ Examples:
 
   # JSON output
   python research_lookup.py "topic" --json -o results.json
+
+  # Concurrent batch (up to 4 Parallel / 2 Perplexity requests at once)
+  python research_lookup.py --batch "q1" "q2" "q3" --parallel-concurrency 6
+
+  # Print the report as it is generated
+  python research_lookup.py "topic" --stream -o results.md
+
+  # Bypass the result cache
+  python research_lookup.py "topic" --no-cache
         """,
     )
     parser.add_argument("query", nargs="?", help="Research query to look up")
@@ -470,6 +774,23 @@ Examples:
     )
     parser.add_argument("-o", "--output", help="Write output to file")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="Stream the response as it is generated (single query; with --json the text goes to stderr)",
+    )
+    parser.add_argument(
+        "--parallel-concurrency", type=int, default=DEFAULT_CONCURRENCY["parallel"],
+        help=f"Simultaneous Parallel Chat API requests in --batch (default: {DEFAULT_CONCURRENCY['parallel']})",
+    )
+    parser.add_argument(
+        "--perplexity-concurrency", type=int, default=DEFAULT_CONCURRENCY["perplexity"],
+        help=f"Simultaneous Perplexity requests in --batch (default: {DEFAULT_CONCURRENCY['perplexity']})",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and do not update the result cache")
+    parser.add_argument(
+        "--cache-ttl", type=float, default=DEFAULT_CACHE_TTL / 3600,
+        help=f"Hours a cached result stays valid (default: {DEFAULT_CACHE_TTL // 3600})",
+    )
 
     args = parser.parse_args()
 
@@ -477,11 +798,12 @@ Examples:
     if args.output:
         output_file = open(args.output, "w", encoding="utf-8")
 
-    def write_output(text):
+    def write_output(text, end="\n"):
         if output_file:
-            output_file.write(text + "\n")
+            output_file.write(text + end)
+            output_file.flush()
         else:
-            print(text)
+            print(text, end=end, flush=True)
 
     has_parallel = bool(os.getenv("PARALLEL_API_KEY"))
     has_perplexity = bool(os.getenv("OPENROUTER_API_KEY"))
@@ -499,15 +821,62 @@ Examples:
             output_file.close()
         return 1
 
+    if args.stream and args.batch:
+        print("Note: --stream applies to single queries; running the batch without streaming.", file=sys.stderr)
+        args.stream = False
+
+    def write_header(query, i, timestamp, backend, model):
+        write_output(f"\n{'='*80}")
+        write_output(f"Query {i+1}: {query}")
+        write_output(f"Timestamp: {timestamp}")
+        write_output(f"Backend: {backend} | Model: {model}")
+        write_output(f"{'='*80}")
+
     try:
-        research = ResearchLookup(force_backend=args.force_backend)
+        research = ResearchLookup(
+            force_backend=args.force_backend,
+            concurrency={"parallel": args.parallel_concurrency, "perplexity": args.perplexity_concurrency},
+            use_cache=not args.no_cache,
+            cache_ttl=args.cache_ttl * 3600,
+        )
 
         if args.batch:
             print(f"Running batch research for {len(args.batch)} queries...", file=sys.stderr)
             results = research.batch_lookup(args.batch)
+            stats = research.last_batch_stats
+        elif args.stream:
+            print(f"Researching: {args.query}", file=sys.stderr)
+            if args.json:
+                def on_chunk(text):
+                    print(text, end="", file=sys.stderr, flush=True)
+            else:
+                backend = research._select_backend(args.query)
+                write_header(args.query, 0, datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                             backend, BACKEND_MODELS[backend])
+
+                def on_chunk(text):
+                    write_output(text, end="")
+            results = [research.lookup(args.query, on_chunk=on_chunk)]
+            if args.json:
+                print(file=sys.stderr)
+            else:
+                write_output("")
+            stats = summarize_results(results)
         else:
             print(f"Researching: {args.query}", file=sys.stderr)
             results = [research.lookup(args.query)]
+            stats = summarize_results(results)
+
+        latency = stats["latency_seconds"]
+        print(
+            f"[Research] {stats['succeeded']}/{stats['queries']} succeeded, {stats['cached']} cached"
+            + (f", wall {stats['wall_seconds']}s" if "wall_seconds" in stats else "")
+            + (f", latency median {latency['median']}s / max {latency['max']}s" if latency["max"] is not None else "")
+            + (f", first chunk after {results[0]['ttft_seconds']}s"
+               if args.stream and results[0].get("ttft_seconds") is not None else "")
+            + f", tokens {stats['tokens']['total_tokens']}",
+            file=sys.stderr,
+        )
 
         if args.json:
             write_output(json.dumps(results, indent=2, ensure_ascii=False, default=str))
@@ -517,12 +886,10 @@ Examples:
 
         for i, result in enumerate(results):
             if result["success"]:
-                write_output(f"\n{'='*80}")
-                write_output(f"Query {i+1}: {result['query']}")
-                write_output(f"Timestamp: {result['timestamp']}")
-                write_output(f"Backend: {result.get('backend', 'unknown')} | Model: {result.get('model', 'unknown')}")
-                write_output(f"{'='*80}")
-                write_output(result["response"])
+                if not args.stream:
+                    write_header(result["query"], i, result["timestamp"],
+                                 result.get("backend", "unknown"), result.get("model", "unknown"))
+                    write_output(result["response"])
 
                 sources = result.get("sources", [])
                 if sources:
@@ -548,6 +915,12 @@ Examples:
 
                 if result.get("usage"):
                     write_output(f"\nUsage: {result['usage']}")
+                if result.get("cached"):
+                    write_output("(from cache)")
+                elif result.get("latency_seconds") is not None:
+                    ttft = result.get("ttft_seconds")
+                    write_output(f"Latency: {result['latency_seconds']}s"
+                                 + (f" (first chunk {ttft}s)" if ttft is not None else ""))
             else:
                 write_output(f"\nError in query {i+1}: {result['error']}")
 
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import xml.etree.ElementTree as ET
+
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_ARXIV = "{http://arxiv.org/schemas/atom}"
+_OPENSEARCH = "{http://a9.com/-/spec/opensearch/1.1/}"
+
+
+def _text(elem: Optional[ET.Element]) -> str:
+    if elem is None:
+        return ""
+    return "".join(elem.itertext())
+
+
+def _record_from_entry(entry: ET.Element) -> Dict[str, Any]:
+    """Reduce one <entry> element to the fields fetch_papers uses."""
+    link = None
+    for l in entry.findall(f"{_ATOM}link"):
+        if l.get("rel", "alternate") == "alternate" and l.get("href"):
+            link = l.get("href")
+            break
+    if link is None:
+        link = _text(entry.find(f"{_ATOM}id")).strip() or None
+
+    primary = entry.find(f"{_ARXIV}primary_category")
+    return {
+        "title": _text(entry.find(f"{_ATOM}title")),
+        "link": link,
+        "category": primary.get("term") if primary is not None else None,
+        "authors": [_text(a.find(f"{_ATOM}name")) for a in entry.findall(f"{_ATOM}author")],
+        # ISO-8601 timestamps; only the date part is used downstream.
+        "published": _text(entry.find(f"{_ATOM}published")).strip()[:10] or None,
+        "updated": _text(entry.find(f"{_ATOM}updated")).strip()[:10] or None,
+        "summary": _text(entry.find(f"{_ATOM}summary")),
+    }
+
+
+def iter_entries(chunks: Iterable[bytes], meta: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """Incrementally parse an arXiv Atom response, yielding one record per <entry>.
+
+    `chunks` is any iterable of bytes (e.g. `resp.iter_content(...)`). Each
+    entry element is dropped from the tree once converted, so memory stays
+    bounded by a single entry rather than the whole feed. Feed-level
+    `opensearch:totalResults` is stored into `meta["total_results"]` when given.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    root = None
+    depth = 0
+
+    def _drain():
+        nonlocal root, depth
+        for event, elem in parser.read_events():
+            if event == "start":
+                if root is None:
+                    root = elem
+                depth += 1
+                continue
+
+            depth -= 1
+            # Only direct children of <feed> (depth 1 after the end event).
+            if depth != 1:
+                continue
+            if elem.tag == f"{_ATOM}entry":
+                record = _record_from_entry(elem)
+                root.remove(elem)
+                yield record
+            elif elem.tag == f"{_OPENSEARCH}totalResults" and meta is not None:
+                try:
+                    meta["total_results"] = int(_text(elem).strip())
+                except ValueError:
+                    pass
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        parser.feed(chunk)
+        yield from _drain()
+    parser.close()
+    yield from _drain()
@@ -0,0 +1,173 @@
+"""Benchmark the streaming Atom parser against the feedparser path.
+
+Each parser runs in its own subprocess so that peak RSS is measured
+independently. Feeds are either recorded arXiv responses (--feed) or a
+synthetic feed in the arXiv API format.
+
+Usage:
+  python scripts/bench_atom_parser.py
+  python scripts/bench_atom_parser.py --entries 2000 --repeat 3
+  python scripts/bench_atom_parser.py --feed recorded_slice.xml
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from xml.sax.saxutils import escape
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+_CHUNK_SIZE = 64 * 1024
+
+
+def _synthetic_entry(i: int) -> str:
+    summary = " ".join(
+        f"We study agentic systems for problem {i} with method {j} and report results."
+        for j in range(12)
+    )
+    authors = "".join(
+        f"<author><name>Author {i}-{k}</name></author>" for k in range(1 + i % 8)
+    )
+    arxiv_id = f"2608.{i:05d}v{1 + i % 3}"
+    return (
+        "<entry>"
+        f"<id>http://arxiv.org/abs/{arxiv_id}</id>"
+        "<updated>2026-08-21T17:59:58Z</updated>"
+        "<published>2026-08-20T17:59:58Z</published>"
+        f"<title>An Agentic Approach to\n  Problem {i} &amp; Friends</title>"
+        f"<summary>  {escape(summary)}\n</summary>"
+        f"{authors}"
+        '<arxiv:comment xmlns:arxiv="http://arxiv.org/schemas/atom">12 pages</arxiv:comment>'
+        f'<link href="http://arxiv.org/abs/{arxiv_id}" rel="alternate" type="text/html"/>'
+        f'<link title="pdf" href="http://arxiv.org/pdf/{arxiv_id}" rel="related" type="application/pdf"/>'
+        '<arxiv:primary_category xmlns:arxiv="http://arxiv.org/schemas/atom" term="cs.AI" scheme="http://arxiv.org/schemas/atom"/>'
+        '<category term="cs.AI" scheme="http://arxiv.org/schemas/atom"/>'
+        '<category term="cs.CL" scheme="http://arxiv.org/schemas/atom"/>'
+        "</entry>"
+    )
+
+
+def write_synthetic_feed(path: str, entries: int) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<feed xmlns="http://www.w3.org/2005/Atom">'
+            '<title type="html">ArXiv Query</title>'
+            '<opensearch:totalResults xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+            f"{entries}</opensearch:totalResults>"
+        )
+        for i in range(entries):
+            f.write(_synthetic_entry(i))
+        f.write("</feed>\n")
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _worker(parser_name: str, feed_path: str, repeat: int) -> None:
+    import fetch_arxiv
+    import arxiv_atom
+    import feedparser
+    from settings import build_settings
+
+    settings = build_settings({})
+    baseline = _peak_rss_mb()
+
+    def _chunks():
+        with open(feed_path, "rb") as f:
+            for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+                yield chunk
+
+    best = None
+    papers = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        if parser_name == "feedparser":
+            # Mirrors the legacy path: whole body buffered as text, then parsed.
+            text = b"".join(_chunks()).decode("utf-8")
+            feed = feedparser.parse(text)
+            records = [fetch_arxiv._record_from_feedparser_entry(e) for e in feed.entries]
+            del feed, text
+        else:
+            records = list(arxiv_atom.iter_entries(_chunks()))
+        papers = fetch_arxiv._papers_from_records(settings, records)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+
+    print(
+        json.dumps(
+            {
+                "parser": parser_name,
+                "entries": len(papers),
+                "seconds": best,
+                "entries_per_sec": len(papers) / best if best else 0.0,
+                "baseline_rss_mb": baseline,
+                "peak_rss_mb": _peak_rss_mb(),
+                "papers": papers,
+            },
+            ensure_ascii=False,
+        )
+    )
+
+
+def _run(parser_name: str, feed_path: str, repeat: int):
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", parser_name, feed_path, "--repeat", str(repeat)],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark arXiv Atom parsing paths")
+    parser.add_argument("--feed", action="append", default=[], help="Recorded arXiv API response (repeatable)")
+    parser.add_argument("--entries", type=int, default=2000, help="Entries in the synthetic feed")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions per parser (best is reported)")
+    parser.add_argument("--worker", nargs=2, metavar=("PARSER", "FEED"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.worker[0], args.worker[1], args.repeat)
+        return 0
+
+    feeds = list(args.feed)
+    tmp_dir = None
+    if not feeds:
+        tmp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmp_dir.name, f"synthetic_{args.entries}.xml")
+        write_synthetic_feed(path, args.entries)
+        feeds.append(path)
+
+    try:
+        print(f"{'feed':<28} {'parser':<11} {'entries':>7} {'entries/s':>10} {'peak RSS':>9} {'Δ RSS':>8}")
+        for feed_path in feeds:
+            size_mb = os.path.getsize(feed_path) / (1024 * 1024)
+            results = [_run(name, feed_path, args.repeat) for name in ("feedparser", "stream")]
+            for r in results:
+                print(
+                    f"{os.path.basename(feed_path)[:20] + f' {size_mb:.1f}MB':<28} {r['parser']:<11} "
+                    f"{r['entries']:>7} {r['entries_per_sec']:>10.0f} "
+                    f"{r['peak_rss_mb']:>7.1f}MB {r['peak_rss_mb'] - r['baseline_rss_mb']:>6.1f}MB"
+                )
+            if results[0]["papers"] != results[1]["papers"]:
+                print("  ! stream and feedparser outputs differ")
+    finally:
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""Benchmark per-entry formatting in fetch_papers: config lookups vs. Settings.
+
+"legacy" mirrors the loop before settings.py, where every entry walked the
+config dict for author_et_al_threshold / date_source / summary_max_chars and
+re-read safety.strip_control_chars for every field; "settings" is the current
+_papers_from_records. Both run over the same synthetic records, loaded with
+the repo's config.yaml, and must produce identical output.
+
+Usage:
+  python scripts/bench_entry_format.py
+  python scripts/bench_entry_format.py --entries 20000 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import fetch_arxiv  # noqa: E402
+from config_loader import get_config_value, load_config  # noqa: E402
+from settings import BASE_DIR, build_settings  # noqa: E402
+
+
+def _synthetic_records(n: int):
+    summary = " ".join(
+        "We study agentic systems\nand report results on many benchmarks." for _ in range(12)
+    )
+    return [
+        {
+            "title": f"An Agentic Approach to\n  Problem {i}",
+            "link": f"http://arxiv.org/abs/2608.{i:05d}v{1 + i % 3}",
+            "category": "cs.AI",
+            "authors": [f"Author {i}-{k}" for k in range(1 + i % 8)],
+            "published": "2026-08-20",
+            "updated": "2026-08-21",
+            "summary": summary,
+        }
+        for i in range(n)
+    ]
+
+
+def _legacy_maybe_clean_text(config, text):
+    if bool(get_config_value(config, "safety.strip_control_chars", True)):
+        return fetch_arxiv._strip_control_chars(text)
+    return text
+
+
+def _legacy_papers_from_records(config, records):
+    papers = []
+    for record in records:
+        title = _legacy_maybe_clean_text(config, record["title"]).replace("\n", " ").strip()
+        link = record["link"] or ""
+        arxiv_id, arxiv_version = fetch_arxiv.extract_arxiv_id_from_url(link)
+        category = record["category"] or "Unknown"
+
+        authors = [_legacy_maybe_clean_text(config, a) for a in record["authors"]]
+        author_threshold = get_config_value(config, "fetch.formatting.author_et_al_threshold", 1)
+        if len(authors) > int(author_threshold):
+            author_str = f"{authors[0]} et al."
+        elif len(authors) == 1:
+            author_str = authors[0]
+        else:
+            author_str = "Unknown"
+
+        date_source = str(
+            get_config_value(config, "fetch.formatting.date_source", "published") or "published"
+        ).strip().lower()
+        if date_source == "updated" and record["updated"]:
+            pub_date = record["updated"]
+        else:
+            pub_date = record["published"] or "Unknown Date"
+
+        summary = _legacy_maybe_clean_text(config, record["summary"]).replace("\n", " ").strip()
+        summary_max_chars = get_config_value(config, "fetch.formatting.summary_max_chars", 250)
+        summary_hint = (
+            summary[: int(summary_max_chars)] + "..."
+            if len(summary) > int(summary_max_chars)
+            else summary
+        )
+
+        papers.append({
+            "title": title,
+            "link": link,
+            "arxiv_id": arxiv_id,
+            "arxiv_version": arxiv_version,
+            "category": category,
+            "summary": summary_hint,
+            "published": pub_date,
+            "author": author_str,
+        })
+    return papers
+
+
+def _best_of(fn, repeat: int):
+    best, result = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark fetch_papers entry formatting")
+    parser.add_argument("--entries", type=int, default=20000, help="Synthetic records per run")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions (best is reported)")
+    args = parser.parse_args()
+
+    records = _synthetic_records(args.entries)
+
+    t0 = time.perf_counter()
+    config = load_config(BASE_DIR)
+    settings = build_settings(config, BASE_DIR)
+    load_ms = (time.perf_counter() - t0) * 1000
+
+    legacy_s, legacy = _best_of(lambda: _legacy_papers_from_records(config, records), args.repeat)
+    current_s, current = _best_of(lambda: fetch_arxiv._papers_from_records(settings, records), args.repeat)
+
+    print(f"config.yaml load + validation: {load_ms:.1f} ms (once per process)")
+    print(f"{'path':<10} {'entries':>8} {'seconds':>9} {'entries/s':>11}")
+    for name, seconds in (("legacy", legacy_s), ("settings", current_s)):
+        print(f"{name:<10} {args.entries:>8} {seconds:>9.4f} {args.entries / seconds:>11.0f}")
+    print(f"speedup: {legacy_s / current_s:.2f}x")
+    if legacy != current:
+        print("  ! legacy and settings outputs differ")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Keep the skill copies of shared modules identical to their canonical source.
+
+Skills under agent/skills/ are self-contained directories, so modules they
+share with the pipeline (http_cache.py) are copied into each skill rather
+than imported across directories. Only the canonical file is edited; this
+check fails when a copy has drifted, and `--sync` rewrites the copies.
+
+Usage:
+  python scripts/check_shared_modules.py
+  python scripts/check_shared_modules.py --sync
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+
+from typing import Dict, List
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Canonical file -> copies, relative to BASE_DIR.
+SHARED_MODULES: Dict[str, List[str]] = {
+    "scripts/http_cache.py": [
+        "agent/skills/CorePipeline/literature-review/scripts/http_cache.py",
+        "agent/skills/Metadata & Retrieval/citation-management/scripts/http_cache.py",
+        "agent/skills/Metadata & Retrieval/openalex-database/scripts/http_cache.py",
+    ],
+}
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def stale_copies(base_dir: str = BASE_DIR) -> List[str]:
+    """Copies (relative paths) that are missing or differ from their canonical file."""
+    stale = []
+    for canonical, copies in SHARED_MODULES.items():
+        source = _read(os.path.join(base_dir, canonical))
+        for copy in copies:
+            path = os.path.join(base_dir, copy)
+            if not os.path.exists(path) or _read(path) != source:
+                stale.append(copy)
+    return stale
+
+
+def sync_copies(base_dir: str = BASE_DIR) -> List[str]:
+    """Overwrite stale copies with their canonical file; returns what was rewritten."""
+    stale = set(stale_copies(base_dir))
+    for canonical, copies in SHARED_MODULES.items():
+        for copy in copies:
+            if copy in stale:
+                shutil.copyfile(os.path.join(base_dir, canonical), os.path.join(base_dir, copy))
+    return sorted(stale)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check that skill copies of shared modules are identical")
+    parser.add_argument("--sync", action="store_true", help="Rewrite drifted copies from the canonical file")
+    args = parser.parse_args()
+
+    if args.sync:
+        for copy in sync_copies():
+            print(f"synced {copy}")
+        return 0
+
+    stale = stale_copies()
+    for copy in stale:
+        canonical = next(c for c, copies in SHARED_MODULES.items() if copy in copies)
+        print(f"{copy} differs from {canonical}", file=sys.stderr)
+    if stale:
+        print("Edit the canonical file and run: python scripts/check_shared_modules.py --sync", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,31 +1,38 @@
 import datetime
+import glob
+import hashlib
+import json
 import urllib.parse
 import feedparser
 import os
 import re
+import threading
 import time
 
-import requests
-
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Any, Dict, List
 
-from config_loader import load_config, get_config_value
+import arxiv_atom
+import http_cache
+import inbox_shards
+import journal
+import paper_index
+from config_loader import get_config_value
+from settings import Settings, load_settings
+from paper_index import (
+    ARXIV_ABS_RE,
+    extract_arxiv_id_from_url,
+    parse_arxiv_id_and_version,
+    read_text_if_exists,
+)
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
-_ARXIV_ABS_RE = re.compile(r"arxiv\.org/abs/([^\s\)\]]+)", re.IGNORECASE)
 _CONTROL_CHARS_RE = re.compile(r"[\x00-\x1f\x7f]")
-
-
-def _read_text_if_exists(path: str) -> str:
-    try:
-        if path and os.path.exists(path):
-            with open(path, "r", encoding="utf-8") as f:
-                return f.read() or ""
-    except Exception:
-        return ""
-    return ""
+# abs links as written into Inbox.md; the id (with optional vN) stops before ?, # and markdown delimiters.
+# Host and case handling follow paper_index's ARXIV_ABS_RE / _MD_ARXIV_ENTRY_RE.
+_INBOX_ABS_LINK_RE = re.compile(r"https?://(?:www\.)?arxiv\.org/abs/([^\s\)\]?#]+)", re.IGNORECASE)
 
 
 def _scan_arxiv_versions_from_text(content: str):
@@ -35,9 +42,9 @@ def _scan_arxiv_versions_from_text(content: str):
     if not content:
         return links, versions
 
-    for match in _ARXIV_ABS_RE.finditer(content):
+    for match in ARXIV_ABS_RE.finditer(content):
         raw = match.group(1)
-        base, ver = _parse_arxiv_id_and_version(raw)
+        base, ver = parse_arxiv_id_and_version(raw)
         if base:
             old = versions.get(base)
             if ver is None:
@@ -74,7 +81,7 @@ def _scan_archived_index(config):
     archived_versions_by_id = {}
 
     # 1) Scan Contents.md (fast path)
-    content = _read_text_if_exists(contents_path)
+    content = read_text_if_exists(contents_path)
     links, versions = _scan_arxiv_versions_from_text(content)
     archived_links |= links
     archived_versions_by_id.update(versions)
@@ -87,7 +94,7 @@ def _scan_archived_index(config):
                     if fn.lower() != "list.md":
                         continue
                     p = os.path.join(root, fn)
-                    t = _read_text_if_exists(p)
+                    t = read_text_if_exists(p)
                     l2, v2 = _scan_arxiv_versions_from_text(t)
                     archived_links |= l2
                     for k, v in v2.items():
@@ -106,30 +113,24 @@ def _strip_control_chars(text: str) -> str:
     return _CONTROL_CHARS_RE.sub("", text or "")
 
 
-def _maybe_clean_text(config, text: str) -> str:
-    if bool(get_config_value(config, "safety.strip_control_chars", True)):
-        return _strip_control_chars(text)
-    return text
-
+def _replace_arxiv_versions(text: str, latest_by_id: Dict[str, int]) -> str:
+    """Point every abs link of an id in `latest_by_id` at that version, in one pass.
 
-def _parse_arxiv_id_and_version(arxiv_id_with_optional_version: str):
-    raw = (arxiv_id_with_optional_version or "").strip()
-    if not raw:
-        return None, None
+    Each link is tokenized once and its base id looked up in the dict, so the
+    cost is linear in the text regardless of how many ids were updated. Ids
+    only match whole (2601.0001 does not touch 2601.00011).
+    """
+    if not latest_by_id:
+        return text
 
-    raw = raw.split("?")[0].split("#")[0]
+    def _sub(m):
+        base, _version = parse_arxiv_id_and_version(m.group(1))
+        latest = latest_by_id.get(base)
+        if latest is None:
+            return m.group(0)
+        return f"https://arxiv.org/abs/{base}v{latest}"
 
-    m = re.match(r"^(?P<base>.+?)(?:v(?P<ver>\d+))?$", raw, re.IGNORECASE)
-    if not m:
-        return raw, None
-
-    base = m.group("base")
-    ver = m.group("ver")
-    try:
-        version = int(ver) if ver is not None else None
-    except Exception:
-        version = None
-    return base, version
+    return _INBOX_ABS_LINK_RE.sub(_sub, text)
 
 
 def _extract_abs_link(entry) -> Optional[str]:
@@ -142,13 +143,24 @@ def _extract_abs_link(entry) -> Optional[str]:
     return str(getattr(entry, "link", "") or "") or None
 
 
-def _extract_arxiv_id_from_url(url: str):
-    if not url:
-        return None, None
-    m = _ARXIV_ABS_RE.search(url)
-    if not m:
-        return None, None
-    return _parse_arxiv_id_and_version(m.group(1))
+def _record_from_feedparser_entry(entry) -> Dict[str, Any]:
+    """Convert a feedparser entry into the compact record shape of arxiv_atom."""
+
+    def _date(parsed) -> Optional[str]:
+        if not parsed:
+            return None
+        return datetime.date(*parsed[:3]).strftime("%Y-%m-%d")
+
+    primary = getattr(entry, "arxiv_primary_category", None)
+    return {
+        "title": entry.title,
+        "link": _extract_abs_link(entry),
+        "category": primary["term"] if primary else None,
+        "authors": [a.name for a in entry.authors],
+        "published": _date(getattr(entry, "published_parsed", None)),
+        "updated": _date(getattr(entry, "updated_parsed", None)),
+        "summary": entry.summary,
+    }
 
 
 def _normalize_id_list(value: Any) -> List[str]:
@@ -176,8 +188,8 @@ def _scan_existing_inbox_for_arxiv_versions(content: str):
     if not content:
         return versions
 
-    for match in _ARXIV_ABS_RE.finditer(content):
-        base, ver = _parse_arxiv_id_and_version(match.group(1))
+    for match in ARXIV_ABS_RE.finditer(content):
+        base, ver = parse_arxiv_id_and_version(match.group(1))
         if not base:
             continue
         old = versions.get(base)
@@ -189,11 +201,45 @@ def _scan_existing_inbox_for_arxiv_versions(content: str):
             versions[base] = ver
     return versions
 
-def fetch_papers():
-    config = load_config(BASE_DIR)
+def _open_paper_index(config):
+    """Open the persistent paper index, or return None when `index.enabled` is off."""
+    if not paper_index.index_enabled(config):
+        return None
+    try:
+        return paper_index.open_index(config, BASE_DIR)
+    except Exception as e:
+        print(f"打开论文索引失败，回退为全量扫描: {e}")
+        return None
 
-    print(f"获取日期为 {datetime.date.today()}...")
 
+def _load_known_index(config, papers, index_conn=None):
+    """Return (inbox_links, inbox_versions, archived_links, archived_versions).
+
+    With an index connection only the ids/links of `papers` are looked up;
+    otherwise Inbox.md and the archive are rescanned in full.
+    """
+    if index_conn is not None:
+        return paper_index.known_for_papers(index_conn, papers)
+
+    content = "\n".join(
+        read_text_if_exists(path) for path in inbox_shards.inbox_paths(config, BASE_DIR)
+    )
+
+    inbox_versions = _scan_existing_inbox_for_arxiv_versions(content)
+    inbox_links = set()
+    for m in re.finditer(r"\((https?://[^\)]+)\)", content):
+        inbox_links.add(m.group(1))
+
+    archived_links, archived_versions = _scan_archived_index(config)
+    return inbox_links, inbox_versions, archived_links, archived_versions
+
+
+def _build_query_params(config, categories=None, keywords=None):
+    """Return (base_url, params) for the configured query.
+
+    `categories` / `keywords` override `fetch.query.*` (used to split one
+    combined query into per-category or per-keyword sub-queries).
+    """
     base_url = get_config_value(
         config,
         "fetch.arxiv_api.base_url",
@@ -223,22 +269,14 @@ def fetch_papers():
     if max_results <= 0:
         max_results = 1
 
-    timeout_seconds = get_config_value(config, "fetch.arxiv_api.http.timeout_seconds", 30)
-    retries = get_config_value(config, "fetch.arxiv_api.http.retries", 3)
-    backoff_seconds = get_config_value(config, "fetch.arxiv_api.http.backoff_seconds", 2)
-    min_delay_seconds = get_config_value(config, "fetch.arxiv_api.http.min_delay_seconds", 3)
-    user_agent = get_config_value(
-        config,
-        "fetch.arxiv_api.http.user_agent",
-        "MyArxiv-Agent/1.0 (+https://github.com/)",
-    )
-
-    categories = get_config_value(config, "fetch.query.categories", ["cs.AI"])
-    keywords = get_config_value(config, "fetch.query.keywords", ["Agent"])
+    if categories is None:
+        categories = get_config_value(config, "fetch.query.categories", ["cs.AI"])
+    if keywords is None:
+        keywords = get_config_value(config, "fetch.query.keywords", ["Agent"])
     keyword_field = get_config_value(config, "fetch.query.keyword_field", "all")
     combine_mode = get_config_value(config, "fetch.query.combine_mode", "(cat_or) AND (kw_or)")
     id_list = _normalize_id_list(get_config_value(config, "fetch.query.id_list", []))
-    
+
     cat_query = " OR ".join([f"cat:{c}" for c in categories]) if categories else ""
     kw_query = " OR ".join([f"{keyword_field}:{k}" for k in keywords]) if keywords else ""
 
@@ -250,7 +288,7 @@ def fetch_papers():
         search_query = kw_query
     else:
         search_query = "" if id_list else "all:agent"
-    
+
     params = {
         'start': start,
         'max_results': max_results,
@@ -262,91 +300,175 @@ def fetch_papers():
     if id_list:
         params['id_list'] = ",".join(id_list)
 
-    query_string = urllib.parse.urlencode(params)
-    url_for_print = f"{base_url}?{query_string}"
-    print(f"查询链接为: {url_for_print}")
+    return base_url, params
+
+
+def _split_query_params(config, split_by: str):
+    """Split the combined query into one sub-query per category or keyword."""
+    categories = get_config_value(config, "fetch.query.categories", ["cs.AI"]) or []
+    keywords = get_config_value(config, "fetch.query.keywords", ["Agent"]) or []
+
+    if split_by == "category" and len(categories) > 1:
+        return [_build_query_params(config, categories=[c])[1] for c in categories]
+    if split_by == "keyword" and len(keywords) > 1:
+        return [_build_query_params(config, keywords=[k])[1] for k in keywords]
+    return [_build_query_params(config)[1]]
+
+
+class _RateLimiter:
+    """Thread-safe token bucket shared by every request to the arXiv API.
+
+    With the default capacity of 1, request starts are spaced at least
+    `interval` seconds apart across all threads (arXiv's `min_delay_seconds`
+    policy). A caller that finds no token reserves the next free slot and
+    sleeps outside the lock, so waiting threads are served in arrival order.
+    """
+
+    def __init__(self, interval: float, capacity: int = 1):
+        self._interval = max(float(interval), 0.0)
+        self._capacity = max(int(capacity), 1)
+        self._tokens = float(self._capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self._interval > 0:
+                refill = (now - self._updated) / self._interval
+                self._tokens = min(float(self._capacity), self._tokens + refill)
+            else:
+                self._tokens = float(self._capacity)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens * self._interval if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+def _http_settings(config) -> Dict[str, Any]:
+    try:
+        min_delay = float(get_config_value(config, "fetch.arxiv_api.http.min_delay_seconds", 3))
+    except Exception:
+        min_delay = 3.0
+
+    return {
+        "timeout_seconds": float(get_config_value(config, "fetch.arxiv_api.http.timeout_seconds", 30)),
+        "retries": int(get_config_value(config, "fetch.arxiv_api.http.retries", 3)),
+        "backoff_seconds": float(get_config_value(config, "fetch.arxiv_api.http.backoff_seconds", 2)),
+        "min_delay_seconds": min_delay,
+        # stream: incremental Atom parsing (arxiv_atom); feedparser: legacy full-tree parse
+        "parser": str(get_config_value(config, "fetch.arxiv_api.parser", "stream")).strip().lower(),
+        "user_agent": str(
+            get_config_value(
+                config,
+                "fetch.arxiv_api.http.user_agent",
+                "MyArxiv-Agent/1.0 (+https://github.com/)",
+            )
+        ),
+    }
+
+
+def _http_session(config, limiter: _RateLimiter) -> http_cache.CachedSession:
+    """Session shared by all slices and sub-queries of one run.
+
+    Network requests go through the shared `limiter`, so `min_delay_seconds`
+    is honoured between consecutive slices and across threads, not only
+    between retries; responses served from the cache skip it.
+    """
+    cache_rel = get_config_value(config, "paths.cache_dir", ".cache")
+    cache_cfg = get_config_value(config, "fetch.arxiv_api.http.cache", {}) or {}
+    mode = str(cache_cfg.get("mode", "on")).strip().lower()
+    cache = None
+    if mode != "off":
+        cache = http_cache.ResponseCache(
+            os.path.join(BASE_DIR, cache_rel, cache_cfg.get("file", "http_cache.sqlite3")),
+            max_bytes=int(float(cache_cfg.get("max_mb", 64)) * 1024 * 1024),
+            ttls={"export.arxiv.org": float(cache_cfg.get("ttl_seconds", 3600))},
+        )
+    return http_cache.CachedSession(cache=cache, mode=mode, before_request=limiter.acquire)
+
+
+def _request_slice(base_url: str, params: Dict[str, Any], http: Dict[str, Any]):
+    """GET one API slice with retries; returns (records, total_results) or raises."""
+    min_delay = http["min_delay_seconds"]
+    retries = http["retries"]
 
     last_error: Optional[Exception] = None
-    last_request_ts: Optional[float] = None
-    for attempt in range(int(retries) + 1):
+    for attempt in range(retries + 1):
         try:
-            if last_request_ts is not None:
-                elapsed = time.time() - last_request_ts
-                try:
-                    min_delay = float(min_delay_seconds)
-                except Exception:
-                    min_delay = 3.0
-                if elapsed < min_delay:
-                    time.sleep(min_delay - elapsed)
-
-            resp = requests.get(
+            if http["parser"] == "feedparser":
+                resp = http["session"].get(
+                    base_url,
+                    params=params,
+                    timeout=http["timeout_seconds"],
+                    headers={"User-Agent": http["user_agent"]},
+                )
+                resp.raise_for_status()
+                feed = feedparser.parse(resp.text)
+                records = []
+                for entry in feed.entries:
+                    try:
+                        records.append(_record_from_feedparser_entry(entry))
+                    except Exception as e:
+                        print(f"Skipping entry due to error: {e}")
+                return records, _feed_total_results(feed)
+
+            with http["session"].get(
                 base_url,
                 params=params,
-                timeout=float(timeout_seconds),
-                headers={"User-Agent": str(user_agent)},
-            )
-            last_request_ts = time.time()
-            resp.raise_for_status()
-            feed = feedparser.parse(resp.text)
-            last_error = None
-            break
+                timeout=http["timeout_seconds"],
+                headers={"User-Agent": http["user_agent"]},
+                stream=True,
+            ) as resp:
+                resp.raise_for_status()
+                meta: Dict[str, Any] = {}
+                records = list(
+                    arxiv_atom.iter_entries(resp.iter_content(chunk_size=64 * 1024), meta)
+                )
+            return records, meta.get("total_results")
         except Exception as e:
             last_error = e
-            if attempt >= int(retries):
+            # Retrying cannot help when the cache is the only source.
+            if attempt >= retries or http["session"].mode == "cache-only":
                 break
-            sleep_seconds = float(backoff_seconds) * (2**attempt)
-            try:
-                min_delay = float(min_delay_seconds)
-            except Exception:
-                min_delay = 3.0
-            sleep_seconds = max(sleep_seconds, min_delay)
+            sleep_seconds = max(http["backoff_seconds"] * (2**attempt), min_delay)
             print(f"获取数据错误(第{attempt+1}次): {e}; {sleep_seconds:.1f}s 后重试...")
             time.sleep(sleep_seconds)
 
-    if last_error is not None:
-        print(f"获取数据错误: {last_error}")
-        return []
+    raise last_error if last_error is not None else RuntimeError("请求失败")
+
 
+def _papers_from_records(settings: Settings, records) -> List[Dict[str, Any]]:
+    fmt = settings.formatting
+    clean = _strip_control_chars if settings.strip_control_chars else (lambda text: text)
+    use_updated = fmt.date_source == "updated"
     papers = []
-    for entry in feed.entries:
+    for record in records:
         try:
-            title = _maybe_clean_text(config, entry.title).replace('\n', ' ').strip()
-            link = _extract_abs_link(entry) or ""
-            arxiv_id, arxiv_version = _extract_arxiv_id_from_url(link)
+            title = clean(record["title"]).replace('\n', ' ').strip()
+            link = record["link"] or ""
+            arxiv_id, arxiv_version = extract_arxiv_id_from_url(link)
             
-            if hasattr(entry, 'arxiv_primary_category'):
-                category = entry.arxiv_primary_category['term']
-            else:
-                category = 'Unknown'
+            category = record["category"] or 'Unknown'
             
-            authors = [_maybe_clean_text(config, a.name) for a in entry.authors]
-            author_threshold = get_config_value(
-                config, "fetch.formatting.author_et_al_threshold", 1
-            )
-            if len(authors) > int(author_threshold):
+            authors = [clean(a) for a in record["authors"]]
+            if len(authors) > fmt.author_et_al_threshold:
                 author_str = f"{authors[0]} et al."
             elif len(authors) == 1:
                 author_str = authors[0]
             else:
                 author_str = "Unknown"
 
-            date_source = str(get_config_value(config, "fetch.formatting.date_source", "published") or "published").strip().lower()
-            date_struct = None
-            if date_source == "updated" and hasattr(entry, 'updated_parsed'):
-                date_struct = entry.updated_parsed
-            elif hasattr(entry, 'published_parsed'):
-                date_struct = entry.published_parsed
-
-            if date_struct:
-                pub_date = datetime.date(*date_struct[:3]).strftime("%Y-%m-%d")
+            if use_updated and record["updated"]:
+                pub_date = record["updated"]
             else:
-                pub_date = "Unknown Date"
+                pub_date = record["published"] or "Unknown Date"
             
-            summary = _maybe_clean_text(config, entry.summary).replace('\n', ' ').strip()
-            summary_max_chars = get_config_value(config, "fetch.formatting.summary_max_chars", 250)
+            summary = clean(record["summary"]).replace('\n', ' ').strip()
             summary_hint = (
-                summary[: int(summary_max_chars)] + "..."
-                if len(summary) > int(summary_max_chars)
+                summary[: fmt.summary_max_chars] + "..."
+                if len(summary) > fmt.summary_max_chars
                 else summary
             )
             
@@ -366,48 +488,398 @@ def fetch_papers():
             
     return papers
 
+
+def _feed_total_results(feed) -> Optional[int]:
+    try:
+        return int(feed.feed.get("opensearch_totalresults"))
+    except Exception:
+        return None
+
+
+def _harvest_checkpoint_paths(config, suffix: str = ""):
+    """Return (state_path, spool_path); `suffix` separates split sub-queries."""
+    cache_rel = get_config_value(config, "paths.cache_dir", ".cache")
+    checkpoint_rel = get_config_value(
+        config, "fetch.harvest.checkpoint_file", "arxiv_harvest.json"
+    )
+    root, ext = os.path.splitext(os.path.join(BASE_DIR, cache_rel, checkpoint_rel))
+    state_path = f"{root}{suffix}{ext or '.json'}"
+    spool_path = f"{root}{suffix}.jsonl"
+    return state_path, spool_path
+
+
+def _harvest_checkpoint_suffix(params: Dict[str, Any]) -> str:
+    digest = hashlib.sha1(_harvest_query_key(params).encode("utf-8")).hexdigest()
+    return f"-{digest[:10]}"
+
+
+def _harvest_query_key(params: Dict[str, Any]) -> str:
+    """Identify a harvest by its query, so a checkpoint is never reused across queries."""
+    keyed = {k: v for k, v in params.items() if k not in {"start", "max_results"}}
+    return json.dumps(keyed, sort_keys=True, ensure_ascii=False)
+
+
+def _read_harvest_state(state_path: str) -> Dict[str, Any]:
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except Exception:
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def _load_harvest_checkpoint(config, query_key: str, suffix: str = ""):
+    """Return (next_start, papers, complete) from a matching checkpoint, or (None, [], False)."""
+    state_path, spool_path = _harvest_checkpoint_paths(config, suffix)
+    state = _read_harvest_state(state_path)
+    if not state:
+        return None, [], False
+
+    if state.get("query") != query_key:
+        print("检查点与当前查询不一致，忽略检查点")
+        return None, [], False
+
+    next_start = int(state.get("next_start", 0))
+    saved_count = int(state.get("papers", 0))
+
+    # The spool may contain a trailing partial slice written right before a
+    # crash; only the first `saved_count` records belong to completed slices.
+    papers = []
+    try:
+        with open(spool_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if len(papers) >= saved_count:
+                    break
+                line = line.strip()
+                if line:
+                    papers.append(json.loads(line))
+    except Exception:
+        return None, [], False
+
+    if len(papers) < saved_count:
+        return None, [], False
+    return next_start, papers, bool(state.get("complete", False))
+
+
+def _truncate_harvest_spool(spool_path: str, keep: int) -> None:
+    """Truncate the spool right after its first `keep` complete lines."""
+    offset = 0
+    kept = 0
+    with open(spool_path, "rb+") as f:
+        while kept < keep:
+            line = f.readline()
+            if not line.endswith(b"\n"):
+                raise ValueError(
+                    f"harvest spool {spool_path} has fewer than {keep} complete records"
+                )
+            offset += len(line)
+            if line.strip():
+                kept += 1
+        f.truncate(offset)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _save_harvest_checkpoint(
+    config, query_key: str, suffix: str, next_start: int, papers, new_papers, complete: bool
+):
+    state_path, spool_path = _harvest_checkpoint_paths(config, suffix)
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+
+    if len(papers) == len(new_papers):
+        mode = "w"
+    else:
+        # A crash between the spool write and the state update can leave a
+        # torn trailing slice; cut back to the checkpointed records first so
+        # new lines never get glued onto a partial one.
+        _truncate_harvest_spool(spool_path, len(papers) - len(new_papers))
+        mode = "a"
+    with open(spool_path, mode, encoding="utf-8") as f:
+        for p in new_papers:
+            f.write(json.dumps(p, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+    journal.atomic_write_text(
+        state_path,
+        json.dumps(
+            {
+                "query": query_key,
+                "next_start": next_start,
+                "papers": len(papers),
+                "complete": complete,
+            },
+            ensure_ascii=False,
+        ),
+    )
+
+
+def clear_harvest_checkpoint(config=None):
+    """Drop completed harvest checkpoints once their papers have been written to the inbox.
+
+    Incomplete checkpoints (a slice failed after all retries) are kept so that
+    the next run resumes from the last completed offset.
+    """
+    if config is None:
+        config = load_settings(BASE_DIR).config
+    state_path, _spool_path = _harvest_checkpoint_paths(config)
+    root, ext = os.path.splitext(state_path)
+    for candidate in glob.glob(f"{glob.escape(root)}*{ext}"):
+        if not _read_harvest_state(candidate).get("complete", False):
+            continue
+        suffix = os.path.splitext(candidate)[0][len(root):]
+        for path in _harvest_checkpoint_paths(config, suffix):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def _harvest_papers(
+    settings: Settings,
+    base_url: str,
+    params: Dict[str, Any],
+    http: Dict[str, Any],
+    checkpoint_suffix: str = "",
+):
+    """Walk the result set slice by slice, checkpointing after every slice.
+
+    Slices are `max_results` wide, starting at `fetch.arxiv_api.start` (or the
+    checkpointed offset), and stop at `fetch.harvest.max_total_results`, at the
+    end of the result set, or once a slice contains already-known papers.
+    """
+    config = settings.config
+    first_start = int(params["start"])
+
+    try:
+        max_total = int(get_config_value(config, "fetch.harvest.max_total_results", 10000))
+    except Exception:
+        max_total = 10000
+    # arXiv rejects start + max_results beyond 30000 for a single query.
+    end_offset = min(first_start + max(max_total, 0), 30000)
+
+    stop_on_known = bool(get_config_value(config, "fetch.harvest.stop_on_known", True))
+
+    query_key = _harvest_query_key(params)
+    offset, papers, complete = _load_harvest_checkpoint(config, query_key, checkpoint_suffix)
+    if offset is None:
+        offset, papers = first_start, []
+    elif complete:
+        print(f"检查点显示上次抓取已完成但未写入 Inbox，直接使用 {len(papers)} 篇")
+        return papers
+    else:
+        print(f"从检查点恢复：start={offset}，已获取 {len(papers)} 篇")
+
+    index_conn = _open_paper_index(config) if stop_on_known else None
+    try:
+        return _harvest_slices(
+            settings,
+            base_url,
+            params,
+            http,
+            (query_key, checkpoint_suffix),
+            offset,
+            end_offset,
+            papers,
+            index_conn,
+        )
+    finally:
+        if index_conn is not None:
+            index_conn.close()
+
+
+def _harvest_slices(
+    settings, base_url, params, http, checkpoint, offset, end_offset, papers, index_conn
+):
+    config = settings.config
+    query_key, checkpoint_suffix = checkpoint
+    slice_size = int(params["max_results"])
+    stop_on_known = bool(get_config_value(config, "fetch.harvest.stop_on_known", True))
+    full_scan = None
+
+    while offset < end_offset:
+        slice_params = dict(params)
+        slice_params["start"] = offset
+        slice_params["max_results"] = min(slice_size, end_offset - offset)
+        print(f"获取切片 start={offset} max_results={slice_params['max_results']}")
+
+        try:
+            records, total = _request_slice(base_url, slice_params, http)
+        except Exception as e:
+            # Keep the checkpoint: the next run resumes from this offset.
+            print(f"获取数据错误: {e}；已保存检查点 start={offset}")
+            break
+
+        slice_papers = _papers_from_records(settings, records)
+        papers.extend(slice_papers)
+        offset += int(slice_params["max_results"])
+
+        reached_known = False
+        if stop_on_known:
+            if index_conn is not None:
+                known = _load_known_index(config, slice_papers, index_conn)
+            else:
+                if full_scan is None:
+                    full_scan = _load_known_index(config, [])
+                known = full_scan
+            inbox_links, inbox_versions, archived_links, archived_versions = known
+            reached_known = any(
+                (p.get("arxiv_id") in inbox_versions or p.get("arxiv_id") in archived_versions)
+                if p.get("arxiv_id")
+                else (p.get("link") in inbox_links or p.get("link") in archived_links)
+                for p in slice_papers
+            )
+        complete = (
+            not records
+            or (total is not None and offset >= total)
+            or reached_known
+            or offset >= end_offset
+        )
+        _save_harvest_checkpoint(
+            config, query_key, checkpoint_suffix, offset, papers, slice_papers, complete
+        )
+
+        if reached_known:
+            print("已到达已知论文，停止继续翻页")
+        if complete:
+            break
+
+    return papers
+
+
+def fetch_papers():
+    settings = load_settings(BASE_DIR)
+    config = settings.config
+
+    print(f"获取日期为 {datetime.date.today()}...")
+
+    base_url, params = _build_query_params(config)
+    http = _http_settings(config)
+    http["session"] = _http_session(config, _RateLimiter(http["min_delay_seconds"]))
+    harvest = bool(get_config_value(config, "fetch.harvest.enabled", False))
+
+    split_by = str(get_config_value(config, "fetch.split_queries.by", "none") or "none").strip().lower()
+    sub_queries = _split_query_params(config, split_by) if split_by != "none" else [params]
+    if len(sub_queries) > 1:
+        return _fetch_split_queries(settings, base_url, sub_queries, http, harvest)
+
+    query_string = urllib.parse.urlencode(params)
+    url_for_print = f"{base_url}?{query_string}"
+    print(f"查询链接为: {url_for_print}")
+
+    if harvest:
+        return _harvest_papers(settings, base_url, params, http)
+
+    try:
+        records, _total = _request_slice(base_url, params, http)
+    except Exception as e:
+        print(f"获取数据错误: {e}")
+        return []
+
+    return _papers_from_records(settings, records)
+
+
+def _merge_papers(paper_lists) -> List[Dict[str, Any]]:
+    """Merge sub-query results, deduping by arXiv base id (highest version wins).
+
+    Papers keep the position of their first occurrence, so the merged order
+    is deterministic given the sub-query order.
+    """
+    merged: List[Dict[str, Any]] = []
+    position: Dict[str, int] = {}
+    for papers in paper_lists:
+        for p in papers:
+            key = p.get("arxiv_id") or p.get("link")
+            if not key:
+                merged.append(p)
+                continue
+            if key not in position:
+                position[key] = len(merged)
+                merged.append(p)
+                continue
+            current = merged[position[key]]
+            if (p.get("arxiv_version") or 0) > (current.get("arxiv_version") or 0):
+                merged[position[key]] = p
+    return merged
+
+
+def _fetch_split_queries(settings: Settings, base_url, sub_queries, http, harvest: bool):
+    """Run sub-queries on a thread pool behind one shared rate limiter."""
+    config = settings.config
+    try:
+        workers = int(get_config_value(config, "fetch.split_queries.workers", 4))
+    except Exception:
+        workers = 4
+    workers = max(1, min(workers, len(sub_queries)))
+
+    print(f"拆分为 {len(sub_queries)} 个子查询，并发数 {workers}")
+
+    def _run(params):
+        print(f"子查询: {params.get('search_query', '')}")
+        if harvest:
+            return _harvest_papers(
+                settings, base_url, params, http, _harvest_checkpoint_suffix(params)
+            )
+        try:
+            records, _total = _request_slice(base_url, params, http)
+        except Exception as e:
+            print(f"获取数据错误: {params.get('search_query', '')}: {e}")
+            return []
+        return _papers_from_records(settings, records)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_run, sub_queries))
+
+    merged = _merge_papers(results)
+    print(f"子查询共返回 {sum(len(r) for r in results)} 篇，按 arXiv id 去重后 {len(merged)} 篇")
+    return merged
+
 def update_inbox(papers):
-    config = load_config(BASE_DIR)
+    settings = load_settings(BASE_DIR)
+    config = settings.config
+
+    # A process_inbox run that crashed mid-archive may still own Inbox.md.
+    journal.recover_pending(config, BASE_DIR)
 
     if not papers:
         print("没有论文更新")
         return
 
-    inbox_rel = get_config_value(config, "paths.inbox", "Inbox.md")
-    file_path = os.path.join(BASE_DIR, inbox_rel)
+    index_conn = _open_paper_index(config)
+    try:
+        _update_inbox(settings, papers, index_conn)
+    finally:
+        if index_conn is not None:
+            index_conn.close()
+
+
+def _update_inbox(settings: Settings, papers, index_conn):
+    config = settings.config
+    fmt = settings.formatting
+    file_path = settings.paths.inbox
     today_str = datetime.date.today().strftime("%Y-%m-%d")
     
-    existing_links = set()
-    existing_versions_by_id = {}
-    if os.path.exists(file_path):
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-            existing_versions_by_id = _scan_existing_inbox_for_arxiv_versions(content)
-            for m in re.finditer(r"\((https?://[^\)]+)\)", content):
-                existing_links.add(m.group(1))
-
-    archived_links, archived_versions_by_id = _scan_archived_index(config)
+    (
+        existing_links,
+        existing_versions_by_id,
+        archived_links,
+        archived_versions_by_id,
+    ) = _load_known_index(config, papers, index_conn)
 
     # Merge: treat archived papers as already-known to avoid re-adding.
     known_links = set(existing_links) | set(archived_links)
     known_versions_by_id = dict(archived_versions_by_id)
     known_versions_by_id.update(existing_versions_by_id)
 
-    dedupe_strategy = get_config_value(config, "fetch.dedupe.strategy", "link")
-    version_behavior = str(
-        get_config_value(config, "features.arxiv_version_update_behavior", "ignore")
-    ).strip().lower()
-    notice_tpl = get_config_value(
-        config,
-        "fetch.formatting.version_update_notice_template",
-        "- [ ] (版本更新) {date}：{arxiv_id} 从 v{old_version} 更新到 v{new_version} - [{title}]({link})",
-    )
+    version_behavior = settings.version_update_behavior
+    notice_tpl = fmt.version_update_notice_template
 
     new_papers = []
     version_update_notices = []
+    version_updated_papers = []
     replacements = {}
 
-    if str(dedupe_strategy).lower() == "arxiv_id":
+    if settings.dedupe_strategy == "arxiv_id":
         for p in papers:
             arxiv_id = p.get("arxiv_id")
             new_version = p.get("arxiv_version")
@@ -448,6 +920,7 @@ def update_inbox(papers):
                         )
                         + "\n"
                     )
+                    version_updated_papers.append(p)
                 except Exception:
                     pass
     else:
@@ -465,11 +938,7 @@ def update_inbox(papers):
         print(f"获取到 {len(papers)} 篇论文. 其中{len(new_papers)} 篇是新的")
     
     new_lines = []
-    heading_tpl = get_config_value(
-        config,
-        "fetch.formatting.daily_heading_template",
-        "## {date} 更新 {count} 篇新论文",
-    )
+    heading_tpl = fmt.daily_heading_template
     new_lines.append(
         heading_tpl.format(date=today_str, count=(len(new_papers) + len(version_update_notices)))
         + "\n"
@@ -478,11 +947,7 @@ def update_inbox(papers):
     for notice in version_update_notices:
         new_lines.append(notice)
 
-    item_tpl = get_config_value(
-        config,
-        "fetch.formatting.item_template",
-        "- [ ] **[{category}]** [{title}]({link}) *by {author} ({published})* - _{summary}_",
-    )
+    item_tpl = fmt.item_template
     for p in new_papers:
         line = item_tpl.format(
             category=p["category"],
@@ -501,17 +966,21 @@ def update_inbox(papers):
     else:
         old_lines = ["# 📥 My Arxiv Inbox\n\n", "这里是你的待阅读区。\n\n", "---\n\n"]
 
-    if replacements and os.path.exists(file_path):
-        joined = "".join(old_lines)
-        for base_id, latest_ver in replacements.items():
-            pattern = re.compile(rf"https?://arxiv\\.org/abs/{re.escape(base_id)}(?:v\\d+)?")
-            joined = pattern.sub(f"https://arxiv.org/abs/{base_id}v{latest_ver}", joined)
-        old_lines = joined.splitlines(keepends=True)
+    shard_texts = {}
+    if replacements:
+        if os.path.exists(file_path):
+            old_lines = _replace_arxiv_versions("".join(old_lines), replacements).splitlines(keepends=True)
+        # Older entries of an updated paper may already live in a monthly shard.
+        for shard in inbox_shards.shard_paths(settings.paths.inbox_shards):
+            text = read_text_if_exists(shard)
+            replaced = _replace_arxiv_versions(text, replacements)
+            if replaced != text:
+                shard_texts[shard] = replaced
 
     insert_index = -1
-    delimiter = get_config_value(config, "fetch.formatting.inbox_insert_after_delimiter", "---")
+    delimiter = fmt.inbox_insert_after_delimiter
     for i, line in enumerate(old_lines):
-        if line.strip() == str(delimiter):
+        if line.strip() == delimiter:
             insert_index = i + 1
             break
     
@@ -521,11 +990,32 @@ def update_inbox(papers):
 
     final_lines = old_lines[:insert_index] + ["\n"] + new_lines + old_lines[insert_index:]
 
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.writelines(final_lines)
+    if settings.inbox_sharding.enabled:
+        keep_days = settings.inbox_sharding.keep_days
+        final_lines, rolled = inbox_shards.roll_over(
+            final_lines,
+            settings.paths.inbox_shards,
+            keep_days,
+            datetime.date.today(),
+            delimiter,
+            pending=shard_texts,
+        )
+        if rolled:
+            print(f"已将 {keep_days} 天前的条目移入 {len(rolled)} 个月度分片")
+        shard_texts.update(rolled)
+
+    ops = [journal.write_op(os.path.relpath(file_path, BASE_DIR), "".join(final_lines))]
+    for shard, text in sorted(shard_texts.items()):
+        ops.append(journal.write_op(os.path.relpath(shard, BASE_DIR), text))
+    journal.run_transaction(config, BASE_DIR, ops)
+
+    if index_conn is not None:
+        paper_index.record_papers(index_conn, new_papers + version_updated_papers, "inbox")
+        paper_index.sync_fingerprint(index_conn, config, BASE_DIR)
     
     print(f"成功添加 {len(new_papers)} 篇论文、{len(version_update_notices)} 条版本提示 至 {file_path}")
 
 if __name__ == "__main__":
     papers = fetch_papers()
     update_inbox(papers)
+    clear_harvest_checkpoint()
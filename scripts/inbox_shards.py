@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import datetime
+import os
+import re
+
+from typing import Dict, List, Optional, Tuple
+
+from config_loader import get_config_value
+
+# Daily block headings, e.g. "## 2026-08-21 更新 36 篇新论文" (fetch.formatting.daily_heading_template).
+_DAY_HEADING_RE = re.compile(r"^##\s+(\d{4})-(\d{2})-(\d{2})\b")
+_SHARD_NAME_RE = re.compile(r"^\d{4}-\d{2}\.md$")
+
+DayBlock = Tuple[Optional[datetime.date], List[str]]
+
+
+def shards_dir(config, base_dir: str) -> str:
+    return os.path.join(base_dir, get_config_value(config, "paths.inbox_shards_dir", "Inbox"))
+
+
+def shard_paths(directory: str) -> List[str]:
+    """Existing `<YYYY-MM>.md` shards, newest month first.
+
+    Listed whether or not sharding is currently enabled, so that turning it
+    off never hides rolled-over papers from dedupe or archiving.
+    """
+    if not os.path.isdir(directory):
+        return []
+    names = sorted((n for n in os.listdir(directory) if _SHARD_NAME_RE.match(n)), reverse=True)
+    return [os.path.join(directory, n) for n in names]
+
+
+def inbox_paths(config, base_dir: str) -> List[str]:
+    """Inbox.md followed by every shard: the full set of unarchived entries."""
+    inbox = os.path.join(base_dir, get_config_value(config, "paths.inbox", "Inbox.md"))
+    return [inbox] + shard_paths(shards_dir(config, base_dir))
+
+
+def _day_of(line: str) -> Optional[datetime.date]:
+    m = _DAY_HEADING_RE.match(line)
+    if not m:
+        return None
+    try:
+        return datetime.date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+    except ValueError:
+        return None
+
+
+def split_day_blocks(lines: List[str]) -> Tuple[List[str], List[DayBlock]]:
+    """Split inbox lines into (head, [(day, block_lines)]).
+
+    `head` is everything before the first dated heading (title, delimiter);
+    each block runs from its heading up to the next dated heading.
+    """
+    head: List[str] = []
+    blocks: List[DayBlock] = []
+    for line in lines:
+        day = _day_of(line)
+        if day is not None:
+            blocks.append((day, [line]))
+        elif blocks:
+            blocks[-1][1].append(line)
+        else:
+            head.append(line)
+    return head, blocks
+
+
+def _ensure_trailing_blank(block: List[str]) -> List[str]:
+    if block and not block[-1].endswith("\n"):
+        block = block[:-1] + [block[-1] + "\n"]
+    if block and block[-1].strip():
+        block = block + ["\n"]
+    return block
+
+
+def _shard_head(month: str, delimiter: str) -> List[str]:
+    return [f"# 📥 Inbox {month}\n", "\n", f"{delimiter}\n", "\n"]
+
+
+def roll_over(
+    lines: List[str],
+    directory: str,
+    keep_days: int,
+    today: datetime.date,
+    delimiter: str = "---",
+    pending: Optional[Dict[str, str]] = None,
+) -> Tuple[List[str], Dict[str, str]]:
+    """Move day blocks older than `keep_days` out of the inbox into monthly shards.
+
+    Returns (new_inbox_lines, {shard_path: new_text}). Blocks are merged into
+    any existing shard newest day first, matching Inbox.md; blocks without a
+    dated heading always stay in the inbox. `pending` holds shard texts not
+    yet written (same transaction) and takes precedence over the files on
+    disk. Nothing is written here.
+    """
+    pending = pending or {}
+    cutoff = today - datetime.timedelta(days=keep_days)
+    head, blocks = split_day_blocks(lines)
+
+    kept: List[str] = list(head)
+    moved: Dict[str, List[DayBlock]] = {}
+    for day, block in blocks:
+        if day is not None and day < cutoff:
+            moved.setdefault(day.strftime("%Y-%m"), []).append((day, block))
+        else:
+            kept.extend(block)
+    if not moved:
+        return lines, {}
+
+    shard_texts: Dict[str, str] = {}
+    for month, month_blocks in moved.items():
+        path = os.path.join(directory, f"{month}.md")
+        if path in pending:
+            shard_head, existing = split_day_blocks(pending[path].splitlines(keepends=True))
+        elif os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                shard_head, existing = split_day_blocks(f.readlines())
+        else:
+            shard_head, existing = _shard_head(month, delimiter), []
+
+        # Stable sort: same-day blocks keep their relative order (new before old).
+        merged = sorted(month_blocks + existing, key=lambda b: b[0], reverse=True)
+        out = list(shard_head)
+        for _day, block in merged:
+            out.extend(_ensure_trailing_blank(block))
+        shard_texts[path] = "".join(out)
+
+    return kept, shard_texts
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+
+from typing import Any, Dict, List
+
+from config_loader import get_config_value
+
+JOURNAL_VERSION = 2
+
+
+def _fsync_dir(path: str) -> None:
+    # Directory fsync makes the rename itself durable; not supported on Windows.
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _target_mode(path: str) -> int:
+    try:
+        return os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def atomic_write_text(path: str, text: str) -> None:
+    """Replace `path` with `text` via temp file + fsync + rename.
+
+    Readers (and a crash at any point) see either the old or the new content,
+    never a truncated file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        # mkstemp creates 0600 files; keep the mode a plain open() would give.
+        os.chmod(tmp_path, _target_mode(path))
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(directory)
+
+
+def journal_path(config, base_dir: str) -> str:
+    cache_rel = get_config_value(config, "paths.cache_dir", ".cache")
+    file_rel = get_config_value(config, "journal.file", "pending_writes.json")
+    return os.path.join(base_dir, cache_rel, file_rel)
+
+
+def write_op(path: str, content: str) -> Dict[str, Any]:
+    """Replace the file at `path` with `content`."""
+    return {"op": "write", "path": path, "content": content}
+
+
+def create_op(path: str, content: str) -> Dict[str, Any]:
+    """Create the file at `path` unless it already exists (e.g. note templates)."""
+    return {"op": "create", "path": path, "content": content}
+
+
+def _file_digest(path: str):
+    """sha256 of the file's bytes, or None if it does not exist."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def _content_digest(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _with_images(base_dir: str, ops: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Pre/post-image hashes let recovery tell an interrupted write from a
+    # file that was changed (git pull, web UI edit) after the journal landed.
+    return [
+        dict(
+            op,
+            pre=_file_digest(os.path.join(base_dir, op["path"])),
+            post=_content_digest(op["content"]),
+        )
+        for op in ops
+    ]
+
+
+def _stale_targets(base_dir: str, ops: List[Dict[str, Any]]) -> List[str]:
+    stale = []
+    for op in ops:
+        if op["op"] == "create":
+            # Replaying a create never touches an existing file.
+            continue
+        current = _file_digest(os.path.join(base_dir, op["path"]))
+        if current not in (op["pre"], op["post"]):
+            stale.append(op["path"])
+    return stale
+
+
+def _checksum(ops: List[Dict[str, Any]]) -> str:
+    payload = json.dumps(ops, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _apply(base_dir: str, ops: List[Dict[str, Any]]) -> None:
+    # Every op is idempotent, so replaying a partially applied journal is safe.
+    for op in ops:
+        path = os.path.join(base_dir, op["path"])
+        if op["op"] == "create" and os.path.exists(path):
+            continue
+        atomic_write_text(path, op["content"])
+
+
+def run_transaction(config, base_dir: str, ops: List[Dict[str, Any]]) -> None:
+    """Apply `ops` (paths relative to `base_dir`) all-or-nothing across crashes.
+
+    The full set of writes is made durable in the journal first; only then are
+    the target files replaced. A crash before the journal lands leaves every
+    file untouched; a crash afterwards is completed by `recover_pending`.
+    """
+    if not ops:
+        return
+    ops = _with_images(base_dir, ops)
+    path = journal_path(config, base_dir)
+    atomic_write_text(
+        path,
+        json.dumps(
+            {"version": JOURNAL_VERSION, "ops": ops, "checksum": _checksum(ops)},
+            ensure_ascii=False,
+        ),
+    )
+    _apply(base_dir, ops)
+    os.remove(path)
+    _fsync_dir(os.path.dirname(path))
+
+
+def recover_pending(config, base_dir: str) -> int:
+    """Replay a committed journal left by an interrupted run; roll back a broken one.
+
+    A journal whose targets no longer match their pre- or post-image was
+    overtaken by later edits; it is moved aside to `<journal>.stale` instead
+    of being replayed over the newer content.
+
+    Returns the number of replayed operations.
+    """
+    path = journal_path(config, base_dir)
+    if not os.path.exists(path):
+        return 0
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            journal = json.load(f)
+        ops = journal["ops"]
+        valid = journal.get("version") == JOURNAL_VERSION and journal.get("checksum") == _checksum(ops)
+    except Exception:
+        ops, valid = [], False
+
+    if not valid:
+        # Nothing is applied before the journal is complete, so dropping it
+        # rolls the interrupted transaction back.
+        print(f"丢弃无效的写入日志: {path}")
+        os.remove(path)
+        return 0
+
+    stale = _stale_targets(base_dir, ops)
+    if stale:
+        print(f"写入日志已过期，以下文件在日志写入后被修改，拒绝重放: {', '.join(stale)}")
+        print(f"日志已移至 {path}.stale")
+        os.replace(path, f"{path}.stale")
+        _fsync_dir(os.path.dirname(path))
+        return 0
+
+    print(f"检测到未完成的写入，正在重放 {len(ops)} 项操作...")
+    _apply(base_dir, ops)
+    os.remove(path)
+    _fsync_dir(os.path.dirname(path))
+    return len(ops)
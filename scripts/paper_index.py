@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import argparse
+import datetime
+import hashlib
+import os
+import re
+import sqlite3
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import inbox_shards
+from config_loader import load_config, get_config_value
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCHEMA_VERSION = "1"
+
+ARXIV_ABS_RE = re.compile(r"arxiv\.org/abs/([^\s\)\]]+)", re.IGNORECASE)
+_MD_LINK_RE = re.compile(r"\((https?://[^\)]+)\)")
+# "**[cs.AI]** [Title](https://arxiv.org/abs/...)" in Inbox.md, "[Title](...)" in List.md
+_MD_ARXIV_ENTRY_RE = re.compile(
+    r"(?:\*\*\[(?P<category>[^\]]*)\]\*\*\s+)?\[(?P<title>[^\]]*)\]\((?P<link>https?://(?:www\.)?arxiv\.org/abs/[^\s\)]+)\)",
+    re.IGNORECASE,
+)
+
+_CHECKBOX_RE = re.compile(rb"^(\s*-\s+)\[[^\]\n]\]", re.MULTILINE)
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER is 999 on older builds.
+_LOOKUP_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS papers (
+    arxiv_id TEXT PRIMARY KEY,
+    version INTEGER,
+    link TEXT,
+    title TEXT,
+    category TEXT,
+    state TEXT NOT NULL,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS links (
+    link TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+"""
+
+
+def parse_arxiv_id_and_version(arxiv_id_with_optional_version: str):
+    raw = (arxiv_id_with_optional_version or "").strip()
+    if not raw:
+        return None, None
+
+    raw = raw.split("?")[0].split("#")[0]
+
+    m = re.match(r"^(?P<base>.+?)(?:v(?P<ver>\d+))?$", raw, re.IGNORECASE)
+    if not m:
+        return raw, None
+
+    base = m.group("base")
+    ver = m.group("ver")
+    try:
+        version = int(ver) if ver is not None else None
+    except Exception:
+        version = None
+    return base, version
+
+
+def read_text_if_exists(path: str) -> str:
+    try:
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read() or ""
+    except Exception:
+        return ""
+    return ""
+
+
+def index_path(config, base_dir: str = BASE_DIR) -> str:
+    cache_rel = get_config_value(config, "paths.cache_dir", ".cache")
+    file_rel = get_config_value(config, "index.file", "paper_index.sqlite3")
+    return os.path.join(base_dir, cache_rel, file_rel)
+
+
+def index_enabled(config) -> bool:
+    return bool(get_config_value(config, "index.enabled", True))
+
+
+def _markdown_sources(config, base_dir: str):
+    """Return (inbox_files, contents, papers_dir); inbox_files is Inbox.md plus its monthly shards."""
+    inbox_files = inbox_shards.inbox_paths(config, base_dir)
+    contents = os.path.join(base_dir, get_config_value(config, "paths.contents", "Contents.md"))
+    papers_dir = os.path.join(base_dir, get_config_value(config, "paths.papers_dir", "Papers"))
+    return inbox_files, contents, papers_dir
+
+
+def _fingerprint(config, base_dir: str) -> str:
+    """Hash of the markdown files the index mirrors.
+
+    Contents.md mirrors every Papers/*/List.md, so hashing it together with
+    Inbox.md (and its shards) detects edits made outside our scripts (web UI,
+    git pull) without walking Papers/. Checkbox marks are ignored: ticking
+    papers for archival does not change which papers are known.
+    """
+    inbox_files, contents, _papers_dir = _markdown_sources(config, base_dir)
+    h = hashlib.sha1()
+    for path in inbox_files + [contents]:
+        h.update(path.encode("utf-8") + b"\0")
+        try:
+            with open(path, "rb") as f:
+                h.update(_CHECKBOX_RE.sub(rb"\1[ ]", f.read()))
+        except FileNotFoundError:
+            h.update(b"<missing>")
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _get_meta(conn: sqlite3.Connection, key: str) -> Optional[str]:
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def _set_meta(conn: sqlite3.Connection, key: str, value: str) -> None:
+    conn.execute(
+        "INSERT INTO meta (key, value) VALUES (?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (key, value),
+    )
+
+
+def _scan_entries(content: str, default_category: Optional[str] = None):
+    """Yield (base_id, version, link, title, category) for arXiv links in markdown."""
+    described = {}
+    for m in _MD_ARXIV_ENTRY_RE.finditer(content):
+        raw = ARXIV_ABS_RE.search(m.group("link")).group(1)
+        described.setdefault(raw, (m.group("title"), m.group("category")))
+
+    for m in ARXIV_ABS_RE.finditer(content):
+        raw = m.group(1)
+        base, ver = parse_arxiv_id_and_version(raw)
+        if not base:
+            continue
+        title, category = described.get(raw, (None, None))
+        yield base, ver, f"https://arxiv.org/abs/{raw}", title, category or default_category
+
+
+def _record_rows(conn: sqlite3.Connection, rows, state: str) -> None:
+    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn.executemany(
+        """
+        INSERT INTO papers (arxiv_id, version, link, title, category, state, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(arxiv_id) DO UPDATE SET
+            version = NULLIF(MAX(COALESCE(papers.version, -1), COALESCE(excluded.version, -1)), -1),
+            link = CASE
+                WHEN COALESCE(excluded.version, -1) >= COALESCE(papers.version, -1)
+                THEN COALESCE(excluded.link, papers.link)
+                ELSE papers.link
+            END,
+            title = COALESCE(excluded.title, papers.title),
+            category = COALESCE(excluded.category, papers.category),
+            state = excluded.state,
+            updated_at = excluded.updated_at
+        """,
+        [(base, ver, link, title, category, state, now) for base, ver, link, title, category in rows],
+    )
+
+
+def _record_links(conn: sqlite3.Connection, links: Iterable[str], state: str) -> None:
+    conn.executemany(
+        "INSERT INTO links (link, state) VALUES (?, ?) "
+        "ON CONFLICT(link) DO UPDATE SET state = excluded.state",
+        [(link, state) for link in links if link],
+    )
+
+
+def rebuild_index(config, base_dir: str, conn: sqlite3.Connection) -> None:
+    """Repopulate the index from Inbox.md (and shards), Contents.md and Papers/**/List.md."""
+    inbox_files, contents, papers_dir = _markdown_sources(config, base_dir)
+
+    with conn:
+        conn.execute("DELETE FROM papers")
+        conn.execute("DELETE FROM links")
+
+        # Archived first; Inbox presence then wins the `state` column, which is
+        # what update_inbox uses to decide on version update notices.
+        content = read_text_if_exists(contents)
+        _record_rows(conn, _scan_entries(content), "archived")
+        _record_links(conn, _MD_LINK_RE.findall(content), "archived")
+
+        if os.path.isdir(papers_dir):
+            for root, _dirs, files in os.walk(papers_dir):
+                for fn in files:
+                    if fn.lower() != "list.md":
+                        continue
+                    text = read_text_if_exists(os.path.join(root, fn))
+                    category = os.path.basename(root)
+                    _record_rows(conn, _scan_entries(text, category), "archived")
+                    _record_links(conn, _MD_LINK_RE.findall(text), "archived")
+
+        for path in inbox_files:
+            content = read_text_if_exists(path)
+            _record_rows(conn, _scan_entries(content), "inbox")
+            _record_links(conn, _MD_LINK_RE.findall(content), "inbox")
+
+        _set_meta(conn, "schema_version", SCHEMA_VERSION)
+        _set_meta(conn, "fingerprint", _fingerprint(config, base_dir))
+
+
+def open_index(config, base_dir: str = BASE_DIR) -> sqlite3.Connection:
+    """Open the on-disk index, rebuilding it from markdown when missing or stale."""
+    path = index_path(config, base_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    conn = sqlite3.connect(path)
+    conn.executescript(_SCHEMA)
+
+    stale = _get_meta(conn, "schema_version") != SCHEMA_VERSION
+    if not stale and _get_meta(conn, "fingerprint") != _fingerprint(config, base_dir):
+        stale = True
+    if stale:
+        print("论文索引缺失或与 Markdown 不一致，正在重建...")
+        rebuild_index(config, base_dir, conn)
+    return conn
+
+
+def sync_fingerprint(conn: sqlite3.Connection, config, base_dir: str = BASE_DIR) -> None:
+    """Mark the index as matching the markdown files after our own writes."""
+    with conn:
+        _set_meta(conn, "fingerprint", _fingerprint(config, base_dir))
+
+
+def _chunks(items: List[str]):
+    for i in range(0, len(items), _LOOKUP_CHUNK):
+        yield items[i : i + _LOOKUP_CHUNK]
+
+
+def known_for_papers(conn: sqlite3.Connection, papers: List[Dict[str, Any]]):
+    """Return (inbox_links, inbox_versions, archived_links, archived_versions).
+
+    Same shape as the full markdown scan, but restricted to the ids and links
+    of `papers`, so the cost is O(len(papers)).
+    """
+    ids = sorted({p["arxiv_id"] for p in papers if p.get("arxiv_id")})
+    links = sorted({p["link"] for p in papers if p.get("link")})
+
+    inbox_versions: Dict[str, Optional[int]] = {}
+    archived_versions: Dict[str, Optional[int]] = {}
+    for chunk in _chunks(ids):
+        q = ",".join("?" * len(chunk))
+        for arxiv_id, version, state in conn.execute(
+            f"SELECT arxiv_id, version, state FROM papers WHERE arxiv_id IN ({q})", chunk
+        ):
+            target = inbox_versions if state == "inbox" else archived_versions
+            target[arxiv_id] = version
+
+    inbox_links: Set[str] = set()
+    archived_links: Set[str] = set()
+    for chunk in _chunks(links):
+        q = ",".join("?" * len(chunk))
+        for link, state in conn.execute(
+            f"SELECT link, state FROM links WHERE link IN ({q})", chunk
+        ):
+            (inbox_links if state == "inbox" else archived_links).add(link)
+
+    return inbox_links, inbox_versions, archived_links, archived_versions
+
+
+def record_papers(conn: sqlite3.Connection, papers: List[Dict[str, Any]], state: str) -> None:
+    """Upsert paper dicts (arxiv_id, arxiv_version, link, title, category) with `state`."""
+    rows: List[Tuple[Any, ...]] = []
+    for p in papers:
+        arxiv_id = p.get("arxiv_id")
+        version = p.get("arxiv_version")
+        if not arxiv_id and p.get("link"):
+            arxiv_id, version = extract_arxiv_id_from_url(p["link"])
+        if arxiv_id:
+            rows.append((arxiv_id, version, p.get("link"), p.get("title"), p.get("category")))
+    with conn:
+        _record_rows(conn, rows, state)
+        _record_links(conn, [p.get("link") for p in papers], state)
+
+
+def extract_arxiv_id_from_url(url: str):
+    if not url:
+        return None, None
+    m = ARXIV_ABS_RE.search(url)
+    if not m:
+        return None, None
+    return parse_arxiv_id_and_version(m.group(1))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the persistent arXiv paper index")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index from markdown")
+    args = parser.parse_args()
+
+    config = load_config(BASE_DIR)
+    conn = open_index(config, BASE_DIR)
+    if args.rebuild:
+        rebuild_index(config, BASE_DIR, conn)
+    counts = dict(conn.execute("SELECT state, COUNT(*) FROM papers GROUP BY state").fetchall())
+    print(f"索引文件: {index_path(config, BASE_DIR)}")
+    print(f"Inbox: {counts.get('inbox', 0)} 篇，已归档: {counts.get('archived', 0)} 篇")
+    conn.close()
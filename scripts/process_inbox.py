@@ -1,209 +1,321 @@
+import argparse
+import difflib
 import os
 import re
+import sys
 import datetime
 import shutil
 
-from typing import Pattern
-
-from config_loader import load_config, get_config_value
+import inbox_shards
+import journal
+import paper_index
+from settings import Settings, load_settings
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
 _CONTROL_CHARS_RE = re.compile(r"[\x00-\x1f\x7f]")
+_UNSAFE_FILENAME_CHARS_RE = re.compile(r'[\\/*?:"<>|]')
 
 
 def _strip_control_chars(text: str) -> str:
     return _CONTROL_CHARS_RE.sub("", text or "")
 
 
-def _sanitize_filename(config, name: str) -> str:
-    strip_ctrl = bool(get_config_value(config, "safety.strip_control_chars", True))
-    sanitize = bool(get_config_value(config, "safety.sanitize_filenames", True))
+def ensure_dirs(papers_dir: str, notes_dir: str, pdfs_dir: str):
+    for d in [papers_dir, notes_dir, pdfs_dir]:
+        if not os.path.exists(d):
+            os.makedirs(d)
 
+def _safe_name(settings: Settings, name: str) -> str:
     value = str(name or "")
-    if strip_ctrl:
+    if settings.strip_control_chars:
         value = _strip_control_chars(value)
 
     # Always prevent path traversal / separator issues.
     value = value.replace("/", "_").replace("\\", "_")
 
-    if not sanitize:
+    if not settings.sanitize_filenames:
         return value.strip()
 
-    return re.sub(r'[\\/*?:"<>|]', "", value).strip()
-
-
-def _paths_from_config(config):
-    inbox_rel = get_config_value(config, "paths.inbox", "Inbox.md")
-    papers_rel = get_config_value(config, "paths.papers_dir", "Papers")
-    notes_rel = get_config_value(config, "paths.notes_dir", "Notes")
-    contents_rel = get_config_value(config, "paths.contents", "Contents.md")
-    pdfs_rel = get_config_value(config, "paths.pdfs_dir", "pdfs")
-
-    return {
-        "inbox": os.path.join(BASE_DIR, inbox_rel),
-        "papers": os.path.join(BASE_DIR, papers_rel),
-        "notes": os.path.join(BASE_DIR, notes_rel),
-        "contents": os.path.join(BASE_DIR, contents_rel),
-        "pdfs": os.path.join(BASE_DIR, pdfs_rel),
-    }
-
-
-def _entry_pattern_from_config(config) -> Pattern:
-    checked = str(get_config_value(config, "archive.checkbox.checked", "x"))
-    default_pattern = rf"-\s+\[{re.escape(checked)}\]\s+\*\*\[(.*?)\]\*\*\s+\[(.*?)\]\((.*?)\).*"
-    pattern = str(
-        get_config_value(
-            config,
-            "archive.parsing.entry_regex",
-            default_pattern,
-        )
-    )
+    return _UNSAFE_FILENAME_CHARS_RE.sub("", value).strip()
 
-    if checked != "x" and "\\[x\\]" in pattern and f"\\[{checked}\\]" not in pattern:
-        pattern = pattern.replace("\\[x\\]", rf"\\[{re.escape(checked)}\\]")
 
-    return re.compile(pattern)
+def _group_by_category(settings, entries):
+    """Group entries by sanitized category, keeping Inbox order within a group."""
+    groups = {}
+    for e in entries:
+        groups.setdefault(_safe_name(settings, e["category"]), []).append(e)
+    return groups
 
-def ensure_dirs(papers_dir: str, notes_dir: str, pdfs_dir: str):
-    for d in [papers_dir, notes_dir, pdfs_dir]:
-        if not os.path.exists(d):
-            os.makedirs(d)
-
-def create_note_template(config, notes_dir: str, category, title, link, date_str):
-    safe_title = _sanitize_filename(config, title)
-    note_dir = os.path.join(notes_dir, _sanitize_filename(config, category))
-    if not os.path.exists(note_dir):
-        os.makedirs(note_dir)
-        
-    note_path = os.path.join(note_dir, f"{safe_title}.md")
-    
-    if os.path.exists(note_path):
-        return note_path
-        
-    sections = get_config_value(
-        config,
-        "archive.notes.template.sections",
-        [
-            "## 1. 摘要",
-            "## 2. 关键成果",
-            "## 3. 核心技术",
-            "## 4. 实验及其结果",
-            "## 5. 我的观点",
-        ],
-    )
 
-    title_prefix = get_config_value(config, "archive.notes.template.title_prefix", "# ")
-    title_line = f"{title_prefix}{title}" if str(title_prefix) else str(title)
+def _note_content(settings, entry, date_str: str) -> str:
+    title = entry["title"]
+    title_prefix = settings.archive.note_title_prefix
+    title_line = f"{title_prefix}{title}" if title_prefix else str(title)
 
     content_lines = [
         title_line,
         "",
-        f"- **Category**: {category}",
-        f"- **Link**: {link}",
+        f"- **Category**: {entry['category']}",
+        f"- **Link**: {entry['link']}",
         f"- **Date**: {date_str}",
         "",
     ]
-    for s in sections:
-        content_lines.append(str(s))
+    for s in settings.archive.note_sections:
+        content_lines.append(s)
         content_lines.append("")
         content_lines.append("")
 
-    content = "\n".join(content_lines)
-    with open(note_path, "w", encoding="utf-8") as f:
-        f.write(content)
-    
-    return note_path
+    return "\n".join(content_lines)
+
+
+def plan_note_templates(settings, notes_dir: str, entries, date_str: str):
+    """Return [(path, content)] for missing note files, listing each category directory once."""
+    planned = []
+    for safe_cat, group in _group_by_category(settings, entries).items():
+        note_dir = os.path.join(notes_dir, safe_cat)
+        existing = set(os.listdir(note_dir)) if os.path.isdir(note_dir) else set()
+
+        for entry in group:
+            file_name = f"{_safe_name(settings, entry['title'])}.md"
+            if file_name in existing:
+                continue
+            planned.append((os.path.join(note_dir, file_name), _note_content(settings, entry, date_str)))
+            existing.add(file_name)
+    return planned
+
+
+def plan_papers_archive(settings, papers_dir: str, entries, date_str: str):
+    """Compute the new Papers/<category>/List.md contents for `entries`.
+
+    Returns ({category_dir: (path, new_text)}, {category_dir: [appended lines]});
+    each List.md is read once and nothing is written here.
+    """
+    list_files = {}
+    appended = {}
+    for safe_cat, group in _group_by_category(settings, entries).items():
+        archive_file = os.path.join(papers_dir, safe_cat, "List.md")
+
+        lines = []
+        for entry in group:
+            notes_rel_path = settings.archive.notes_rel_path_template.format(
+                category=safe_cat,
+                title=_safe_name(settings, entry["title"]),
+            )
+            lines.append(
+                settings.archive.list_entry_template.format(
+                    title=entry["title"],
+                    link=entry["link"],
+                    date=date_str,
+                    notes_rel_path=notes_rel_path,
+                )
+                + "\n"
+            )
+
+        if os.path.exists(archive_file):
+            with open(archive_file, "r", encoding="utf-8") as f:
+                old_text = f.read()
+        else:
+            old_text = f"# {group[0]['category']} 论文已处理\n\n"
+
+        list_files[safe_cat] = (archive_file, old_text + "".join(lines))
+        appended[safe_cat] = lines
+    return list_files, appended
+
+def _contents_header_lines(settings: Settings):
+    archive = settings.archive
+    return [
+        archive.contents_title + "\n",
+        "\n",
+        f"{archive.contents_updated_prefix}"
+        f"{datetime.datetime.now().strftime(archive.contents_updated_time_format)}\n",
+        "\n",
+    ]
 
-def append_to_papers_archive(config, papers_dir: str, category, title, link, date_str):
-    safe_cat = _sanitize_filename(config, category)
-    
-    cat_dir = os.path.join(papers_dir, safe_cat)
-    if not os.path.exists(cat_dir):
-        os.makedirs(cat_dir)
-        
-    archive_file = os.path.join(cat_dir, "List.md")
-    
-    notes_rel_tpl = get_config_value(
-        config,
-        "archive.links.notes_rel_path_template",
-        "../../Notes/{category}/{title}.md",
-    )
-    notes_rel_path = notes_rel_tpl.format(
-        category=safe_cat,
-        title=f"{_sanitize_filename(config, title)}",
-    )
 
-    entry_tpl = get_config_value(
-        config,
-        "archive.papers.list_entry_template",
-        "- [{title}]({link}) - *{date}* [Notes]({notes_rel_path})",
-    )
-    entry_line = (
-        entry_tpl.format(
-            title=title,
-            link=link,
-            date=date_str,
-            notes_rel_path=notes_rel_path,
-        )
-        + "\n"
-    )
-    
-    if not os.path.exists(archive_file):
-        with open(archive_file, "w", encoding="utf-8") as f:
-            f.write(f"# {category} 论文已处理\n\n")
-    
-    with open(archive_file, "a", encoding="utf-8") as f:
-        f.write(entry_line)
+def _contents_entry_line(list_line: str) -> str:
+    return list_line.replace("../../Notes", "Notes")
 
-def update_contents_index(config, papers_dir: str, contents_file: str):
-    print("Regenerating Contents.md...")
 
-    title = get_config_value(config, "archive.contents.title", "# 🗂️ Contents Index")
-    updated_prefix = get_config_value(config, "archive.contents.updated_prefix", "> 上次更新时间为 ")
-    updated_time_format = get_config_value(
-        config, "archive.contents.updated_time_format", "%Y-%m-%d %H:%M"
-    )
+def render_contents_lines(settings: Settings, papers_dir: str, list_overrides=None):
+    """Full Contents.md content, one line per list item, built from Papers/*/List.md.
 
-    lines = [str(title) + "\n\n"]
-    lines.append(
-        f"{updated_prefix}{datetime.datetime.now().strftime(str(updated_time_format))}\n\n"
-    )
+    `list_overrides` maps category directories to List.md text that has not
+    been written to disk yet (pending in the same transaction).
+    """
+    list_overrides = list_overrides or {}
+    lines = _contents_header_lines(settings)
+
+    cat_names = set(list_overrides)
+    if os.path.isdir(papers_dir):
+        cat_names.update(os.listdir(papers_dir))
     
-    for cat_name in sorted(os.listdir(papers_dir)):
-        cat_path = os.path.join(papers_dir, cat_name)
-        if not os.path.isdir(cat_path):
-            continue
-            
-        list_file = os.path.join(cat_path, "List.md")
-        if not os.path.exists(list_file):
-            continue
-        
-        lines.append(f"## {cat_name}\n\n")
+    for cat_name in sorted(cat_names):
+        if cat_name in list_overrides:
+            cat_lines = list_overrides[cat_name].splitlines(keepends=True)
+        else:
+            cat_path = os.path.join(papers_dir, cat_name)
+            if not os.path.isdir(cat_path):
+                continue
+                
+            list_file = os.path.join(cat_path, "List.md")
+            if not os.path.exists(list_file):
+                continue
+
+            with open(list_file, "r", encoding="utf-8") as f:
+                cat_lines = f.readlines()
         
-        with open(list_file, "r", encoding="utf-8") as f:
-            cat_lines = f.readlines()
-            for cl in cat_lines:
-                if cl.strip().startswith("-"):
-                    fixed_line = cl.replace("../../Notes", "Notes")
-                    lines.append(fixed_line)
+        lines.append(f"## {cat_name}\n")
+        lines.append("\n")
+        for cl in cat_lines:
+            if cl.strip().startswith("-"):
+                lines.append(_contents_entry_line(cl))
         lines.append("\n")
 
-    with open(contents_file, "w", encoding="utf-8") as f:
-        f.writelines(lines)
+    return lines
+
+
+def _parse_contents_sections(settings: Settings, lines):
+    """Return {category: end_index} for a Contents.md laid out by render_contents_lines.
+
+    `end_index` is the index of the blank line closing the section, i.e. where
+    new entries are spliced in. Returns None when the layout is not the one a
+    full rebuild produces (headings out of order, stray lines, ...).
+    """
+    title = settings.archive.contents_title
+    updated_prefix = settings.archive.contents_updated_prefix
+    if (
+        len(lines) < 4
+        or lines[0] != title + "\n"
+        or lines[1] != "\n"
+        or not lines[2].startswith(updated_prefix)
+        or lines[3] != "\n"
+    ):
+        return None
+
+    sections = {}
+    previous = None
+    i = 4
+    while i < len(lines):
+        header = lines[i]
+        if not header.startswith("## ") or not header.endswith("\n"):
+            return None
+        name = header[3:-1]
+        if previous is not None and name <= previous:
+            return None
+        if i + 1 >= len(lines) or lines[i + 1] != "\n":
+            return None
+        j = i + 2
+        while j < len(lines) and lines[j].strip().startswith("-"):
+            j += 1
+        if j >= len(lines) or lines[j] != "\n":
+            return None
+        sections[name] = j
+        previous = name
+        i = j + 1
+    return sections
+
+
+def _splice_contents(settings: Settings, contents_file: str, new_entries):
+    """Insert new List.md lines into their `## <category>` sections.
+
+    `new_entries` maps category directory names to the lines appended to their
+    List.md. Returns the new Contents.md lines, or None when a full rebuild is
+    required instead.
+    """
+    if not os.path.exists(contents_file):
+        return None
+    with open(contents_file, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+
+    sections = _parse_contents_sections(settings, lines)
+    if sections is None:
+        print("Contents.md 结构无效，执行全量重建")
+        return None
+    missing = [cat for cat in new_entries if cat not in sections]
+    if missing:
+        print(f"新增分类 {', '.join(missing)}，执行全量重建")
+        return None
+
+    # Splice bottom-up so that earlier insertion points stay valid.
+    for cat in sorted(new_entries, key=lambda c: sections[c], reverse=True):
+        added = [
+            _contents_entry_line(l) for l in new_entries[cat] if l.strip().startswith("-")
+        ]
+        at = sections[cat]
+        lines[at:at] = added
+
+    lines[: 4] = _contents_header_lines(settings)
+    return lines
+
+
+def build_contents_index(settings: Settings, papers_dir: str, contents_file: str, new_entries=None, list_overrides=None):
+    """Return the new Contents.md lines, spliced incrementally when possible."""
+    if settings.archive.contents_incremental and new_entries is not None:
+        lines = _splice_contents(settings, contents_file, new_entries)
+        if lines is not None:
+            print("Updated Contents.md incrementally")
+            return lines
+
+    print("Regenerating Contents.md...")
+    return render_contents_lines(settings, papers_dir, list_overrides)
+
+
+def _rel(path: str) -> str:
+    return os.path.relpath(path, BASE_DIR)
+
+
+def verify_contents_index(settings: Settings, papers_dir: str, contents_file: str) -> bool:
+    """Diff Contents.md against a full rebuild (ignoring the timestamp line)."""
+    expected = render_contents_lines(settings, papers_dir)
+    try:
+        with open(contents_file, "r", encoding="utf-8") as f:
+            actual = f.readlines()
+    except FileNotFoundError:
+        actual = []
+
+    def _strip_timestamp(lines):
+        return lines[:2] + lines[3:] if len(lines) > 2 else lines
+
+    diff = list(
+        difflib.unified_diff(
+            _strip_timestamp(actual),
+            _strip_timestamp(expected),
+            fromfile=contents_file,
+            tofile="full rebuild",
+        )
+    )
+    if diff:
+        sys.stdout.writelines(diff)
+        print("Contents.md 与全量重建结果不一致")
+        return False
+    print("Contents.md 与全量重建结果一致")
+    return True
+
+def _open_paper_index(config):
+    if not paper_index.index_enabled(config):
+        return None
+    try:
+        return paper_index.open_index(config, BASE_DIR)
+    except Exception as e:
+        print(f"打开论文索引失败: {e}")
+        return None
 
 def process_inbox():
-    config = load_config(BASE_DIR)
-    paths = _paths_from_config(config)
+    settings = load_settings(BASE_DIR)
+    config = settings.config
 
-    inbox_file = paths["inbox"]
-    papers_dir = paths["papers"]
-    notes_dir = paths["notes"]
-    contents_file = paths["contents"]
-    pdfs_dir = paths["pdfs"]
+    inbox_file = settings.paths.inbox
+    papers_dir = settings.paths.papers
+    notes_dir = settings.paths.notes
+    contents_file = settings.paths.contents
+    pdfs_dir = settings.paths.pdfs
 
-    entry_pattern = _entry_pattern_from_config(config)
+    entry_pattern = settings.archive.entry_pattern
+
+    # Finish (or roll back) a previous run that crashed mid-archive.
+    journal.recover_pending(config, BASE_DIR)
 
     if not os.path.exists(inbox_file):
         print("未找到文本")
@@ -211,38 +323,85 @@ def process_inbox():
 
     ensure_dirs(papers_dir, notes_dir, pdfs_dir)
     
-    with open(inbox_file, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-    
-    new_inbox_lines = []
-    archived_count = 0
+    # Opened before any write, so that only ticking checkboxes keeps the
+    # index fingerprint valid and no rebuild is needed.
+    index_conn = _open_paper_index(config)
+
+    # Inbox.md first, then monthly shards (newest first): checked items may be in any of them.
+    new_inbox_texts = {}
+    archived_entries = []
     today_str = datetime.date.today().strftime("%Y-%m-%d")
 
-    for line in lines:
-        match = entry_pattern.search(line)
-        if match:
-            category = match.group(1).strip()
-            title = match.group(2).strip()
-            link = match.group(3).strip()
-            
-            print(f"提取 [{category}] {title}")
-            
-            append_to_papers_archive(config, papers_dir, category, title, link, today_str)
-            
-            create_note_template(config, notes_dir, category, title, link, today_str)
-            
-            archived_count += 1
-        else:
-            new_inbox_lines.append(line)
-    
+    for path in [inbox_file] + inbox_shards.shard_paths(settings.paths.inbox_shards):
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        # Most shards have nothing checked; skip them with a single search.
+        if path != inbox_file and not entry_pattern.search("".join(lines)):
+            continue
+
+        kept_lines = []
+        for line in lines:
+            match = entry_pattern.search(line)
+            if match:
+                category = match.group(1).strip()
+                title = match.group(2).strip()
+                link = match.group(3).strip()
+                
+                print(f"提取 [{category}] {title}")
+                archived_entries.append({"title": title, "link": link, "category": category})
+            else:
+                kept_lines.append(line)
+        if len(kept_lines) != len(lines) or path == inbox_file:
+            new_inbox_texts[path] = "".join(kept_lines)
+
+    archived_count = len(archived_entries)
     if archived_count > 0:
-        with open(inbox_file, "w", encoding="utf-8") as f:
-            f.writelines(new_inbox_lines)
-        
-        update_contents_index(config, papers_dir, contents_file)
+        list_files, new_list_entries = plan_papers_archive(
+            settings, papers_dir, archived_entries, today_str
+        )
+        notes = plan_note_templates(settings, notes_dir, archived_entries, today_str)
+        contents_lines = build_contents_index(
+            settings,
+            papers_dir,
+            contents_file,
+            new_list_entries,
+            {cat: text for cat, (_path, text) in list_files.items()},
+        )
+
+        # Inbox, List.md files, notes and Contents.md change together: a crash
+        # midway is replayed from the journal instead of duplicating entries.
+        ops = [journal.write_op(_rel(path), text) for path, text in new_inbox_texts.items()]
+        for path, text in list_files.values():
+            ops.append(journal.write_op(_rel(path), text))
+        for path, content in notes:
+            ops.append(journal.create_op(_rel(path), content))
+        ops.append(journal.write_op(_rel(contents_file), "".join(contents_lines)))
+        journal.run_transaction(config, BASE_DIR, ops)
+        if index_conn is not None:
+            paper_index.record_papers(index_conn, archived_entries, "archived")
+            paper_index.sync_fingerprint(index_conn, config, BASE_DIR)
         print(f"成功处理 {archived_count} 篇论文")
     else:
         print("没有论文被标记需归档")
 
+    if index_conn is not None:
+        index_conn.close()
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive checked Inbox entries")
+    parser.add_argument(
+        "--verify-contents",
+        action="store_true",
+        help="Diff Contents.md against a full rebuild and exit (1 on mismatch)",
+    )
+    args = parser.parse_args()
+
+    if args.verify_contents:
+        settings = load_settings(BASE_DIR)
+        sys.exit(
+            0
+            if verify_contents_index(settings, settings.paths.papers, settings.paths.contents)
+            else 1
+        )
+
     process_inbox()
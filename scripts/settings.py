@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import functools
+import os
+import re
+import string
+
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Mapping, Pattern, Tuple
+
+from config_loader import load_config, get_config_value
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEDUPE_STRATEGIES = ("link", "arxiv_id")
+VERSION_UPDATE_BEHAVIORS = ("ignore", "append_notice", "replace")
+DATE_SOURCES = ("published", "updated")
+
+
+class SettingsError(ValueError):
+    """Raised when config.yaml (plus env overrides) holds an invalid value."""
+
+
+@dataclass(frozen=True)
+class PathSettings:
+    inbox: str
+    inbox_shards: str
+    papers: str
+    notes: str
+    contents: str
+    pdfs: str
+
+
+@dataclass(frozen=True)
+class InboxSharding:
+    enabled: bool
+    keep_days: int
+
+
+@dataclass(frozen=True)
+class FetchFormatting:
+    author_et_al_threshold: int
+    date_source: str
+    summary_max_chars: int
+    item_template: str
+    daily_heading_template: str
+    version_update_notice_template: str
+    inbox_insert_after_delimiter: str
+
+
+@dataclass(frozen=True)
+class ArchiveSettings:
+    entry_pattern: Pattern
+    note_title_prefix: str
+    note_sections: Tuple[str, ...]
+    notes_rel_path_template: str
+    list_entry_template: str
+    contents_title: str
+    contents_updated_prefix: str
+    contents_updated_time_format: str
+    contents_incremental: bool
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Per-run view of config.yaml, resolved and validated once.
+
+    `config` keeps the raw mapping for options that are read once per run
+    (HTTP, harvest, index, journal); everything consulted per entry lives in
+    typed fields.
+    """
+
+    config: Mapping[str, Any]
+    strip_control_chars: bool
+    sanitize_filenames: bool
+    paths: PathSettings
+    inbox_sharding: InboxSharding
+    formatting: FetchFormatting
+    dedupe_strategy: str
+    version_update_behavior: str
+    archive: ArchiveSettings
+
+
+def _template(config, key: str, default: str, fields: FrozenSet[str]) -> str:
+    """Read a str.format template and reject placeholders it will never be given."""
+    value = str(get_config_value(config, key, default))
+    try:
+        parsed = list(string.Formatter().parse(value))
+    except ValueError as e:
+        raise SettingsError(f"{key}: invalid template: {e}") from None
+    for _literal, field, _spec, _conversion in parsed:
+        if field is None:
+            continue
+        name = re.split(r"[.\[]", field, maxsplit=1)[0]
+        if name not in fields:
+            raise SettingsError(
+                f"{key}: unknown placeholder {{{field}}} (available: {', '.join(sorted(fields))})"
+            )
+    return value
+
+
+def _int(config, key: str, default: int, minimum: int) -> int:
+    raw = get_config_value(config, key, default)
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        raise SettingsError(f"{key}: expected an integer, got {raw!r}") from None
+    if value < minimum:
+        raise SettingsError(f"{key}: must be >= {minimum}, got {value}")
+    return value
+
+
+def _choice(config, key: str, default: str, choices: Tuple[str, ...]) -> str:
+    value = str(get_config_value(config, key, default) or default).strip().lower()
+    if value not in choices:
+        raise SettingsError(f"{key}: expected one of {', '.join(choices)}, got {value!r}")
+    return value
+
+
+def _entry_pattern(config) -> Pattern:
+    checked = str(get_config_value(config, "archive.checkbox.checked", "x"))
+    default_pattern = rf"-\s+\[{re.escape(checked)}\]\s+\*\*\[(.*?)\]\*\*\s+\[(.*?)\]\((.*?)\).*"
+    pattern = str(get_config_value(config, "archive.parsing.entry_regex", default_pattern))
+
+    if checked != "x" and "\\[x\\]" in pattern and f"\\[{checked}\\]" not in pattern:
+        pattern = pattern.replace("\\[x\\]", rf"\\[{re.escape(checked)}\\]")
+
+    try:
+        compiled = re.compile(pattern)
+    except re.error as e:
+        raise SettingsError(f"archive.parsing.entry_regex: {e}") from None
+    if compiled.groups < 3:
+        raise SettingsError(
+            "archive.parsing.entry_regex: needs 3 groups (category, title, link), "
+            f"got {compiled.groups}"
+        )
+    return compiled
+
+
+def _paths(config, base_dir: str) -> PathSettings:
+    def _path(key: str, default: str) -> str:
+        return os.path.join(base_dir, get_config_value(config, key, default))
+
+    return PathSettings(
+        inbox=_path("paths.inbox", "Inbox.md"),
+        inbox_shards=_path("paths.inbox_shards_dir", "Inbox"),
+        papers=_path("paths.papers_dir", "Papers"),
+        notes=_path("paths.notes_dir", "Notes"),
+        contents=_path("paths.contents", "Contents.md"),
+        pdfs=_path("paths.pdfs_dir", "pdfs"),
+    )
+
+
+def _fetch_formatting(config) -> FetchFormatting:
+    return FetchFormatting(
+        author_et_al_threshold=_int(config, "fetch.formatting.author_et_al_threshold", 1, 0),
+        date_source=_choice(config, "fetch.formatting.date_source", "published", DATE_SOURCES),
+        summary_max_chars=_int(config, "fetch.formatting.summary_max_chars", 250, 0),
+        item_template=_template(
+            config,
+            "fetch.formatting.item_template",
+            "- [ ] **[{category}]** [{title}]({link}) *by {author} ({published})* - _{summary}_",
+            frozenset({"category", "title", "link", "author", "published", "summary"}),
+        ),
+        daily_heading_template=_template(
+            config,
+            "fetch.formatting.daily_heading_template",
+            "## {date} 更新 {count} 篇新论文",
+            frozenset({"date", "count"}),
+        ),
+        version_update_notice_template=_template(
+            config,
+            "fetch.formatting.version_update_notice_template",
+            "- [ ] (版本更新) {date}：{arxiv_id} 从 v{old_version} 更新到 v{new_version} - [{title}]({link})",
+            frozenset({"date", "arxiv_id", "title", "link", "old_version", "new_version"}),
+        ),
+        inbox_insert_after_delimiter=str(
+            get_config_value(config, "fetch.formatting.inbox_insert_after_delimiter", "---")
+        ),
+    )
+
+
+def _archive(config) -> ArchiveSettings:
+    sections = get_config_value(
+        config,
+        "archive.notes.template.sections",
+        [
+            "## 1. 摘要",
+            "## 2. 关键成果",
+            "## 3. 核心技术",
+            "## 4. 实验及其结果",
+            "## 5. 我的观点",
+        ],
+    )
+    if not isinstance(sections, (list, tuple)):
+        raise SettingsError(f"archive.notes.template.sections: expected a list, got {sections!r}")
+
+    return ArchiveSettings(
+        entry_pattern=_entry_pattern(config),
+        note_title_prefix=str(get_config_value(config, "archive.notes.template.title_prefix", "# ")),
+        note_sections=tuple(str(s) for s in sections),
+        notes_rel_path_template=_template(
+            config,
+            "archive.links.notes_rel_path_template",
+            "../../Notes/{category}/{title}.md",
+            frozenset({"category", "title"}),
+        ),
+        list_entry_template=_template(
+            config,
+            "archive.papers.list_entry_template",
+            "- [{title}]({link}) - *{date}* [Notes]({notes_rel_path})",
+            frozenset({"title", "link", "date", "notes_rel_path"}),
+        ),
+        contents_title=str(get_config_value(config, "archive.contents.title", "# 🗂️ Contents Index")),
+        contents_updated_prefix=str(
+            get_config_value(config, "archive.contents.updated_prefix", "> 上次更新时间为 ")
+        ),
+        contents_updated_time_format=str(
+            get_config_value(config, "archive.contents.updated_time_format", "%Y-%m-%d %H:%M")
+        ),
+        contents_incremental=bool(get_config_value(config, "archive.contents.incremental", True)),
+    )
+
+
+def build_settings(config: Dict[str, Any], base_dir: str = BASE_DIR) -> Settings:
+    """Resolve and validate `config`; raises SettingsError on the first bad value."""
+    return Settings(
+        config=config,
+        strip_control_chars=bool(get_config_value(config, "safety.strip_control_chars", True)),
+        sanitize_filenames=bool(get_config_value(config, "safety.sanitize_filenames", True)),
+        paths=_paths(config, base_dir),
+        inbox_sharding=InboxSharding(
+            enabled=bool(get_config_value(config, "inbox.sharding.enabled", False)),
+            keep_days=_int(config, "inbox.sharding.keep_days", 14, 0),
+        ),
+        formatting=_fetch_formatting(config),
+        dedupe_strategy=_choice(config, "fetch.dedupe.strategy", "link", DEDUPE_STRATEGIES),
+        version_update_behavior=_choice(
+            config, "features.arxiv_version_update_behavior", "ignore", VERSION_UPDATE_BEHAVIORS
+        ),
+        archive=_archive(config),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def load_settings(base_dir: str = BASE_DIR) -> Settings:
+    """Load config.yaml (with env overrides) once per process and validate it."""
+    return build_settings(load_config(base_dir), base_dir)
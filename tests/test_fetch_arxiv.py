@@ -0,0 +1,42 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import fetch_arxiv  # noqa: E402
+
+
+def test_replace_arxiv_versions_rewrites_updated_links():
+    text = (
+        "- [ ] **[cs.AI]** [A](https://arxiv.org/abs/2601.00001v1)\n"
+        "- [ ] **[cs.LG]** [B](http://arxiv.org/abs/2601.00002)\n"
+        "- [ ] **[cs.CL]** [C](https://arxiv.org/abs/2601.00003v2)\n"
+    )
+    out = fetch_arxiv._replace_arxiv_versions(text, {"2601.00001": 3, "2601.00002": 2})
+
+    assert "https://arxiv.org/abs/2601.00001v3" in out
+    assert "https://arxiv.org/abs/2601.00002v2" in out
+    assert "https://arxiv.org/abs/2601.00003v2" in out
+    assert "2601.00001v1" not in out
+
+
+def test_replace_arxiv_versions_matches_host_and_case_like_arxiv_abs_re():
+    text = "[A](https://www.arxiv.org/abs/2601.00001v1) [B](HTTPS://ArXiv.org/abs/2601.00002v1)"
+    out = fetch_arxiv._replace_arxiv_versions(text, {"2601.00001": 2, "2601.00002": 4})
+
+    assert out == "[A](https://arxiv.org/abs/2601.00001v2) [B](https://arxiv.org/abs/2601.00002v4)"
+
+
+def test_replace_arxiv_versions_matches_whole_ids_only():
+    text = "[A](https://arxiv.org/abs/2601.00011v1) [B](https://arxiv.org/abs/2601.0001v1?context=cs)"
+    out = fetch_arxiv._replace_arxiv_versions(text, {"2601.0001": 5})
+
+    assert "2601.00011v1" in out
+    assert "https://arxiv.org/abs/2601.0001v5?context=cs" in out
+
+
+def test_replace_arxiv_versions_old_style_ids():
+    text = "[A](https://arxiv.org/abs/hep-th/9901001v1)"
+    out = fetch_arxiv._replace_arxiv_versions(text, {"hep-th/9901001": 2})
+
+    assert out == "[A](https://arxiv.org/abs/hep-th/9901001v2)"